@@ -0,0 +1,206 @@
+"""
+AEGIS Alert Engine
+Declarative threshold rules evaluated over arrays of subjects (sectors),
+with hysteresis, cooldown dedup and a bounded alert history.
+
+  - A Rule raises when a metric crosses `threshold` and clears only when it
+    comes back past `clear`. A value sitting on the threshold therefore
+    raises once instead of flapping.
+  - After a rule fires for a subject, it stays quiet for that subject for
+    `cooldown_s`, even if the condition clears and re-triggers.
+  - Rules in the same `group` suppress each other per subject. Only the
+    most severe active rule of a group is reported, so a sector going
+    CRITICAL does not also raise HIGH.
+  - Each evaluate() is a few array operations per rule. Python work is only
+    done for alerts that actually fire.
+  - Alerts get sequence numbers and are kept in a ring buffer (deque).
+    drain() hands out only the ones raised since the previous drain, for
+    pushing to clients as events.
+"""
+
+import itertools
+import time
+from collections import deque
+
+import numpy as np
+
+SEVERITY_RANK = {"info": 0, "moderate": 1, "high": 2, "critical": 3}
+
+
+class Rule:
+    """
+    One threshold rule.
+
+    Args:
+        name: Rule id, reported on each alert.
+        metric: Key of the value array passed to AlertEngine.evaluate().
+        op: ">=" raises at value >= threshold; "<=" at value <= threshold.
+        threshold: Raise level.
+        clear: Level the value must pass back over to clear (defaults to threshold).
+        severity: One of SEVERITY_RANK.
+        message: Format string with {subject} and {value}.
+        cooldown_s: Minimum time between alerts of this rule for one subject.
+        group: Rules sharing a group report only the most severe per subject.
+    """
+
+    __slots__ = ("name", "metric", "op", "threshold", "clear", "severity", "message",
+                 "cooldown_s", "group", "type")
+
+    def __init__(self, name, metric, op, threshold, clear=None, severity="high",
+                 message="{subject} - {value}", cooldown_s=300.0, group=None, type="risk"):
+        if op not in (">=", "<="):
+            raise ValueError(f"Unsupported rule operator {op!r}")
+        self.name = name
+        self.metric = metric
+        self.op = op
+        self.threshold = threshold
+        self.clear = threshold if clear is None else clear
+        self.severity = severity
+        self.message = message
+        self.cooldown_s = cooldown_s
+        self.group = group or name
+        self.type = type
+
+
+# Per-sector metrics: score (0-100), margin_m (wall - run-up),
+# forecast_margin_3h_m (wall - LSTM 3 h run-up), cyclone_margin_m (wall - peak level along a cyclone track)
+DEFAULT_RULES = (
+    Rule("sector_critical", "score", ">=", 88, clear=80, severity="critical",
+         message="{subject} - Risk Level CRITICAL", cooldown_s=600, group="sector_risk"),
+    Rule("sector_high", "score", ">=", 68, clear=60, severity="high",
+         message="{subject} - Risk Updated to HIGH", cooldown_s=900, group="sector_risk"),
+    Rule("wall_overtopped", "margin_m", "<=", 0.0, clear=0.2, severity="critical",
+         message="{subject} - Sea wall overtopped ({value:+.2f} m margin)", cooldown_s=600,
+         group="wall"),
+    Rule("wall_margin_low", "margin_m", "<=", 0.5, clear=0.8, severity="high",
+         message="{subject} - Sea wall margin down to {value:.2f} m", cooldown_s=900, group="wall"),
+    Rule("forecast_overtop_3h", "forecast_margin_3h_m", "<=", 0.0, clear=0.25, severity="high",
+         message="{subject} - LSTM forecasts overtopping within 3h ({value:+.2f} m)",
+         cooldown_s=1800, type="forecast"),
+    Rule("cyclone_overtop", "cyclone_margin_m", "<=", 0.0, clear=0.25, severity="critical",
+         message="{subject} - Cyclone track overtops sea wall at peak ({value:+.2f} m margin)",
+         cooldown_s=1800, type="cyclone"),
+)
+
+
+class AlertEngine:
+    def __init__(self, rules=DEFAULT_RULES, history=500):
+        self.rules = sorted(rules, key=lambda r: -SEVERITY_RANK[r.severity])
+        self.history = deque(maxlen=history)
+        self._pending = deque(maxlen=history)
+        self._seq = itertools.count(1)
+        self.last_seq = 0
+        self.subjects = []
+        self._subjects_ref = None
+        self._active = {}
+        self._last_fired = {}
+        self.raised = 0
+        self.suppressed = 0
+
+    def _reset(self, subjects):
+        self._subjects_ref = subjects
+        self.subjects = list(subjects)
+        n = len(self.subjects)
+        self._active = {r.name: np.zeros(n, dtype=bool) for r in self.rules}
+        self._last_fired = {r.name: np.full(n, -np.inf) for r in self.rules}
+
+    def evaluate(self, values, subjects, now=None):
+        """
+        Evaluate every rule over `subjects` and return the alerts raised.
+
+        Args:
+            values: metric name -> array with one value per subject (NaN = unknown,
+                which leaves that subject's state unchanged).
+            subjects: Subject names; state is reset when the list changes.
+        """
+        if now is None:
+            now = time.time()
+        if subjects is not self._subjects_ref and list(subjects) != self.subjects:
+            self._reset(subjects)
+        raised = []
+        group_active = {}
+        for rule in self.rules:
+            value = values.get(rule.metric)
+            if value is None:
+                continue
+            value = np.asarray(value, dtype=np.float64)
+            active = self._active[rule.name]
+            with np.errstate(invalid="ignore"):
+                if rule.op == ">=":
+                    trigger, cleared = value >= rule.threshold, value < rule.clear
+                else:
+                    trigger, cleared = value <= rule.threshold, value > rule.clear
+            now_active = np.where(active, ~cleared, trigger)
+            rising = now_active & ~active
+            active[:] = now_active
+
+            # A more severe rule of the same group already covers these subjects
+            covered = group_active.get(rule.group)
+            if covered is not None:
+                rising &= ~covered
+                group_active[rule.group] = covered | now_active
+            else:
+                group_active[rule.group] = now_active.copy()
+
+            if not rising.any():
+                continue
+            last = self._last_fired[rule.name]
+            due = rising & (now - last >= rule.cooldown_s)
+            self.suppressed += int(rising.sum() - due.sum())
+            for i in np.flatnonzero(due):
+                last[i] = now
+                subject = self.subjects[i]
+                raised.append(self._emit(rule.message.format(subject=subject, value=float(value[i])),
+                                         rule.severity, rule.type, now, rule=rule.name,
+                                         subject=subject, value=round(float(value[i]), 3)))
+        return raised
+
+    def add(self, message, severity="high", type="action", now=None, **extra):
+        """Record an ad-hoc alert (operator actions, vessel events) in the same stream."""
+        return self._emit(message, severity, type, time.time() if now is None else now, **extra)
+
+    def _emit(self, message, severity, type, now, **extra):
+        alert = {"seq": next(self._seq), "time": time.strftime("%H:%M", time.localtime(now)),
+                 "timestamp": now, "message": message, "severity": severity, "type": type, **extra}
+        self.last_seq = alert["seq"]
+        self.history.append(alert)
+        self._pending.append(alert)
+        self.raised += 1
+        return alert
+
+    def drain(self):
+        """Alerts raised since the previous drain() (oldest first)."""
+        pending = list(self._pending)
+        self._pending.clear()
+        return pending
+
+    def remember(self, alerts):
+        """Mirror alerts raised elsewhere (another worker) into the local history."""
+        for alert in alerts:
+            self.history.append(alert)
+            self.last_seq = max(self.last_seq, alert.get("seq", 0))
+
+    def since(self, seq=0, limit=100):
+        return [a for a in self.history if a["seq"] > seq][:limit]
+
+    def recent(self, n=10):
+        return list(itertools.islice(reversed(self.history), n))[::-1]
+
+    def active(self):
+        """Currently active rule/subject pairs, most severe first."""
+        out = []
+        for rule in self.rules:
+            for i in np.flatnonzero(self._active.get(rule.name, ())):
+                out.append({"rule": rule.name, "subject": self.subjects[i], "severity": rule.severity})
+        return out
+
+    def get_stats(self):
+        return {
+            "rules": len(self.rules),
+            "subjects": len(self.subjects),
+            "active": sum(int(a.sum()) for a in self._active.values()),
+            "raised": self.raised,
+            "suppressed_by_cooldown": self.suppressed,
+            "history": len(self.history),
+            "last_seq": self.last_seq,
+        }
@@ -0,0 +1,456 @@
+"""
+AEGIS Analog Search
+"Which past events looked like the last N readings?" over archived buoy series.
+
+  - One index per station over its whole history (aggregated buoy CSV plus
+    recorder files). Windows are compared by z-normalized Euclidean distance,
+    summed over channels, so a match has the same *shape* of wave height,
+    period, wind and pressure, regardless of absolute level.
+  - Distances to every window come from MASS (Mueen's algorithm) with
+    overlap-save: the series is cut into short overlapping blocks whose FFTs,
+    rolling means and inverse stds are cached per window length, so a query
+    costs one tiny FFT of the query and a batched inverse FFT over the blocks.
+    Short blocks stay in cache and run ~5x faster than one series-length FFT.
+  - Standard deviations are floored at the sensor resolution, so nearly flat
+    windows (a steady barometer) do not amplify rounding noise into "shape".
+  - Windows crossing a recording gap, or without `horizon` samples after
+    them, are never returned. The top-k matches are non-overlapping
+    (exclusion zone of one window), and their subsequent run-up forms an
+    analog-ensemble forecast, optionally re-anchored to the current run-up.
+
+Windows and horizons are counted in samples at each station's own cadence
+(reported as step_s). Live readings are averaged to that cadence by a
+CadenceBuffer before they are compared, and query(step_s=...) refuses
+stations archived at a different cadence.
+"""
+
+import csv
+import glob
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from aegis_sim.ingest import DEFAULT_REPLAY_PATH, parse_timestamp
+
+logger = logging.getLogger("Aegis.Analogs")
+
+ANALOG_FIELDS = ("wave_height_m", "period_s", "wind_speed_mps", "pressure_hpa")
+# Smallest std treated as real variation (roughly the archive's resolution)
+STD_FLOORS = {"wave_height_m": 0.02, "period_s": 0.1, "wind_speed_mps": 0.1,
+              "pressure_hpa": 0.1, "temp_c": 0.1}
+RUNUP_COLUMNS = ("runup_m", "physics_runup_m")
+CYCLONE_COLUMNS = ("is_cyclone_event", "is_cyclone")
+DEFAULT_WINDOW = 24
+DEFAULT_HORIZON = 6
+MIN_WINDOW = 4
+# Overlap-save block length (samples); longer windows use 4 * window
+BLOCK = 512
+# A break in the series is any step longer than this many median steps
+GAP_FACTOR = 3.0
+# Relative difference between query and archive cadence still treated as the same
+CADENCE_TOLERANCE = 0.1
+
+
+def _float(value):
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return v
+
+
+def read_history(paths, fields=ANALOG_FIELDS):
+    """
+    Rows per station from aggregated-telemetry or recorder CSVs (files or
+    recorder directories) -> {station: {"t", "values" (C, N), "runup", "cyclone"}},
+    sorted by time with duplicate timestamps dropped. Rows missing a sensor
+    value or run-up are skipped.
+    """
+    rows = {}
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "recording_*.csv"))) if os.path.isdir(path) else [path]
+        for filepath in files:
+            with open(filepath, "r", encoding="utf-8", newline="") as f:
+                reader = csv.DictReader(f)
+                header = reader.fieldnames or []
+                runup_col = next((c for c in RUNUP_COLUMNS if c in header), None)
+                cyclone_col = next((c for c in CYCLONE_COLUMNS if c in header), None)
+                if runup_col is None or not all(c in header for c in fields):
+                    logger.warning(f"Skipping {filepath}: missing run-up or sensor columns")
+                    continue
+                for row in reader:
+                    if row.get("event_type", "tick") != "tick":
+                        continue
+                    t = parse_timestamp(row.get("timestamp"))
+                    if t is None:
+                        continue
+                    cyclone = row.get(cyclone_col, "") if cyclone_col else ""
+                    rows.setdefault(row.get("station_id") or "", []).append(
+                        (t, *(_float(row[c]) for c in fields), _float(row[runup_col]),
+                         1.0 if cyclone in ("1", "True", "true") else 0.0))
+
+    history = {}
+    for station, recs in rows.items():
+        a = np.array(recs, dtype=np.float64)
+        a = a[~np.isnan(a).any(axis=1)]
+        if not len(a):
+            continue
+        a = a[np.argsort(a[:, 0], kind="stable")]
+        a = a[np.r_[True, np.diff(a[:, 0]) > 0]]
+        history[station] = {"t": a[:, 0], "values": np.ascontiguousarray(a[:, 1:-2].T),
+                            "runup": a[:, -2], "cyclone": a[:, -1].astype(bool)}
+    return history
+
+
+class StationIndex:
+    """Sliding-window analog index over one station's multivariate series."""
+
+    def __init__(self, station, t, values, runup, cyclone=None, fields=ANALOG_FIELDS,
+                 floors=None, gap_factor=GAP_FACTOR, window=DEFAULT_WINDOW):
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[0] != len(fields) or values.shape[1] != len(t):
+            raise ValueError(f"values must be ({len(fields)}, {len(t)}), got {values.shape}")
+        self.station = station
+        self.fields = tuple(fields)
+        self.t = np.asarray(t, dtype=np.float64)
+        self.runup = np.asarray(runup, dtype=np.float64)
+        self.cyclone = np.zeros(len(self.t), bool) if cyclone is None else np.asarray(cyclone, bool)
+        floors = STD_FLOORS if floors is None else floors
+        self.floors = np.array([floors.get(f, 0.0) for f in self.fields]) + 1e-9
+        self.n = len(self.t)
+
+        steps = np.diff(self.t)
+        self.step_s = float(np.median(steps)) if len(steps) else 0.0
+        # _room[i] = samples from i to the end of its contiguous segment
+        breaks = np.flatnonzero(steps > gap_factor * self.step_s) + 1 if len(steps) else np.array([], int)
+        ends = np.r_[breaks, self.n]
+        seg_end = np.repeat(ends, np.diff(np.r_[0, ends]))
+        self._room = (seg_end - np.arange(self.n)).astype(np.int32)
+        self.segments = len(ends)
+
+        # Centre each channel so the sliding dot products do not lose precision to
+        # large offsets (pressure ~1000 hPa); z-normalized distances are unaffected.
+        self._offset = values.mean(axis=1, keepdims=True)
+        self._x = values - self._offset
+        self._plans = {}
+        if window and self.n >= window:
+            self._plan(window)
+
+    def _plan(self, m):
+        """
+        Overlap-save layout for window length m: the series is cut into blocks of
+        `size` samples overlapping by m - 1, so block b yields the dot products of
+        window starts b*hop .. b*hop + hop - 1. Cached per m: block spectra plus
+        m*var/sd^2 and 1/sd per window start (sd = max(std, floor)), in block layout.
+        """
+        plan = self._plans.get(m)
+        if plan is not None:
+            return plan
+        C, L = len(self.fields), self.n - m + 1
+        size = max(BLOCK, 1 << (4 * m - 1).bit_length())
+        hop = size - m + 1
+        nb = -(-L // hop)
+        xp = np.zeros((C, nb * hop + m - 1))
+        xp[:, :self.n] = self._x
+        blocks = np.lib.stride_tricks.sliding_window_view(xp, size, axis=1)[:, ::hop][:, :nb]
+        spectra = np.fft.rfft(blocks, axis=2)
+
+        c1 = np.zeros((C, self.n + 1))
+        c2 = np.zeros_like(c1)
+        np.cumsum(self._x, axis=1, out=c1[:, 1:])
+        np.cumsum(self._x * self._x, axis=1, out=c2[:, 1:])
+        mean = (c1[:, m:] - c1[:, :-m]) / m
+        var = np.maximum((c2[:, m:] - c2[:, :-m]) / m - mean * mean, 0.0)
+        sd = np.maximum(np.sqrt(var), self.floors[:, None])
+        vx = np.zeros((C, nb * hop))
+        inv_sd = np.zeros((C, nb * hop))
+        vx[:, :L] = m * var / (sd * sd)
+        inv_sd[:, :L] = 1.0 / sd
+        plan = (size, spectra, vx.reshape(C, nb, hop), inv_sd.reshape(C, nb, hop))
+        if len(self._plans) >= 4:
+            self._plans.pop(next(iter(self._plans)))
+        self._plans[m] = plan
+        return plan
+
+    def distance_profile(self, query, weights=None):
+        """Squared z-normalized distance from `query` (C, m) to every window start."""
+        q = np.asarray(query, dtype=np.float64)
+        C, m = q.shape
+        if C != len(self.fields):
+            raise ValueError(f"query needs {len(self.fields)} channels, got {C}")
+        if not MIN_WINDOW <= m <= self.n:
+            raise ValueError(f"window must be between {MIN_WINDOW} and {self.n} samples, got {m}")
+        qc = q - q.mean(axis=1, keepdims=True)
+        q_var = (qc * qc).mean(axis=1)
+        q_sd = np.maximum(np.sqrt(q_var), self.floors)
+        qz = qc / q_sd[:, None]
+        size, spectra, vx, inv_sd = self._plan(m)
+        fq = np.fft.rfft(qz[:, ::-1], size, axis=1)
+        weights = np.ones(C) if weights is None else np.asarray(weights, dtype=np.float64)
+
+        # |zx - zq|^2 = m var_x/sd_x^2 + m var_q/sd_q^2 - 2 <x, zq>/sd_x, one channel
+        # at a time so the block arrays stay small
+        d2 = np.full(vx.shape[1:], float(weights @ (m * q_var / (q_sd * q_sd))))
+        for c in range(C):
+            qt = np.fft.irfft(spectra[c] * fq[c], size, axis=1)[:, m - 1:]
+            qt *= inv_sd[c]
+            qt *= -2.0
+            qt += vx[c]
+            if weights[c] != 1.0:
+                qt *= weights[c]
+            d2 += qt
+        d2 = d2.reshape(-1)[:self.n - m + 1]
+        return np.maximum(d2, 0.0, out=d2)
+
+    def search(self, query, k=10, horizon=DEFAULT_HORIZON, exclusion=None, exclude=None, weights=None):
+        """
+        Top-k non-overlapping window starts (ascending distance) that have
+        `horizon` samples after them in the same segment. `exclude` is an
+        optional (t0, t1) time range no returned window or horizon may overlap.
+        Returns (starts, distances).
+        """
+        m = np.shape(query)[1]
+        d2 = self.distance_profile(query, weights)
+        d2[self._room[:len(d2)] < m + horizon] = np.inf
+        if exclude is not None:
+            lo = np.searchsorted(self.t, exclude[0], "left") - m - horizon + 1
+            hi = np.searchsorted(self.t, exclude[1], "right")
+            d2[max(0, lo):max(0, hi)] = np.inf
+        zone = m if exclusion is None else int(exclusion)
+        found, dist = [], []
+        for _ in range(k):
+            i = int(np.argmin(d2))
+            if not np.isfinite(d2[i]):
+                break
+            found.append(i)
+            dist.append(float(np.sqrt(d2[i])))
+            d2[max(0, i - zone + 1):i + zone] = np.inf
+        return np.array(found, dtype=np.int64), np.array(dist)
+
+    def window(self, end, m):
+        """The (C, m) window of this station's history ending at or before time `end`, and its start index."""
+        stop = int(np.searchsorted(self.t, end, "right"))
+        if stop < m:
+            raise ValueError(f"no {m}-sample window ends by {end}")
+        return self._x[:, stop - m:stop] + self._offset, stop - m
+
+    def get_stats(self):
+        return {"samples": self.n, "segments": self.segments, "step_s": round(self.step_s, 1),
+                "start": float(self.t[0]) if self.n else None, "end": float(self.t[-1]) if self.n else None,
+                "cached_windows": sorted(self._plans)}
+
+
+class AnalogIndex:
+    """Per-station analog indexes with an analog-ensemble run-up forecast on top."""
+
+    def __init__(self, stations, fields=ANALOG_FIELDS, digest=""):
+        self.stations = dict(stations)
+        self.fields = tuple(fields)
+        self.digest = digest
+        self.queries = 0
+        self.query_ms = 0.0
+        self.built_at = time.time()
+
+    @classmethod
+    def from_history(cls, history, fields=ANALOG_FIELDS, floors=None, digest="", min_samples=None):
+        min_samples = 2 * DEFAULT_WINDOW + DEFAULT_HORIZON if min_samples is None else min_samples
+        stations = {s: StationIndex(s, h["t"], h["values"], h["runup"], h.get("cyclone"), fields, floors)
+                    for s, h in sorted(history.items()) if len(h["t"]) >= min_samples}
+        return cls(stations, fields, digest)
+
+    @classmethod
+    def from_files(cls, paths, fields=ANALOG_FIELDS, floors=None):
+        paths = [p for p in paths if os.path.exists(p)]
+        h = hashlib.sha1()
+        for p in paths:
+            st = os.stat(p)
+            h.update(f"{os.path.abspath(p)}:{st.st_size}:{st.st_mtime_ns};".encode())
+        return cls.from_history(read_history(paths, fields), fields, floors, digest=h.hexdigest()[:12])
+
+    def _select(self, recent, fields):
+        recent = np.asarray(recent, dtype=np.float64)
+        if recent.ndim != 2:
+            raise ValueError(f"recent must be (window, channels), got shape {recent.shape}")
+        if fields is not None:
+            fields = list(fields)
+            missing = [f for f in self.fields if f not in fields]
+            if missing:
+                raise ValueError(f"recent is missing channels {missing}")
+            recent = recent[:, [fields.index(f) for f in self.fields]]
+        if not np.isfinite(recent).all():
+            raise ValueError("recent contains NaN/inf")
+        return recent.T
+
+    def query(self, recent, station=None, k=10, horizon=DEFAULT_HORIZON, fields=None,
+              runup_now=None, exclude=None, weights=None, step_s=None):
+        """
+        Nearest historical windows to `recent` (window x channels, in `fields`
+        order or the index's own) at `station` (None = every station), and the
+        analog-ensemble run-up over the next `horizon` samples.
+
+        Each analog's future run-up is reported as recorded; with `runup_now`
+        the ensemble is also re-anchored as runup_now + (future - run-up at the
+        end of the analog window), which removes the site/slope offset between
+        stations. `exclude` = (station, t0, t1) skips analogs overlapping that span.
+        `step_s` is the sample interval of `recent`; stations archived at another
+        cadence are skipped, and ValueError is raised if none is left.
+        """
+        t0 = time.perf_counter()
+        if station is not None and station not in self.stations:
+            raise KeyError(station)
+        if k < 1 or horizon < 1:
+            raise ValueError("k and horizon must be >= 1")
+        q = self._select(recent, fields)
+        m = q.shape[1]
+        names = [station] if station is not None else list(self.stations)
+        if step_s is not None:
+            names = [n for n in names
+                     if abs(self.stations[n].step_s - step_s) <= CADENCE_TOLERANCE * self.stations[n].step_s]
+            if not names:
+                archived = sorted({self.stations[n].step_s for n in ([station] if station else self.stations)})
+                raise ValueError(f"Query cadence {step_s:g} s does not match the archive ({', '.join(f'{s:g} s' for s in archived)})")
+
+        candidates = []
+        for name in names:
+            idx = self.stations[name]
+            if idx.n < m + horizon:
+                continue
+            ex = exclude[1:] if exclude is not None and exclude[0] == name else None
+            starts, dist = idx.search(q, k, horizon, exclude=ex, weights=weights)
+            candidates.extend((d, name, int(i)) for d, i in zip(dist, starts))
+        candidates.sort(key=lambda c: c[0])
+        candidates = candidates[:k]
+
+        matches, futures, anchors = [], [], []
+        for d, name, i in candidates:
+            idx = self.stations[name]
+            end = i + m
+            future = idx.runup[end:end + horizon]
+            futures.append(future)
+            anchors.append(idx.runup[end - 1])
+            matches.append({
+                "station": name,
+                "start": float(idx.t[i]),
+                "end": float(idx.t[end - 1]),
+                "distance": round(float(d), 4),
+                "runup_m": round(float(idx.runup[end - 1]), 4),
+                "future_runup_m": np.round(future, 4).tolist(),
+                "peak_runup_m": round(float(future.max()), 4),
+                "cyclone": bool(idx.cyclone[i:end + horizon].any()),
+            })
+
+        out = {"window": m, "horizon": horizon, "k": len(matches), "matches": matches,
+               "step_s": self.stations[station].step_s if station is not None else None}
+        if futures:
+            futures = np.array(futures)
+            out["ensemble"] = self._ensemble(futures)
+            if runup_now is not None:
+                out["anchored"] = self._ensemble(np.maximum(
+                    futures - np.array(anchors)[:, None] + float(runup_now), 0.0))
+        else:
+            out["ensemble"] = None
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.queries += 1
+        self.query_ms += ms
+        out["query_ms"] = round(ms, 3)
+        return out
+
+    def query_history(self, station, end, window=DEFAULT_WINDOW, **kwargs):
+        """Analogs of the archived window at `station` ending at time `end`; the window itself is excluded."""
+        idx = self.stations[station]
+        x, start = idx.window(end, window)
+        exclude = (station, float(idx.t[start]), float(idx.t[start + window - 1]))
+        return self.query(x.T, exclude=exclude, **kwargs)
+
+    @staticmethod
+    def _ensemble(futures):
+        p10, p50, p90 = np.percentile(futures, [10, 50, 90], axis=0)
+        return {"mean_m": np.round(futures.mean(axis=0), 4).tolist(),
+                "p10_m": np.round(p10, 4).tolist(),
+                "p50_m": np.round(p50, 4).tolist(),
+                "p90_m": np.round(p90, 4).tolist()}
+
+    def get_stats(self):
+        return {
+            "fields": list(self.fields),
+            "digest": self.digest,
+            "built_at": self.built_at,
+            "queries": self.queries,
+            "avg_query_ms": round(self.query_ms / self.queries, 3) if self.queries else None,
+            "stations": {s: idx.get_stats() for s, idx in self.stations.items()},
+        }
+
+
+class CadenceBuffer:
+    """
+    Live readings averaged into consecutive `step_s` bins, the cadence of the
+    archive they are compared with. Only completed bins are returned; a
+    missing bin or a step back in time starts the series over.
+    """
+
+    def __init__(self, step_s, maxlen=240):
+        if step_s <= 0:
+            raise ValueError("step_s must be positive")
+        self.step_s = float(step_s)
+        self.bins = deque(maxlen=maxlen)
+        self.resets = 0
+        self._bin = None
+        self._sum = None
+        self._count = 0
+
+    def __len__(self):
+        return len(self.bins)
+
+    @property
+    def maxlen(self):
+        return self.bins.maxlen
+
+    def add(self, t, row):
+        b = math.floor(t / self.step_s)
+        if self._bin is not None and b != self._bin:
+            if b == self._bin + 1:
+                self.bins.append(self._sum / self._count)
+                self._bin = None
+            else:
+                self.clear()
+                self.resets += 1
+        if self._bin is None:
+            self._bin, self._sum, self._count = b, np.zeros(len(row)), 0
+        self._sum += row
+        self._count += 1
+
+    def clear(self):
+        self.bins.clear()
+        self._bin = None
+
+    def window(self, n):
+        """The last `n` completed bins as a (n, channels) array."""
+        if len(self.bins) < n:
+            raise ValueError(f"Only {len(self.bins)} of {n} bins at {self.step_s:g} s so far")
+        return np.array(list(self.bins)[-n:])
+
+    def get_stats(self):
+        return {"step_s": self.step_s, "bins": len(self.bins), "resets": self.resets}
+
+
+def analogs_from_env(environ=None):
+    """
+    AEGIS_ANALOGS=0 disables analog search.
+    AEGIS_ANALOG_SOURCES=<csv or dir>[,<csv or dir>...] sets the history to index;
+    default is the aggregated buoy CSV plus the recorder directory.
+    """
+    env = os.environ if environ is None else environ
+    if env.get("AEGIS_ANALOGS", "1") == "0":
+        return None
+    sources = env.get("AEGIS_ANALOG_SOURCES")
+    if sources:
+        paths = [p.strip() for p in sources.split(",") if p.strip()]
+    else:
+        root = os.path.dirname(DEFAULT_REPLAY_PATH)
+        paths = [DEFAULT_REPLAY_PATH, env.get("AEGIS_RECORDINGS_DIR") or os.path.join(root, "recordings")]
+    return AnalogIndex.from_files(paths)
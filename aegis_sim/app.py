@@ -9,6 +9,7 @@ from datetime import datetime
 from aegis_sim.engine import calculate_stockdon_runup, calculate_flood_risk
 from aegis_sim.inference import InferenceEngine
 from aegis_sim.drone import DroneSimulator
+from aegis_sim.inundation import InundationModel
 
 # Page Config
 st.set_page_config(
@@ -61,11 +62,16 @@ if 'history' not in st.session_state:
 if 'drone' not in st.session_state:
     st.session_state['drone'] = DroneSimulator(lat_start=34.01, lon_start=-118.50) # Santa Monica approx
     
+if 'inundation' not in st.session_state:
+    # Synthetic coastal DEM around the survey area (sea to the west)
+    st.session_state['inundation'] = InundationModel.synthetic((192, 192), bounds=(33.99, 34.03, -118.53, -118.47))
+
 if 'engine' not in st.session_state:
     st.session_state['engine'] = InferenceEngine() # Initializes DirectML check
 
 drone = st.session_state['drone']
 engine = st.session_state['engine']
+inundation = st.session_state['inundation']
 
 # --- Main Dashboard ---
 
@@ -73,47 +79,10 @@ engine = st.session_state['engine']
 placeholder_map = st.empty()
 placeholder_metrics = st.empty()
 
-# Mock Coastline Data (Grid of points) for visualization
-# Generate a simple grid around the drone start
-coast_lat = 34.01
-coast_lon = -118.50
-# Create a static grid for the "Digital Twin" terrain
-df_terrain = pd.DataFrame({
-    'lat': [coast_lat + np.random.uniform(-0.01, 0.01) for _ in range(100)],
-    'lon': [coast_lon + np.random.uniform(-0.01, 0.01) for _ in range(100)],
-    'height': [np.random.uniform(2, 8) for _ in range(100)] # Elevation
-})
-
 def run_mission_step():
     # 1. Get Drone Data
     try:
-        # We manually iterate the generator for one step per rerun if possible,
-        # but Streamlit runs the whole script. 
-        # Better: create a new generator or just call a method.
-        # Modified drone.py to have a `step()` method would be better, but generator works if we persist it?
-        # Generators cannot easily be pickled in session_state.
-        # Let's make a manual step here using the drone's internal state + time.
-        
-        # Simulating the generator logic manually for Streamlit's loop
-        t = time.time()
-        import math, random
-        radius = 0.005
-        angle = t * 0.5
-        lat = 34.01 + radius * math.sin(angle)
-        lon = -118.50 + radius * math.cos(angle)
-        
-        # Ocean Params
-        H0 = 2.0 + math.sin(t * 0.5) * 1.5
-        T = 10.0 + math.cos(t * 0.2) * 2.0
-        
-        telemetry = {
-            "latitude": lat,
-            "longitude": lon,
-            "wave_height": abs(H0),
-            "wave_period": abs(T),
-            "timestamp": datetime.now().strftime("%H:%M:%S")
-        }
-        
+        telemetry = drone.step()
     except Exception as e:
         st.error(f"Drone Link Lost: {e}")
         return
@@ -129,10 +98,8 @@ def run_mission_step():
     # Drone Position
     df_drone = pd.DataFrame([telemetry])
     
-    # Flood Layer (Dynamic Red Zone)
-    # We want to color our terrain points based on risk
-    # Simple logic: if point['height'] < R2 -> Red
-    df_terrain['color'] = df_terrain['height'].apply(lambda h: [200, 30, 0, 160] if h < R2 else [0, 255, 100, 160])
+    # Flood Layer: connected inundation extent at the run-up level (cached per 5 cm)
+    flood = inundation.polygons(R2)
     
     # 5. Render PyDeck
     deck = pdk.Deck(
@@ -144,17 +111,14 @@ def run_mission_step():
             pitch=50,
         ),
         layers=[
-            # Terrain / Risk Map
+            # Inundation extent
             pdk.Layer(
-                'ColumnLayer',
-                data=df_terrain,
-                get_position='[lon, lat]',
-                get_elevation='height',
-                elevation_scale=100,
-                radius=100,
-                get_fill_color='color', # Dynamic Color
+                'GeoJsonLayer',
+                data={"type": "FeatureCollection", "features": [flood]},
+                get_fill_color=[200, 30, 0, 140],
+                get_line_color=[255, 80, 40, 220],
+                line_width_min_pixels=1,
                 pickable=True,
-                auto_highlight=True,
             ),
             # Drone Position
             pdk.Layer(
@@ -166,7 +130,7 @@ def run_mission_step():
                 pickable=True,
             ),
         ],
-        tooltip={"html": "<b>Elevation:</b> {height}m"}
+        tooltip={"html": "<b>Flooded:</b> {flooded_km2} km² | <b>Max depth:</b> {max_depth_m} m"}
     )
     
     # 6. Update UI
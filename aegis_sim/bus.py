@@ -0,0 +1,321 @@
+"""
+AEGIS Telemetry Bus
+Local pub/sub that lets one tick-engine producer feed any number of stateless
+WebSocket gateway workers (e.g. `uvicorn --workers N`) with one world state.
+
+  InProcessBus   single process: producer and subscribers share asyncio queues
+                 (the default, and the stand-in used by tests)
+  UnixSocketBus  multi-worker: the worker that wins an flock() on
+                 `<path>.lock` becomes the producer and serves frames on a Unix
+                 socket; every other worker connects to it as a gateway.
+
+Frames are length-prefixed `topic \\0 body` byte strings. Bodies are
+pre-serialized once by the producer and forwarded verbatim. Gateways send
+operator commands upstream on the same socket, and reads of producer-only
+state as requests: a "request" frame carries an 8-byte id, and the producer
+answers that gateway alone with a "reply" frame under the same id.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import struct
+
+try:
+    import fcntl
+    HAVE_FCNTL = True
+except ImportError:
+    HAVE_FCNTL = False
+
+logger = logging.getLogger("Aegis.Bus")
+
+FRAME_HEADER = struct.Struct("!I")
+REQUEST_ID = struct.Struct("!Q")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+def encode_frame(topic, body):
+    data = topic.encode("utf-8") + b"\0" + body
+    return FRAME_HEADER.pack(len(data)) + data
+
+
+async def read_frame(reader):
+    (size,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"Oversized bus frame: {size} bytes")
+    topic, _, body = (await reader.readexactly(size)).partition(b"\0")
+    return topic.decode("utf-8"), body
+
+
+class Subscription:
+    """Bounded per-subscriber queue; when a consumer lags, the oldest frames are dropped."""
+
+    def __init__(self, bus, maxsize=64):
+        self._bus = bus
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self._bus._subscribers.discard(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+
+class InProcessBus:
+    """Producer and subscribers in the same process."""
+
+    kind = "inproc"
+
+    def __init__(self):
+        self.role = None
+        self.published = 0
+        self.commands_received = 0
+        self.requests_served = 0
+        self._subscribers = set()
+        self._commands = None
+        self._requests = None
+
+    async def start(self):
+        self._commands = asyncio.Queue()
+        self._requests = asyncio.Queue()
+        self.role = "producer"
+        return self.role
+
+    async def close(self):
+        pass
+
+    def subscribe(self, maxsize=64):
+        sub = Subscription(self, maxsize)
+        self._subscribers.add(sub)
+        return sub
+
+    def _deliver(self, topic, body):
+        for sub in list(self._subscribers):
+            sub.put((topic, body))
+
+    async def publish(self, topic, body):
+        """Fan a pre-serialized frame out to every subscriber (producer only)."""
+        self.published += 1
+        self._deliver(topic, body)
+
+    async def send_command(self, body):
+        """Forward an operator command to the producer."""
+        await self._commands.put(body)
+
+    async def next_command(self):
+        body = await self._commands.get()
+        self.commands_received += 1
+        return body
+
+    async def request(self, body, timeout=5.0):
+        """Ask the producer to answer `body` (gateway only); returns the reply body."""
+        raise RuntimeError("Only gateways send requests; the producer answers them locally")
+
+    async def next_request(self):
+        """Producer: wait for the next gateway request; returns (token, body) for reply()."""
+        token, body = await self._requests.get()
+        self.requests_served += 1
+        return token, body
+
+    def reply(self, token, body):
+        """Producer: answer the request identified by `token`."""
+
+    def get_stats(self):
+        return {
+            "kind": self.kind,
+            "role": self.role,
+            "published": self.published,
+            "commands_received": self.commands_received,
+            "requests_served": self.requests_served,
+            "local_subscribers": len(self._subscribers),
+            "subscriber_drops": sum(s.dropped for s in self._subscribers),
+        }
+
+
+class UnixSocketBus(InProcessBus):
+    """Cross-process bus over a Unix domain socket with flock-based producer election."""
+
+    kind = "unix"
+
+    def __init__(self, path, max_buffer_bytes=4 * 1024 * 1024, retry_s=0.5):
+        super().__init__()
+        if not HAVE_FCNTL:
+            raise RuntimeError("UnixSocketBus requires fcntl (POSIX only)")
+        self.path = path
+        self.max_buffer_bytes = max_buffer_bytes
+        self.retry_s = retry_s
+        self.gateway_drops = 0
+        self.upstream_connected = False
+        self._pending = {}
+        self._request_ids = itertools.count(1)
+        self._lock_fd = None
+        self._server = None
+        self._gateways = set()
+        self._upstream = None
+        self._client_task = None
+
+    def _try_lock(self):
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def start(self):
+        self._commands = asyncio.Queue()
+        self._requests = asyncio.Queue()
+        if self._try_lock():
+            # The lock proves no other producer is alive, so any socket file is stale.
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self._server = await asyncio.start_unix_server(self._serve_gateway, path=self.path)
+            self.role = "producer"
+        else:
+            self._client_task = asyncio.create_task(self._gateway_loop())
+            self.role = "gateway"
+        logger.info(f"Telemetry bus {self.path}: {self.role} (pid {os.getpid()})")
+        return self.role
+
+    async def _serve_gateway(self, reader, writer):
+        self._gateways.add(writer)
+        try:
+            while True:
+                topic, body = await read_frame(reader)
+                if topic == "command":
+                    await self._commands.put(body)
+                elif topic == "request":
+                    await self._requests.put(((writer, body[:REQUEST_ID.size]), body[REQUEST_ID.size:]))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._gateways.discard(writer)
+            writer.close()
+
+    async def _gateway_loop(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except (FileNotFoundError, ConnectionError):
+                await asyncio.sleep(self.retry_s)
+                continue
+            self._upstream = writer
+            self.upstream_connected = True
+            try:
+                while True:
+                    topic, body = await read_frame(reader)
+                    if topic == "reply":
+                        fut = self._pending.pop(body[:REQUEST_ID.size], None)
+                        if fut is not None and not fut.done():
+                            fut.set_result(body[REQUEST_ID.size:])
+                    else:
+                        self._deliver(topic, body)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                logger.warning("Lost connection to telemetry producer; reconnecting")
+            finally:
+                self._upstream = None
+                self.upstream_connected = False
+                for fut in self._pending.values():
+                    if not fut.done():
+                        fut.set_exception(ConnectionError("Lost connection to telemetry producer"))
+                self._pending.clear()
+                writer.close()
+            await asyncio.sleep(self.retry_s)
+
+    async def publish(self, topic, body):
+        if self.role != "producer":
+            raise RuntimeError("Only the producer publishes on the telemetry bus")
+        self.published += 1
+        self._deliver(topic, body)
+        frame = None
+        for writer in list(self._gateways):
+            # Never await a slow gateway: drop its frame if its socket buffer is backed up.
+            if writer.transport.get_write_buffer_size() > self.max_buffer_bytes:
+                self.gateway_drops += 1
+                continue
+            if frame is None:
+                frame = encode_frame(topic, body)
+            writer.write(frame)
+
+    async def send_command(self, body):
+        if self.role == "producer":
+            await self._commands.put(body)
+        elif self._upstream is not None:
+            self._upstream.write(encode_frame("command", body))
+            await self._upstream.drain()
+        else:
+            logger.warning("Dropping command: producer not connected")
+
+    async def request(self, body, timeout=5.0):
+        if self.role != "gateway":
+            return await super().request(body, timeout)
+        if self._upstream is None:
+            raise ConnectionError("Producer not connected")
+        rid = REQUEST_ID.pack(next(self._request_ids))
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[rid] = fut
+        try:
+            self._upstream.write(encode_frame("request", rid + body))
+            await self._upstream.drain()
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._pending.pop(rid, None)
+
+    def reply(self, token, body):
+        writer, rid = token
+        if not writer.is_closing():
+            writer.write(encode_frame("reply", rid + body))
+
+    async def close(self):
+        if self._client_task is not None:
+            self._client_task.cancel()
+        for writer in list(self._gateways):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats.update({
+            "path": self.path,
+            "gateways": len(self._gateways),
+            "gateway_drops": self.gateway_drops,
+            "upstream_connected": self.upstream_connected,
+            "pending_requests": len(self._pending),
+        })
+        return stats
+
+
+def bus_from_env(environ=None):
+    """
+    AEGIS_BUS  "inproc" (default, single worker) or "unix:/path/to/aegis.sock"
+    """
+    env = os.environ if environ is None else environ
+    spec = env.get("AEGIS_BUS", "inproc")
+    if spec == "inproc":
+        return InProcessBus()
+    if spec.startswith("unix:"):
+        return UnixSocketBus(spec[len("unix:"):])
+    raise ValueError(f"Unknown AEGIS_BUS: {spec}")
@@ -1,15 +1,55 @@
 import time
 import math
 import random
+import asyncio
 from datetime import datetime
 
+from aegis_sim.fleet import DroneFleet, M_PER_DEG
+
 class DroneSimulator:
+    """Single survey drone: one-drone DroneFleet plus simulated wave sensors."""
+
     def __init__(self, lat_start=34.0, lon_start=-118.0, speed=10.0):
         self.lat = lat_start
         self.lon = lon_start
         self.speed = speed
         self.start_time = time.time()
-        
+        self.fleet = DroneFleet()
+        self.fleet.add("drone-0", "Survey", lat_start, lon_start, altitude_m=50.0,
+                       speed_ms=speed, orbit_m=0.005 * M_PER_DEG)  # approx 500m orbit
+        self._last = None
+
+    def step(self, dt=None):
+        """
+        Advance the flight by `dt` seconds (default: wall time since the last
+        call) and return one telemetry sample. Safe to call from Streamlit reruns.
+        """
+        now = time.time()
+        if dt is None:
+            dt = 0.0 if self._last is None else now - self._last
+        self._last = now
+        self.fleet.step(dt)
+        t = now - self.start_time
+
+        # Simulate Wave Data (H0, T)
+        # Superposition of 2 sine waves + noise
+        base_wave = 2.0 + math.sin(t * 0.05) * 1.0 # 1m to 3m
+        period_wave = 10.0 + math.cos(t * 0.02) * 2.0 # 8s to 12s
+
+        # Random "Gust"
+        noise = random.uniform(-0.2, 0.2)
+
+        f = self.fleet
+        return {
+            "timestamp": datetime.now().strftime("%H:%M:%S"),
+            "latitude": float(f.lat[0]),
+            "longitude": float(f.lon[0]),
+            "altitude": round(float(f.altitude_m[0]), 1),
+            "wave_height": round(base_wave + noise, 2),
+            "wave_period": round(period_wave, 1),
+            "battery": round(float(f.battery[0]), 1),
+        }
+
     def stream_telemetry(self):
         """
         Yields a stream of dictionary data simulating drone sensor fusion.
@@ -17,37 +57,16 @@ class DroneSimulator:
         - Movement along a flight path.
         - Varying Ocean Conditions (Perlin-like noise).
         """
-        t = 0
         while True:
-            # Simulate flight path (Orbiting a point of interest)
-            # Simple circular path
-            radius = 0.005 # approx 500m
-            angle = t * 0.1
-            
-            lat_current = self.lat + radius * math.sin(angle)
-            lon_current = self.lon + radius * math.cos(angle)
-            
-            # Simulate Wave Data (H0, T)
-            # Superposition of 2 sine waves + noise
-            base_wave = 2.0 + math.sin(t * 0.05) * 1.0 # 1m to 3m
-            period_wave = 10.0 + math.cos(t * 0.02) * 2.0 # 8s to 12s
-            
-            # Random "Gust"
-            noise = random.uniform(-0.2, 0.2)
-            
-            yield {
-                "timestamp": datetime.now().strftime("%H:%M:%S"),
-                "latitude": lat_current,
-                "longitude": lon_current,
-                "altitude": 50.0 + math.sin(t*0.5)*2.0,
-                "wave_height": round(base_wave + noise, 2),
-                "wave_period": round(period_wave, 1),
-                "battery": max(0, 100 - t * 0.1)
-            }
-            
-            t += 1
+            yield self.step()
             time.sleep(1.0) # 1Hz refresh rate for simulation
 
+    async def astream_telemetry(self, interval=1.0):
+        """Async variant of stream_telemetry() for use inside an event loop."""
+        while True:
+            yield self.step()
+            await asyncio.sleep(interval)
+
 if __name__ == "__main__":
     drone = DroneSimulator()
     for data in drone.stream_telemetry():
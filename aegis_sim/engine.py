@@ -1,4 +1,6 @@
 import math
+import os
+import numpy as np
 
 def calculate_stockdon_runup(H0: float, T: float, beta_f: float) -> float:
     """
@@ -38,6 +40,58 @@ def calculate_stockdon_runup(H0: float, T: float, beta_f: float) -> float:
     # Physical sanity check: Run-up cannot be negative
     return max(0.0, R2)
 
+def calculate_stockdon_runup_array(H0, T, beta_f):
+    """
+    Vectorized R2% run-up: same formulation as calculate_stockdon_runup, evaluated
+    element-wise over broadcastable arrays of H0 [m], T [s] and beta_f.
+
+    Returns:
+        np.ndarray: R2% run-up [meters]; 0 wherever H0 <= 0 or T <= 0.
+    """
+    H0 = np.asarray(H0, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+    beta_f = np.asarray(beta_f, dtype=np.float64)
+    g = 9.81
+
+    L0 = (g * T * T) / (2 * math.pi)
+    HL = np.sqrt(np.maximum(H0 * L0, 0.0))
+    setup = 0.35 * beta_f * HL
+    swash = HL * np.sqrt(0.563 * beta_f * beta_f + 0.004)
+    R2 = 1.1 * (setup + swash / 2)
+    return np.where((H0 > 0) & (L0 > 0), np.maximum(R2, 0.0), 0.0)
+
+# Bulk run-up backend: None = exact formula, otherwise a RunupLUT.
+# AEGIS_RUNUP_LUT=/path/table.npy selects the table lazily, so spawned
+# forecast workers pick up the same memory-mapped file.
+_runup_lut = None
+_runup_lut_checked = False
+
+def use_runup_lut(lut):
+    """Route calculate_runup_bulk through `lut` (a RunupLUT), or back to the exact formula with None."""
+    global _runup_lut, _runup_lut_checked
+    _runup_lut = lut
+    _runup_lut_checked = True
+
+def get_runup_backend():
+    if not _runup_lut_checked:
+        path = os.environ.get("AEGIS_RUNUP_LUT")
+        if path:
+            from aegis_sim.runup_lut import load_or_build
+            use_runup_lut(load_or_build(path, float(os.environ.get("AEGIS_RUNUP_LUT_ERROR", 0.002))))
+        else:
+            use_runup_lut(None)
+    return _runup_lut
+
+def calculate_runup_bulk(H0, T, beta_f):
+    """
+    Run-up for bulk scoring paths (ensemble members, scenario batches, coastline sweeps):
+    the configured lookup table if one is selected, else calculate_stockdon_runup_array.
+    """
+    lut = get_runup_backend()
+    if lut is not None:
+        return lut.lookup(H0, T, beta_f)
+    return calculate_stockdon_runup_array(H0, T, beta_f)
+
 def calculate_flood_risk(runup_level: float, terrain_height: float) -> str:
     """
     Determines risk level based on run-up vs terrain height.
@@ -50,3 +104,4 @@ def calculate_flood_risk(runup_level: float, terrain_height: float) -> str:
         return "HIGH"      # Near breach
     else:
         return "SAFE"
+
@@ -0,0 +1,104 @@
+"""
+AEGIS Probabilistic Forecast Ensemble
+Draws M perturbed (H0, T, beta) trajectories and evaluates Stockdon run-up for
+the whole (M x steps) grid in one vectorized call, replacing the single noisy
+trajectory of the old scalar forecast loop.
+
+Perturbations:
+  H0    log-space random walk (uncertainty grows with lead time) + step noise
+  T     per-member offset
+  beta  per-member log-normal slope error (survey / profile uncertainty)
+"""
+
+import numpy as np
+
+from aegis_sim.engine import calculate_runup_bulk
+
+DEFAULT_MEMBERS = 200
+PERCENTILES = (10, 50, 90)
+
+
+def _percentiles(sorted_members, qs):
+    """Linear-interpolated percentiles along axis 0 of an already sorted array.
+    Equivalent to np.percentile but several times cheaper for small (M x steps) grids."""
+    n = sorted_members.shape[0]
+    out = []
+    for q in qs:
+        pos = q / 100.0 * (n - 1)
+        lo = int(pos)
+        hi = min(lo + 1, n - 1)
+        frac = pos - lo
+        out.append(sorted_members[lo] * (1.0 - frac) + sorted_members[hi] * frac)
+    return out
+
+
+def forecast_ensemble(base_H0, base_T, beta, wall_heights=None, members=DEFAULT_MEMBERS,
+                      hours=4, step_min=10, h0_drift=0.06, h0_noise=0.15, t_sigma=0.6,
+                      beta_sigma=0.1, seed=None, still_water=None):
+    """
+    Run an M-member run-up ensemble.
+
+    Args:
+        base_H0, base_T, beta: Current wave height [m], period [s] and beach slope.
+        wall_heights (dict): Optional {sector_name: wall_height_m} for exceedance odds.
+        members (int): Ensemble size M.
+        h0_drift: Std-dev of log(H0) random-walk increments per hour.
+        seed: RNG seed for reproducible runs (None = fresh entropy each call).
+        still_water: Optional still-water level [m] per step (e.g. predicted tide). Steps then
+            also carry tide_m and water_level_p10/_m/_p90, and exceedance uses total water level.
+
+    Returns:
+        dict with "steps" (per-lead-time P10/P50/P90 run-up and median wave height),
+        "exceedance" ({sector: P(max run-up over horizon > wall)}) and "members".
+    """
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(0, hours * 60, step_min, dtype=np.float64)
+    n_steps = minutes.size
+
+    # Deterministic storm envelope (the mean path of the previous scalar forecast)
+    storm_factor = 1.0 + 0.25 * np.sin(minutes * 0.015) + 0.08 * (minutes / 240)
+    t_path = base_T + np.sin(minutes * 0.01) * 1.2
+
+    dt_h = step_min / 60.0
+    walk = rng.normal(0.0, h0_drift * np.sqrt(dt_h), size=(members, n_steps))
+    walk[:, 0] = 0.0
+    H0 = base_H0 * storm_factor * np.exp(np.cumsum(walk, axis=1))
+    H0 += rng.uniform(-h0_noise, h0_noise, size=(members, n_steps))
+    np.maximum(H0, 0.3, out=H0)
+
+    T = np.maximum(4.0, t_path + rng.normal(0.0, t_sigma, size=(members, 1)))
+    betas = beta * rng.lognormal(0.0, beta_sigma, size=(members, 1))
+
+    runup = calculate_runup_bulk(H0, T, betas)
+    p10, p50, p90 = _percentiles(np.sort(runup, axis=0), PERCENTILES)
+    (h0_median,) = _percentiles(np.sort(H0, axis=0), (50,))
+
+    # Round as arrays and convert once: per-element round() on numpy scalars dominates otherwise.
+    columns = zip(minutes.astype(int).tolist(), np.round(h0_median, 2).tolist(),
+                  np.round(p10, 3).tolist(), np.round(p50, 3).tolist(), np.round(p90, 3).tolist())
+    steps = [
+        {"time_offset_min": m, "label": f"+{m}m", "wave_height": h,
+         "runup_m": r50, "runup_p10": r10, "runup_p90": r90}
+        for m, h, r10, r50, r90 in columns
+    ]
+
+    level = runup
+    if still_water is not None:
+        tide = np.asarray(still_water, dtype=np.float64)
+        if tide.shape != (n_steps,):
+            raise ValueError(f"still_water needs {n_steps} steps, got shape {tide.shape}")
+        level = runup + tide
+        # The tide is the same for every member, so percentiles shift by it exactly
+        for step, t, r10, r50, r90 in zip(steps, np.round(tide, 3).tolist(), np.round(p10 + tide, 3).tolist(),
+                                          np.round(p50 + tide, 3).tolist(), np.round(p90 + tide, 3).tolist()):
+            step.update(tide_m=t, water_level_p10=r10, water_level_m=r50, water_level_p90=r90)
+
+    exceedance = {}
+    if wall_heights:
+        names = list(wall_heights)
+        walls = np.array([wall_heights[n] for n in names], dtype=np.float64)
+        peak = level.max(axis=1)
+        probs = (peak[:, None] > walls[None, :]).mean(axis=0)
+        exceedance = dict(zip(names, np.round(probs, 3).tolist()))
+
+    return {"steps": steps, "exceedance": exceedance, "members": members}
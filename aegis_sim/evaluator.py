@@ -0,0 +1,150 @@
+"""
+AEGIS Shadow Forecast Evaluator
+Scores the live LSTM, physics and hybrid run-up forecasts against the run-up
+that is actually realised once each forecast's horizon arrives, and adapts
+the hybrid blend weight from that skill.
+
+  - Each forecast is stored as one pending entry per horizon in a per-station
+    min-heap keyed on target data time (issue time + horizon).
+  - observe(t, runup) pops every entry due at or before t and joins it with
+    the realised value, so each join is O(log n).
+  - Error statistics are exponentially weighted (MAE, RMSE, bias) per source
+    and horizon, using O(1) memory per horizon.
+  - The blend weight per horizon is the minimum-variance combination of the
+    LSTM and physics errors:
+        alpha* = (E[eP^2] - E[eL*eP]) / (E[eL^2] + E[eP^2] - 2 E[eL*eP])
+    clipped to [ALPHA_MIN, ALPHA_MAX]. The default alpha is used until a
+    horizon has MIN_SAMPLES joins.
+
+All times are data time (reading timestamps), so replayed history is scored
+at replay speed.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+
+SOURCES = ("lstm", "physics", "hybrid")
+DEFAULT_HORIZONS_H = (1, 2, 3, 4, 5, 6)
+DEFAULT_ALPHA = 0.6
+ALPHA_MIN, ALPHA_MAX = 0.05, 0.95
+MIN_SAMPLES = 30
+
+
+class EwmaError:
+    """Exponentially weighted MAE / RMSE / bias of a forecast error stream."""
+
+    __slots__ = ("decay", "count", "abs", "sq", "bias")
+
+    def __init__(self, decay):
+        self.decay = decay
+        self.count = 0
+        self.abs = 0.0
+        self.sq = 0.0
+        self.bias = 0.0
+
+    def update(self, err):
+        # Bias-corrected start: plain mean until the window is full, then EWMA.
+        self.count += 1
+        w = max(1.0 / self.count, 1.0 - self.decay)
+        self.abs += w * (abs(err) - self.abs)
+        self.sq += w * (err * err - self.sq)
+        self.bias += w * (err - self.bias)
+
+    def as_dict(self):
+        return {"n": self.count, "mae": round(self.abs, 4),
+                "rmse": round(math.sqrt(self.sq), 4), "bias": round(self.bias, 4)}
+
+
+class ShadowEvaluator:
+    def __init__(self, horizons_h=DEFAULT_HORIZONS_H, halflife=200, max_lag_s=1800.0,
+                 default_alpha=DEFAULT_ALPHA, adapt=True, max_pending=50000):
+        """
+        Args:
+            horizons_h: Lead time of each forecast element in hours (raw_forecast[i]).
+            halflife: Number of joins after which an error's weight halves.
+            max_lag_s: Pending entries whose first matching observation arrives later
+                than this after their target time are expired unscored (data gaps).
+            max_pending: Per-station cap; the earliest-due entries are expired beyond it.
+        """
+        self.horizons_h = tuple(horizons_h)
+        self.decay = 0.5 ** (1.0 / halflife)
+        self.max_lag_s = max_lag_s
+        self.max_pending = max_pending
+        self.default_alpha = default_alpha
+        self.adapt = adapt
+        self.errors = {(src, h): EwmaError(self.decay) for src in SOURCES for h in self.horizons_h}
+        # Per-horizon EWMA second moments of (lstm, physics) errors for the blend weight
+        self._cov = {h: [0.0, 0.0, 0.0] for h in self.horizons_h}
+        self._alpha = {h: default_alpha for h in self.horizons_h}
+        self._pending = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.issued = 0
+        self.joined = 0
+        self.expired = 0
+
+    def record_forecast(self, issued_at, lstm_forecast, physics_forecast, hybrid_forecast,
+                        station_id=""):
+        """Queue one forecast set; element i of each list is the horizons_h[i]-hour value."""
+        with self._lock:
+            heap = self._pending.setdefault(station_id, [])
+            for i, h in enumerate(self.horizons_h[:len(lstm_forecast)]):
+                preds = (lstm_forecast[i], physics_forecast[i], hybrid_forecast[i])
+                heapq.heappush(heap, (issued_at + h * 3600.0, next(self._seq), h, preds))
+            while len(heap) > self.max_pending:
+                heapq.heappop(heap)
+                self.expired += 1
+            self.issued += 1
+
+    def observe(self, data_time, realised_runup, station_id=""):
+        """Join every pending forecast for `station_id` that is due at `data_time`."""
+        with self._lock:
+            heap = self._pending.get(station_id)
+            while heap and heap[0][0] <= data_time:
+                target, _, h, preds = heapq.heappop(heap)
+                if data_time - target > self.max_lag_s:
+                    self.expired += 1
+                    continue
+                self._score(h, preds, realised_runup)
+
+    def _score(self, h, preds, truth):
+        e_lstm, e_phys, e_hyb = (p - truth for p in preds)
+        self.errors[("lstm", h)].update(e_lstm)
+        self.errors[("physics", h)].update(e_phys)
+        self.errors[("hybrid", h)].update(e_hyb)
+        self.joined += 1
+
+        n = self.errors[("lstm", h)].count
+        w = max(1.0 / n, 1.0 - self.decay)
+        cov = self._cov[h]
+        cov[0] += w * (e_lstm * e_lstm - cov[0])
+        cov[1] += w * (e_phys * e_phys - cov[1])
+        cov[2] += w * (e_lstm * e_phys - cov[2])
+        if self.adapt and n >= MIN_SAMPLES:
+            denom = cov[0] + cov[1] - 2.0 * cov[2]
+            if denom > 1e-12:
+                a = (cov[1] - cov[2]) / denom
+                self._alpha[h] = min(ALPHA_MAX, max(ALPHA_MIN, a))
+
+    def alpha(self):
+        """Per-horizon LSTM weight for predict_hybrid (the default until enough joins)."""
+        return [self._alpha[h] for h in self.horizons_h]
+
+    def pending_count(self):
+        return sum(len(heap) for heap in self._pending.values())
+
+    def get_stats(self):
+        skill = {}
+        for src in SOURCES:
+            skill[src] = {f"{h}h": self.errors[(src, h)].as_dict() for h in self.horizons_h}
+        return {
+            "issued": self.issued,
+            "joined": self.joined,
+            "expired": self.expired,
+            "pending": self.pending_count(),
+            "adaptive_alpha": self.adapt,
+            "alpha": {f"{h}h": round(self._alpha[h], 3) for h in self.horizons_h},
+            "skill": skill,
+        }
@@ -0,0 +1,116 @@
+"""
+AEGIS Stage Executor
+Moves blocking tick work off the asyncio event loop so WebSocket and REST
+handling stay responsive:
+  - a thread pool for ONNX Runtime inference and file I/O (both release the GIL)
+  - an optional spawn-based process pool for pure-Python physics / forecast work
+
+Functions sent to the process pool must be importable top-level functions
+(e.g. from aegis_sim.engine) with picklable arguments.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger("Aegis.Executor")
+
+
+class _PoolStats:
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_s = 0.0
+
+    def as_dict(self):
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "inflight": self.submitted - self.completed - self.failed,
+            "busy_s": round(self.busy_s, 3),
+        }
+
+
+class StageExecutor:
+    """Thread pool for GIL-releasing work plus an optional process pool for CPU work."""
+
+    def __init__(self, io_workers=4, cpu_workers=0):
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="aegis-io")
+        self.cpu_pool = self._make_cpu_pool() if cpu_workers > 0 else None
+        self.cpu_restarts = 0
+        self.stats = {"io": _PoolStats(), "cpu": _PoolStats()}
+
+    def _make_cpu_pool(self):
+        # spawn, not fork: the backend process already runs threads and an event loop
+        return ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    async def _submit(self, pool, kind, fn, *args, **kwargs):
+        stats = self.stats[kind]
+        stats.submitted += 1
+        start = time.perf_counter()
+        call = functools.partial(fn, *args, **kwargs)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, call)
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            stats.busy_s += time.perf_counter() - start
+        stats.completed += 1
+        return result
+
+    async def run_io(self, fn, *args, **kwargs):
+        """Run ONNX inference or blocking I/O on the thread pool."""
+        return await self._submit(self.io_pool, "io", fn, *args, **kwargs)
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        """Run pure-Python compute on the process pool (thread pool if none is configured)."""
+        if self.cpu_pool is None:
+            return await self._submit(self.io_pool, "io", fn, *args, **kwargs)
+        pool = self.cpu_pool
+        try:
+            return await self._submit(pool, "cpu", fn, *args, **kwargs)
+        except BrokenProcessPool:
+            # A worker died (OOM, signal); replace the pool once so later ticks recover.
+            if self.cpu_pool is pool:
+                logger.error("CPU worker pool broke; restarting it")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.cpu_pool = self._make_cpu_pool()
+                self.cpu_restarts += 1
+            raise
+
+    def shutdown(self, wait=False):
+        self.io_pool.shutdown(wait=wait, cancel_futures=True)
+        if self.cpu_pool is not None:
+            self.cpu_pool.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self):
+        return {
+            "io_workers": self.io_workers,
+            "cpu_workers": self.cpu_workers,
+            "cpu_restarts": self.cpu_restarts,
+            "io": self.stats["io"].as_dict(),
+            "cpu": self.stats["cpu"].as_dict(),
+        }
+
+
+def executor_from_env(environ=None):
+    """
+    AEGIS_IO_WORKERS   thread pool size (default 4)
+    AEGIS_CPU_WORKERS  process pool size; 0 disables it (default 0)
+    """
+    env = os.environ if environ is None else environ
+    return StageExecutor(
+        io_workers=int(env.get("AEGIS_IO_WORKERS", 4)),
+        cpu_workers=int(env.get("AEGIS_CPU_WORKERS", 0)),
+    )
@@ -0,0 +1,239 @@
+"""
+AEGIS Feature Engine
+Derived LSTM inputs shared by training and serving, so both see the same
+definition (no train/serve skew).
+
+The five raw sensors are followed by cyclone signals built from them:
+
+    pressure_tendency_hpa   p(t) - p(t - LAG_S)         fall ahead of a storm
+    pressure_anomaly_hpa    p(t) - slow EWMA of p       depth of the low
+    wave_height_max_m       rolling max of H over WINDOW_S (monotonic deque)
+    wave_height_range_m     rolling max - min of H
+    wave_height_mean_m      rolling mean of H (rolling sum)
+    wave_steepness          H / L0, L0 = g T^2 / 2 pi
+    wind_stress_pa          rho_air Cd(U) U^2, Cd as in aegis_sim/cyclone.py
+    wind_stress_ewma_pa     fast EWMA of the stress (sustained forcing)
+
+Windows, lags and EWMA time constants are durations in seconds on the
+readings' timestamps, not sample counts, so a 0.5 s live feed and the
+archive the LSTM is trained on describe the same physical quantities. The
+window holds the samples newer than t - WINDOW_S; the lagged pressure is the
+latest sample at least LAG_S old. An EWMA step over dt uses
+alpha = 1 - exp(-dt / tau). Before a window has filled, statistics use the
+samples seen so far, and EWMAs start at the first value.
+
+FeatureEngine.update() is the serving path: one O(1) amortized update per
+reading. FeatureEngine.transform() is the vectorized batch path for
+training, computed per station when `groups` is given. The two agree to
+rounding (tests/test_features.py).
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+from aegis_sim.cyclone import G, RHO_AIR, drag_coefficient
+from aegis_sim.ingest import SENSOR_FIELDS
+
+# Durations on the readings' timestamps [s], so every feed cadence computes the same quantities
+WINDOW_S = 6 * 3600.0
+LAG_S = 3 * 3600.0
+SLOW_TAU_S = 24 * 3600.0
+FAST_TAU_S = 3 * 3600.0
+DERIVED_FEATURES = (
+    "pressure_tendency_hpa", "pressure_anomaly_hpa",
+    "wave_height_max_m", "wave_height_range_m", "wave_height_mean_m",
+    "wave_steepness", "wind_stress_pa", "wind_stress_ewma_pa",
+)
+FEATURE_NAMES = tuple(SENSOR_FIELDS) + DERIVED_FEATURES
+_H, _T, _U, _P = (SENSOR_FIELDS.index(f) for f in ("wave_height_m", "period_s", "wind_speed_mps", "pressure_hpa"))
+# Re-add the rolling sum from scratch this often to stop float drift
+_RESYNC = 4096
+
+
+def _pointwise(h, T, U):
+    """Steepness (0 where T <= 0) and wind stress; plain arithmetic so scalars stay cheap."""
+    L0 = G * T * T / (2.0 * math.pi)
+    steepness = h * (L0 > 0) / (L0 + (L0 <= 0))
+    stress = RHO_AIR * drag_coefficient(U) * U * U
+    return steepness, stress
+
+
+def _ewma(x, t, tau):
+    """
+    y[0] = x[0], y[i] = y[i-1] + a_i (x[i] - y[i-1]) with a_i = 1 - exp(-(t[i] - t[i-1]) / tau);
+    vectorized in blocks short enough (in samples and in elapsed time) for exp(elapsed / tau).
+    """
+    y = np.empty_like(x)
+    if not len(x):
+        return y
+    y[0] = state = x[0]
+    a = -np.expm1(-np.diff(t) / tau)
+    s = 1
+    while s < len(x):
+        e = min(s + 256, int(np.searchsorted(t, t[s - 1] + 300.0 * tau, side="right")))
+        if e <= s + 1:
+            state = y[s] = state + a[s - 1] * (x[s] - state)
+            s += 1
+            continue
+        grow = np.exp((t[s:e] - t[s - 1]) / tau)
+        yb = (state + np.cumsum(a[s - 1:e - 1] * x[s:e] * grow)) / grow
+        y[s:e] = yb
+        state = yb[-1]
+        s = e
+    return y
+
+
+def _rolling(x, starts, fn):
+    """fn (np.maximum / np.minimum) over x[starts[i]:i + 1] for every i, from a sparse table."""
+    n = len(x)
+    levels = np.frexp(np.arange(n) - starts + 1)[1] - 1  # floor(log2(window length))
+    table = [x]
+    for level in range(1, int(levels.max()) + 1):
+        prev, step = table[-1], 1 << (level - 1)
+        table.append(fn(prev[:-step], prev[step:]))
+    out = np.empty(n)
+    for level in np.unique(levels):
+        i = np.flatnonzero(levels == level)
+        out[i] = fn(table[level][starts[i]], table[level][i - (1 << level) + 1])
+    return out
+
+
+def feature_columns(names, wanted=None):
+    """Indices of `wanted` (default: the raw sensors) within `names`; ValueError if any is missing."""
+    wanted = SENSOR_FIELDS if wanted is None else wanted
+    index = {n: i for i, n in enumerate(names)}
+    missing = [w for w in wanted if w not in index]
+    if missing:
+        raise ValueError(f"unknown features {missing}")
+    return [index[w] for w in wanted]
+
+
+class FeatureEngine:
+    """Incremental derived features for one station's stream."""
+
+    names = FEATURE_NAMES
+
+    def __init__(self, window_s=WINDOW_S, lag_s=LAG_S, slow_tau_s=SLOW_TAU_S, fast_tau_s=FAST_TAU_S):
+        self.window_s = window_s
+        self.lag_s = lag_s
+        self.slow_tau_s = slow_tau_s
+        self.fast_tau_s = fast_tau_s
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self._t = None
+        self._pressures = deque()  # (t, p), [0] = latest sample at least lag_s old
+        self._p_slow = None
+        self._stress_fast = None
+        self._hmax = deque()  # (t, h), values decreasing
+        self._hmin = deque()  # (t, h), values increasing
+        self._hwin = deque()  # (t, h)
+        self._hsum = 0.0
+        self._undo = None
+
+    def _expire(self, t):
+        """Drop samples that are out of the window (or lag) at time t; depends on t alone."""
+        old = t - self.lag_s
+        while len(self._pressures) > 1 and self._pressures[1][0] <= old:
+            self._pressures.popleft()
+        old = t - self.window_s
+        while self._hwin and self._hwin[0][0] <= old:
+            self._hsum -= self._hwin.popleft()[1]
+        while self._hmax and self._hmax[0][0] <= old:
+            self._hmax.popleft()
+        while self._hmin and self._hmin[0][0] <= old:
+            self._hmin.popleft()
+
+    def update(self, row, t):
+        """Consume one raw sensor row (SENSOR_FIELDS order) taken at epoch `t`; returns its full feature row."""
+        h, T, U, p = float(row[_H]), float(row[_T]), float(row[_U]), float(row[_P])
+        t = float(t)
+        self._expire(t)
+        # What revise() needs to take this update back: expiry depends on t only, so it is kept
+        undo_max, undo_min = [], []
+        self._undo = (t, self.n, self._t, self._p_slow, self._stress_fast, self._hsum, undo_max, undo_min)
+        dt = 0.0 if self._t is None else t - self._t
+        self._t = t
+        self.n += 1
+
+        self._pressures.append((t, p))
+        tendency = p - self._pressures[0][1]
+        self._p_slow = p if self._p_slow is None else \
+            self._p_slow - math.expm1(-dt / self.slow_tau_s) * (p - self._p_slow)
+
+        while self._hmax and self._hmax[-1][1] <= h:
+            undo_max.append(self._hmax.pop())
+        self._hmax.append((t, h))
+        while self._hmin and self._hmin[-1][1] >= h:
+            undo_min.append(self._hmin.pop())
+        self._hmin.append((t, h))
+        self._hwin.append((t, h))
+        self._hsum += h
+        if self.n % _RESYNC == 0:
+            self._hsum = math.fsum(v for _, v in self._hwin)
+
+        steepness, stress = _pointwise(h, T, U)
+        stress = float(stress)
+        self._stress_fast = stress if self._stress_fast is None else \
+            self._stress_fast - math.expm1(-dt / self.fast_tau_s) * (stress - self._stress_fast)
+        hmax, hmin = self._hmax[0][1], self._hmin[0][1]
+        return np.array([*(float(v) for v in row[:len(SENSOR_FIELDS)]),
+                         tendency, p - self._p_slow,
+                         hmax, hmax - hmin, self._hsum / len(self._hwin),
+                         float(steepness), stress, self._stress_fast])
+
+    def revise(self, row):
+        """Replace the most recent update with `row` (a late correction, same time); returns the new feature row."""
+        if self._undo is None:
+            raise RuntimeError("nothing to revise")
+        t, self.n, self._t, self._p_slow, self._stress_fast, self._hsum, undo_max, undo_min = self._undo
+        self._pressures.pop()
+        self._hwin.pop()
+        self._hmax.pop()
+        self._hmax.extend(reversed(undo_max))
+        self._hmin.pop()
+        self._hmin.extend(reversed(undo_min))
+        return self.update(row, t)
+
+    def transform(self, X, t, groups=None):
+        """
+        Batch features for raw rows X (N, 5) taken at epoch times t (N,), in
+        time order; with `groups` (e.g. station ids, length N) each group is
+        its own stream. Matches update() applied row by row.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        t = np.asarray(t, dtype=np.float64)
+        if groups is None:
+            return self._transform(X, t)
+        groups = np.asarray(groups)
+        out = np.empty((len(X), len(FEATURE_NAMES)))
+        for g in np.unique(groups):
+            idx = np.flatnonzero(groups == g)
+            out[idx] = self._transform(X[idx], t[idx])
+        return out
+
+    def _transform(self, X, t):
+        out = np.empty((len(X), len(FEATURE_NAMES)))
+        if not len(X):
+            return out
+        n_raw = len(SENSOR_FIELDS)
+        out[:, :n_raw] = X[:, :n_raw]
+        h, T, U, p = X[:, _H], X[:, _T], X[:, _U], X[:, _P]
+        i = np.arange(len(X))
+        lagged = np.maximum(np.searchsorted(t, t - self.lag_s, side="right") - 1, 0)
+        out[:, n_raw] = p - p[lagged]
+        out[:, n_raw + 1] = p - _ewma(p, t, self.slow_tau_s)
+        starts = np.searchsorted(t, t - self.window_s, side="right")
+        hmax = _rolling(h, starts, np.maximum)
+        out[:, n_raw + 2] = hmax
+        out[:, n_raw + 3] = hmax - _rolling(h, starts, np.minimum)
+        c = np.concatenate([[0.0], np.cumsum(h)])
+        out[:, n_raw + 4] = (c[i + 1] - c[starts]) / (i + 1 - starts)
+        steepness, stress = _pointwise(h, T, U)
+        out[:, n_raw + 5] = steepness
+        out[:, n_raw + 6] = stress
+        out[:, n_raw + 7] = _ewma(stress, t, self.fast_tau_s)
+        return out
@@ -0,0 +1,192 @@
+"""
+AEGIS Drone Fleet Engine
+Vectorized simulation of many survey drones, shared by the FastAPI backend
+and the Streamlit app.
+
+Fleet state lives in NumPy arrays (one element per drone), so step(dt)
+costs a handful of array operations whether the fleet has 4 drones or
+400. Flight model per status:
+
+  ACTIVE     orbit the drone's survey point; battery drains with speed
+  RETURNING  fly straight home at cruise speed (entered at low battery)
+  CHARGING   landed at home; battery recharges
+  STANDBY    landed and ready (entered when charged, or by configuration);
+             tops up on the pad and relaunches to ACTIVE whenever fewer than
+             `min_active` drones are on survey, best-charged first
+
+stream() is an async generator that yields fleet snapshots on a drift-free
+clock, for use from the asyncio backend.
+"""
+
+import asyncio
+import math
+
+import numpy as np
+
+STATUSES = ("ACTIVE", "STANDBY", "RETURNING", "CHARGING")
+ACTIVE, STANDBY, RETURNING, CHARGING = range(4)
+
+M_PER_DEG = 111_320.0
+CRUISE_ALT_M = 100.0
+CRUISE_SPEED_MS = 6.0
+DRAIN_PCT_PER_S = 0.02        # hover drain; grows with airspeed
+CHARGE_PCT_PER_S = 0.5
+RETURN_AT_PCT = 20.0
+RESUME_AT_PCT = 95.0
+HOME_RADIUS_M = 15.0
+
+
+class DroneFleet:
+    def __init__(self, seed=None, min_active=None):
+        """`min_active` drones are kept on survey; default: as many as were added ACTIVE."""
+        self.rng = np.random.default_rng(seed)
+        self._min_active = min_active
+        self._configured_active = 0
+        self.ids = []
+        self.names = []
+        f = np.zeros(0)
+        self.lat, self.lon, self.home_lat, self.home_lon = f.copy(), f.copy(), f.copy(), f.copy()
+        self.altitude_m, self.speed_ms, self.battery = f.copy(), f.copy(), f.copy()
+        self.orbit_m, self.phase, self.signal_dbm = f.copy(), f.copy(), f.copy()
+        self.status = np.zeros(0, dtype=np.int8)
+        self.steps = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def min_active(self):
+        return self._configured_active if self._min_active is None else self._min_active
+
+    def add(self, id, name, lat, lon, status="ACTIVE", battery=100.0, altitude_m=None,
+            speed_ms=None, orbit_m=300.0, signal_dbm=-40.0, home_lat=None, home_lon=None):
+        """Add one drone; home (default: the start position) is also its survey point."""
+        code = STATUSES.index(status)
+        self._configured_active += code == ACTIVE
+        home_lat = lat if home_lat is None else home_lat
+        home_lon = lon if home_lon is None else home_lon
+        airborne = code in (ACTIVE, RETURNING)
+        if altitude_m is None:
+            altitude_m = CRUISE_ALT_M if airborne else 0.0
+        if speed_ms is None:
+            speed_ms = CRUISE_SPEED_MS if airborne else 0.0
+        self.ids.append(id)
+        self.names.append(name)
+        for attr, value in (("lat", lat), ("lon", lon), ("home_lat", home_lat), ("home_lon", home_lon),
+                            ("altitude_m", altitude_m), ("speed_ms", speed_ms),
+                            ("battery", battery), ("orbit_m", orbit_m),
+                            ("phase", self.rng.uniform(0, 2 * math.pi)), ("signal_dbm", signal_dbm)):
+            setattr(self, attr, np.append(getattr(self, attr), float(value)))
+        self.status = np.append(self.status, np.int8(code))
+
+    def add_random(self, n, center_lat, center_lon, spread_deg=0.05, prefix="drone-sim"):
+        """Add `n` active drones scattered around a point (load tests, large deployments)."""
+        base = len(self)
+        for i in range(n):
+            self.add(f"{prefix}-{base + i}", f"Sim-{base + i}",
+                     center_lat + self.rng.uniform(-spread_deg, spread_deg),
+                     center_lon + self.rng.uniform(-spread_deg, spread_deg),
+                     battery=self.rng.uniform(40, 100), orbit_m=self.rng.uniform(150, 600))
+
+    @classmethod
+    def from_records(cls, records, seed=None, min_active=None):
+        """Build a fleet from backend-style drone dicts (id, name, status, battery, lat, lon, home_lat, ...)."""
+        fleet = cls(seed, min_active)
+        for d in records:
+            fleet.add(d["id"], d["name"], d["lat"], d["lon"], status=d.get("status", "ACTIVE"),
+                      battery=d.get("battery", 100.0), altitude_m=d.get("altitude_m"),
+                      speed_ms=d.get("speed_ms"), signal_dbm=d.get("signal_dbm", -40.0),
+                      home_lat=d.get("home_lat"), home_lon=d.get("home_lon"))
+        return fleet
+
+    def step(self, dt):
+        """Advance every drone by `dt` seconds."""
+        n = len(self)
+        if n == 0 or dt <= 0:
+            return
+        rng = self.rng
+        status = self.status
+        active = status == ACTIVE
+        returning = status == RETURNING
+        charging = status == CHARGING
+        on_pad = charging | (status == STANDBY)
+        coslat = np.cos(np.radians(self.home_lat))
+
+        # ACTIVE: orbit the survey point; speed and altitude wander within limits
+        self.speed_ms[active] = np.clip(self.speed_ms[active] + rng.normal(0, 0.3, active.sum()) * dt, 2.0, 12.0)
+        self.altitude_m[active] = np.clip(self.altitude_m[active] + rng.normal(0, 1.5, active.sum()) * dt,
+                                          40.0, 150.0)
+        self.phase[active] += self.speed_ms[active] / self.orbit_m[active] * dt
+        r_deg = self.orbit_m / M_PER_DEG
+        self.lat = np.where(active, self.home_lat + r_deg * np.sin(self.phase), self.lat)
+        self.lon = np.where(active, self.home_lon + r_deg * np.cos(self.phase) / coslat, self.lon)
+
+        # RETURNING: straight line home at cruise speed, then land and charge
+        dy = (self.home_lat - self.lat) * M_PER_DEG
+        dx = (self.home_lon - self.lon) * M_PER_DEG * coslat
+        dist = np.hypot(dx, dy)
+        move = np.minimum(dist, CRUISE_SPEED_MS * dt)
+        frac = np.where(dist > 0, move / np.maximum(dist, 1e-9), 0.0)
+        self.lat = np.where(returning, self.lat + frac * (self.home_lat - self.lat), self.lat)
+        self.lon = np.where(returning, self.lon + frac * (self.home_lon - self.lon), self.lon)
+        self.speed_ms[returning] = CRUISE_SPEED_MS
+        landed = returning & (dist - move <= HOME_RADIUS_M)
+
+        # Battery: drain in the air, recharge on the pad
+        airborne = active | returning
+        drain = DRAIN_PCT_PER_S * (1.0 + self.speed_ms / 10.0) * dt
+        self.battery = np.where(airborne, self.battery - drain, self.battery)
+        self.battery = np.where(on_pad, self.battery + CHARGE_PCT_PER_S * dt, self.battery)
+        np.clip(self.battery, 0.0, 100.0, out=self.battery)
+
+        status[active & (self.battery <= RETURN_AT_PCT)] = RETURNING
+        status[landed] = CHARGING
+        status[charging & (self.battery >= RESUME_AT_PCT)] = STANDBY
+        grounded = (status == CHARGING) | (status == STANDBY)
+        self.altitude_m[grounded] = 0.0
+        self.speed_ms[grounded] = 0.0
+
+        # Relaunch charged drones while the survey is short-handed
+        short = self.min_active - int(np.count_nonzero(status == ACTIVE))
+        if short > 0:
+            ready = np.flatnonzero((status == STANDBY) & (self.battery >= RESUME_AT_PCT))
+            launch = ready[np.argsort(-self.battery[ready], kind="stable")[:short]]
+            status[launch] = ACTIVE
+            self.altitude_m[launch] = CRUISE_ALT_M
+            self.speed_ms[launch] = CRUISE_SPEED_MS
+
+        # Link budget: falls off with distance from the home station
+        dist_home = np.hypot((self.lat - self.home_lat) * M_PER_DEG,
+                             (self.lon - self.home_lon) * M_PER_DEG * coslat)
+        self.signal_dbm = -30.0 - 20.0 * np.log10(1.0 + dist_home / 50.0) + rng.normal(0, 1.0, n)
+        self.steps += 1
+
+    def snapshot(self):
+        """Backend payload records: one dict per drone."""
+        kbps = np.where(self.status == ACTIVE, np.clip((self.signal_dbm + 90.0) / 4.0, 1, 20), 0)
+        cols = zip(self.ids, self.names, self.status.tolist(), np.round(self.battery, 1).tolist(),
+                   np.round(self.altitude_m, 1).tolist(), np.round(self.speed_ms, 2).tolist(),
+                   np.round(self.lat, 6).tolist(), np.round(self.lon, 6).tolist(),
+                   np.round(self.signal_dbm).astype(int).tolist(), kbps.astype(int).tolist())
+        return [
+            {"id": i, "name": name, "status": STATUSES[s], "battery": b, "altitude_m": alt,
+             "speed_ms": spd, "lat": la, "lon": lo, "signal_dbm": sig, "data_rate": f"{k}kb/s"}
+            for i, name, s, b, alt, spd, la, lo, sig, k in cols
+        ]
+
+    def get_stats(self):
+        counts = np.bincount(self.status, minlength=len(STATUSES))
+        return {"drones": len(self), "steps": self.steps, "min_active": self.min_active,
+                **{s.lower(): int(c) for s, c in zip(STATUSES, counts)}}
+
+    async def stream(self, interval=1.0):
+        """Async generator: step the fleet every `interval` seconds and yield its snapshot."""
+        loop = asyncio.get_running_loop()
+        deadline = last = loop.time()
+        while True:
+            now = loop.time()
+            self.step(now - last)
+            last = now
+            yield self.snapshot()
+            deadline += interval
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
@@ -2,24 +2,44 @@
 AEGIS Inference Engine
 Supports ONNX DirectML inference for YOLO and LSTM models.
 Falls back to physics-only when no trained model is present.
+
+onnxruntime is imported on first load(), not at module import, and
+InferenceEngine(lazy=True) defers provider discovery and session creation
+so a server can accept connections first and load models in the background.
 """
 
 import numpy as np
+import hashlib
+import importlib.util
 import json
 import os
 import math
 import random
 import logging
+import threading
+import time
+
+from aegis_sim.features import FEATURE_NAMES, feature_columns
 
-try:
-    import onnxruntime as ort
-    HAVE_ORT = True
-except ImportError:
-    HAVE_ORT = False
+HAVE_ORT = importlib.util.find_spec("onnxruntime") is not None
+ort = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Aegis.Inference")
 
+
+def _import_ort():
+    """Import onnxruntime on first use; returns the module or None."""
+    global ort, HAVE_ORT
+    if ort is None and HAVE_ORT:
+        try:
+            import onnxruntime
+            ort = onnxruntime
+        except ImportError as e:
+            logger.error(f"onnxruntime is installed but failed to import: {e}")
+            HAVE_ORT = False
+    return ort
+
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_DIR = os.path.join(ROOT, "models")
 LSTM_ONNX = os.path.join(MODEL_DIR, "aegis_lstm.onnx")
@@ -27,12 +47,95 @@ SCALER_PATH = os.path.join(MODEL_DIR, "scaler_params.json")
 SCALE_PATH = os.path.join(MODEL_DIR, "onnx_scale.json")
 
 
+class LSTMModel:
+    """One loaded LSTM version: session, scalers and provenance. Never mutated after load,
+    so a tick that grabbed a reference keeps a consistent model across a swap."""
+
+    def __init__(self, session, scaler_params, target_scale, info):
+        self.session = session
+        self.scaler_params = scaler_params
+        self.target_scale = target_scale
+        self.input_name = session.get_inputs()[0].name
+        self.output_name = session.get_outputs()[0].name
+        self.info = info
+
+
+def _model_files(model_dir):
+    onnx_path = os.path.join(model_dir, os.path.basename(LSTM_ONNX))
+    return [onnx_path, onnx_path + ".data",
+            os.path.join(model_dir, os.path.basename(SCALER_PATH)),
+            os.path.join(model_dir, os.path.basename(SCALE_PATH))]
+
+
+def model_fingerprint(model_dir=MODEL_DIR):
+    """Cheap change detector: (name, size, mtime_ns) of every LSTM artefact present."""
+    fp = []
+    for path in _model_files(model_dir):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        fp.append((os.path.basename(path), st.st_size, st.st_mtime_ns))
+    return tuple(fp)
+
+
 class InferenceEngine:
-    """Unified inference engine supporting LSTM flood forecasting and YOLO detection."""
+    """Unified inference engine supporting LSTM flood forecasting and YOLO detection.
+
+    The LSTM lives in a small registry: reload_lstm() builds and warms a new version
+    off to the side and swaps it in with one reference assignment; the previous
+    version is kept for rollback_lstm(). check_for_update() polls the model files.
+    """
 
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, lazy=False, model_dir=MODEL_DIR):
         self.providers = []
-        if HAVE_ORT:
+        self.use_directml = False
+        self.execution_providers = []
+        self.model_path = model_path
+        self.model_dir = model_dir
+        self.session = None
+        self._lstm = None
+        self._previous_lstm = None
+        self._reload_lock = threading.Lock()
+        self._seen_fingerprint = None
+        self._pending_fingerprint = None
+        self.reloads = 0
+        self.rollbacks = 0
+        self.last_reload_error = None
+        self.state = "pending"
+        self.load_s = None
+        if not lazy:
+            self.load()
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    @property
+    def lstm_loaded(self):
+        return self._lstm is not None
+
+    @property
+    def lstm_version(self):
+        return self._lstm.info["version"] if self._lstm else None
+
+    @property
+    def lstm_session(self):
+        return self._lstm.session if self._lstm else None
+
+    @property
+    def scaler_params(self):
+        return self._lstm.scaler_params if self._lstm else None
+
+    @property
+    def target_scale(self):
+        return self._lstm.target_scale if self._lstm else None
+
+    def load(self):
+        """Discover providers and open the ONNX sessions (blocking; fine on a worker thread)."""
+        start = time.perf_counter()
+        self.state = "loading"
+        if _import_ort() is not None:
             try:
                 self.providers = ort.get_available_providers()
             except Exception:
@@ -47,56 +150,151 @@ class InferenceEngine:
         else:
             self.execution_providers = []
 
-        self.model_path = model_path
-        self.session = None
         if self.model_path and HAVE_ORT:
             try:
                 self.session = ort.InferenceSession(self.model_path, providers=self.execution_providers)
             except Exception as e:
                 logger.error(f"Failed to load model: {e}")
 
-        self.lstm_session = None
-        self.lstm_loaded = False
-        self.scaler_params = None
-        self.target_scale = None
-        self._load_lstm()
+        if HAVE_ORT and os.path.exists(os.path.join(self.model_dir, os.path.basename(LSTM_ONNX))):
+            try:
+                self.reload_lstm()
+            except Exception as e:
+                logger.error(f"LSTM model load failed: {e}")
+        self.load_s = time.perf_counter() - start
+        self.state = "ready"
+        return self
+
+    def _build_lstm(self, model_dir):
+        """Load scalers and session for `model_dir`, then warm up and sanity-check it."""
+        onnx_path, data_path, scaler_path, scale_path = _model_files(model_dir)
+        fingerprint = model_fingerprint(model_dir)
+        scaler_params = target_scale = None
+        if os.path.exists(scaler_path):
+            with open(scaler_path, "r") as f:
+                scaler_params = json.load(f)
+        if os.path.exists(scale_path):
+            with open(scale_path, "r") as f:
+                target_scale = json.load(f)
+        # Refuse a model trained on inputs the feature engine cannot compute
+        feature_columns(FEATURE_NAMES, (scaler_params or {}).get("feature_cols"))
+
+        digest = hashlib.sha256()
+        for path in (onnx_path, data_path, scaler_path, scale_path):
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    digest.update(f.read())
 
-    def _load_lstm(self):
-        if not HAVE_ORT or not os.path.exists(LSTM_ONNX):
-            return
+        options = ort.SessionOptions()
+        # The exported graph records a static output shape of (1, horizon); batched
+        # runs are valid (dynamic axis) but would log a shape warning per call.
+        options.log_severity_level = 3
+        session = ort.InferenceSession(onnx_path, sess_options=options,
+                                       providers=self.execution_providers)
+
+        # Warm-up: the first run allocates arenas and picks kernels; do it before the swap
+        # so the first live tick on the new version is not a latency spike.
+        seq_len = (target_scale or {}).get("seq_len", 24)
+        n_features = len((scaler_params or {}).get("feature_cols", [])) or 5
+        model = LSTMModel(session, scaler_params, target_scale, {})
+        warm_start = time.perf_counter()
+        out = session.run([model.output_name],
+                          {model.input_name: np.zeros((1, seq_len, n_features), dtype=np.float32)})[0]
+        if not np.all(np.isfinite(out)):
+            raise ValueError("Warm-up produced non-finite output")
+        model.info = {
+            "version": digest.hexdigest()[:12],
+            "path": onnx_path,
+            "loaded_at": time.time(),
+            "warmup_ms": round((time.perf_counter() - warm_start) * 1000.0, 3),
+            "horizon": int(out.shape[-1]),
+            "features": (scaler_params or {}).get("feature_cols"),
+        }
+        return model, fingerprint
+
+    def reload_lstm(self, model_dir=None):
+        """
+        Build, warm up and atomically swap in the LSTM from `model_dir` (default: the
+        engine's model directory). The outgoing version is kept for rollback.
+        Returns the active version info; raises (keeping the current model) on failure.
+        """
+        if _import_ort() is None:
+            raise RuntimeError("onnxruntime is not available")
+        with self._reload_lock:
+            try:
+                model, fingerprint = self._build_lstm(model_dir or self.model_dir)
+            except Exception as e:
+                self.last_reload_error = f"{type(e).__name__}: {e}"
+                raise
+            self._seen_fingerprint = fingerprint
+            self.last_reload_error = None
+            current = self._lstm
+            if current is not None and current.info["version"] == model.info["version"]:
+                return current.info
+            self._previous_lstm, self._lstm = current, model
+            if current is not None:
+                self.reloads += 1
+            logger.info(f"LSTM model {model.info['version']} active "
+                        f"(warm-up {model.info['warmup_ms']} ms)")
+            return model.info
+
+    def rollback_lstm(self):
+        """Swap the previous LSTM version back in. Returns its info, or None if there is none."""
+        with self._reload_lock:
+            if self._previous_lstm is None:
+                return None
+            self._lstm, self._previous_lstm = self._previous_lstm, self._lstm
+            self.rollbacks += 1
+            logger.warning(f"Rolled LSTM back to {self._lstm.info['version']}")
+            return self._lstm.info
+
+    def check_for_update(self):
+        """
+        Poll the model files; reload once a changed fingerprint has been stable for two
+        consecutive polls (so a half-copied file is never loaded). Returns True on swap.
+        """
+        fingerprint = model_fingerprint(self.model_dir)
+        if not fingerprint or fingerprint == self._seen_fingerprint:
+            self._pending_fingerprint = None
+            return False
+        if fingerprint != self._pending_fingerprint:
+            self._pending_fingerprint = fingerprint
+            return False
+        self._pending_fingerprint = None
+        before = self._lstm.info["version"] if self._lstm else None
         try:
-            self.lstm_session = ort.InferenceSession(LSTM_ONNX, providers=self.execution_providers)
-            self.lstm_loaded = True
+            info = self.reload_lstm()
         except Exception as e:
-            logger.error(f"LSTM model load failed: {e}")
-            return
-
-        if os.path.exists(SCALER_PATH):
-            with open(SCALER_PATH, "r") as f:
-                self.scaler_params = json.load(f)
-        if os.path.exists(SCALE_PATH):
-            with open(SCALE_PATH, "r") as f:
-                self.target_scale = json.load(f)
+            # Remember the broken files so the same bad artefact is not retried every poll.
+            self._seen_fingerprint = fingerprint
+            logger.error(f"LSTM hot reload failed, keeping current model: {e}")
+            return False
+        return info["version"] != before
 
-    def predict_lstm(self, sequence):
+    def predict_lstm(self, sequence, feature_names=None):
         """
         Run LSTM inference on a sensor sequence.
         sequence: numpy array of shape (seq_len, n_features)
+        feature_names: column names of `sequence` when it holds more than the
+        model's inputs (e.g. FeatureEngine rows); the model's feature_cols are
+        selected from it, so a hot-swapped model always gets its own inputs.
         Returns dict with runup forecasts and confidence.
         """
-        if not self.lstm_loaded or self.lstm_session is None:
+        model = self._lstm
+        if feature_names is not None:
+            wanted = (model.scaler_params or {}).get("feature_cols") if model is not None else None
+            sequence = np.asarray(sequence)[:, feature_columns(feature_names, wanted)]
+        if model is None:
             return self._mock_lstm_prediction(sequence)
         try:
-            scaled = self._scale_features(sequence)
+            scaled = self._scale_features(sequence, model.scaler_params)
             input_data = scaled.reshape(1, *scaled.shape).astype(np.float32)
-            input_name = self.lstm_session.get_inputs()[0].name
-            output_name = self.lstm_session.get_outputs()[0].name
-            result = self.lstm_session.run([output_name], {input_name: input_data})[0]
+            result = model.session.run([model.output_name], {model.input_name: input_data})[0]
 
             forecast = result[0]
-            if self.target_scale:
-                t_min = self.target_scale["target_min"]
-                t_max = self.target_scale["target_max"]
+            if model.target_scale:
+                t_min = model.target_scale["target_min"]
+                t_max = model.target_scale["target_max"]
                 forecast = forecast * (t_max - t_min) + t_min
             forecast = np.clip(forecast, 0, 15)
 
@@ -110,17 +308,35 @@ class InferenceEngine:
                 "raw_forecast": [round(float(v), 3) for v in forecast],
                 "confidence": round(confidence, 3),
                 "source": "LSTM-ONNX",
+                "model_version": model.info["version"],
                 "device": self.get_device_status(),
             }
         except Exception as e:
             logger.warning(f"LSTM inference failed: {e}")
             return self._mock_lstm_prediction(sequence)
 
-    def _scale_features(self, sequence):
-        if self.scaler_params is None:
+    def predict_lstm_batch(self, sequences):
+        """
+        Batched LSTM inference for bulk scoring and benchmarks.
+        sequences: numpy array of shape (batch, seq_len, n_features)
+        Returns (batch, horizon) run-up forecasts in meters, or None if no model is loaded.
+        """
+        model = self._lstm
+        if model is None:
+            return None
+        scaled = self._scale_features(np.asarray(sequences), model.scaler_params).astype(np.float32)
+        forecast = model.session.run([model.output_name], {model.input_name: scaled})[0]
+        if model.target_scale:
+            t_min = model.target_scale["target_min"]
+            t_max = model.target_scale["target_max"]
+            forecast = forecast * (t_max - t_min) + t_min
+        return np.clip(forecast, 0, 15)
+
+    def _scale_features(self, sequence, scaler_params=None):
+        if scaler_params is None:
             return sequence
-        mins = np.array(self.scaler_params["min"])
-        maxs = np.array(self.scaler_params["max"])
+        mins = np.array(scaler_params["min"])
+        maxs = np.array(scaler_params["max"])
         ranges = maxs - mins
         ranges[ranges == 0] = 1.0
         return (sequence - mins) / ranges
@@ -152,14 +368,23 @@ class InferenceEngine:
             "source": "Physics-Mock", "device": self.get_device_status(),
         }
 
-    def predict_hybrid(self, sequence, physics_runup, alpha=0.6):
-        """Blend physics (Stockdon) and LSTM predictions."""
-        lstm_pred = self.predict_lstm(sequence)
+    def predict_hybrid(self, sequence, physics_runup, alpha=0.6, lstm_pred=None):
+        """
+        Blend physics (Stockdon) and LSTM predictions. Pass `lstm_pred` to reuse a prior inference.
+        `alpha` is the LSTM weight: one value, or one per forecast horizon.
+        """
+        if lstm_pred is None:
+            lstm_pred = self.predict_lstm(sequence)
+        n = len(lstm_pred["raw_forecast"])
+        alphas = list(alpha) if isinstance(alpha, (list, tuple)) else [alpha] * n
+        alphas += [alphas[-1]] * (n - len(alphas))
         hybrid_forecast = []
+        physics_forecast = []
         for i, lstm_val in enumerate(lstm_pred["raw_forecast"]):
             physics_proj = physics_runup * (1 + 0.015 * i)
-            hybrid = alpha * lstm_val + (1 - alpha) * physics_proj
+            hybrid = alphas[i] * lstm_val + (1 - alphas[i]) * physics_proj
             hybrid_forecast.append(round(hybrid, 3))
+            physics_forecast.append(round(physics_proj, 3))
 
         max_hybrid = max(hybrid_forecast) if hybrid_forecast else physics_runup
         if max_hybrid > 2.5:
@@ -175,7 +400,8 @@ class InferenceEngine:
             "hybrid_risk": hybrid_risk,
             "lstm": lstm_pred,
             "physics_runup": physics_runup,
-            "alpha": alpha,
+            "physics_forecast": physics_forecast,
+            "alpha": [round(a, 3) for a in alphas] if isinstance(alpha, (list, tuple)) else alpha,
         }
 
     def predict_dummy(self, data_input):
@@ -191,11 +417,18 @@ class InferenceEngine:
 
     def get_model_status(self):
         return {
+            "state": self.state,
+            "load_s": round(self.load_s, 3) if self.load_s is not None else None,
             "inference_device": self.get_device_status(),
             "onnx_providers": self.providers,
             "directml_available": self.use_directml,
             "yolo_loaded": self.session is not None,
             "lstm_loaded": self.lstm_loaded,
-            "lstm_model_path": LSTM_ONNX if self.lstm_loaded else None,
+            "lstm_model_path": self._lstm.info["path"] if self._lstm else None,
             "scaler_loaded": self.scaler_params is not None,
+            "lstm_version": self._lstm.info if self._lstm else None,
+            "lstm_previous_version": self._previous_lstm.info if self._previous_lstm else None,
+            "lstm_reloads": self.reloads,
+            "lstm_rollbacks": self.rollbacks,
+            "lstm_last_reload_error": self.last_reload_error,
         }
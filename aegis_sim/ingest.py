@@ -0,0 +1,375 @@
+"""
+AEGIS Ingest Adapters
+Pluggable telemetry sources for the backend tick loop: the built-in synthetic
+generator, a time-accelerated replay of archived buoy / recorder CSV files,
+and a UDP/TCP line-protocol listener that stands in for live buoys.
+
+Every source yields normalized readings:
+    {"timestamp": <epoch seconds, data time>, "station_id": str,
+     "wave_height_m", "period_s", "temp_c", "wind_speed_mps", "pressure_hpa"}
+"""
+
+import asyncio
+import csv
+import glob
+import json
+import logging
+import math
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger("Aegis.Ingest")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_REPLAY_PATH = os.path.join(ROOT, "data", "aggregated_buoy_telemetry.csv")
+# The buoy archive interleaves every coastal station; the backend scores one city
+DEFAULT_REPLAY_STATION = "BUOY-MUM-01"
+
+SENSOR_FIELDS = ["wave_height_m", "period_s", "temp_c", "wind_speed_mps", "pressure_hpa"]
+SENSOR_DEFAULTS = {
+    "wave_height_m": 1.5, "period_s": 8.0, "temp_c": 28.0,
+    "wind_speed_mps": 5.0, "pressure_hpa": 1008.0,
+}
+MIN_SPEED = 1.0
+MAX_SPEED = 1000.0
+
+
+def parse_timestamp(value):
+    """Parse an ISO-8601 string (aggregated CSV or recorder format) or epoch number."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return dt.timestamp()
+
+
+def normalize_reading(raw, station_id="", fallback=None):
+    """Coerce a raw mapping into a reading; missing sensors come from `fallback`."""
+    fallback = fallback or SENSOR_DEFAULTS
+    reading = {
+        "timestamp": parse_timestamp(raw.get("timestamp")) or time.time(),
+        "station_id": raw.get("station_id") or station_id,
+    }
+    for field in SENSOR_FIELDS:
+        try:
+            value = float(raw[field])
+            if math.isnan(value):
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            value = fallback[field]
+        reading[field] = value
+    return reading
+
+
+class IngestSource:
+    """Base class for telemetry sources: an async iterator of readings."""
+
+    kind = "base"
+
+    def __init__(self):
+        self.readings = 0
+        self.started_at = None
+
+    async def start(self):
+        self.started_at = time.time()
+
+    async def read(self):
+        """Return the next reading, or None when the source is exhausted."""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        reading = await self.read()
+        if reading is None:
+            raise StopAsyncIteration
+        self.readings += 1
+        return reading
+
+    def get_stats(self):
+        return {"source": self.kind, "readings": self.readings, "started_at": self.started_at}
+
+
+class SyntheticSource(IngestSource):
+    """Sinusoidal + noise ocean state for a single virtual station (the original demo feed)."""
+
+    kind = "synthetic"
+
+    def __init__(self, interval=0.5, station_id="SIM-MUM-01"):
+        super().__init__()
+        self.interval = interval
+        self.station_id = station_id
+        self._t0 = None
+        self._next = None
+
+    async def start(self):
+        await super().start()
+        loop = asyncio.get_running_loop()
+        self._t0 = time.time()
+        self._next = loop.time()
+
+    async def read(self):
+        loop = asyncio.get_running_loop()
+        self._next += self.interval
+        await asyncio.sleep(max(0.0, self._next - loop.time()))
+        now = time.time()
+        elapsed = now - self._t0
+
+        hour = int(time.strftime("%H"))
+        temp = round(28.0 - 2 * math.cos((hour - 14) * math.pi / 12) + random.uniform(-0.5, 0.5), 1)
+        return {
+            "timestamp": now,
+            "station_id": self.station_id,
+            "wave_height_m": max(0.5, 2.0 + 1.2 * math.sin(elapsed * 0.025) + random.uniform(-0.1, 0.1)),
+            "period_s": max(5, 9.0 + 2.0 * math.cos(elapsed * 0.018)),
+            "temp_c": temp,
+            "wind_speed_mps": max(1, 6.0 + 3.0 * math.sin(elapsed * 0.03) + random.uniform(-0.5, 0.5)),
+            "pressure_hpa": max(970, 1008 - 8 * math.sin(elapsed * 0.02) + random.uniform(-1, 1)),
+        }
+
+
+class ReplaySource(IngestSource):
+    """
+    Streams archived telemetry at `speed`x real time (clamped to 1-1000x).
+
+    `path` may be `aggregated_buoy_telemetry.csv`, a single DataRecorder daily
+    file, or the recordings directory (all `recording_*.csv` files in date order).
+    Pacing is anchored to the first row so long replays do not drift.
+    """
+
+    kind = "replay"
+
+    def __init__(self, path=DEFAULT_REPLAY_PATH, speed=60.0, station_id=None,
+                 loop=True, max_gap_s=None):
+        super().__init__()
+        self.path = path
+        self.speed = min(MAX_SPEED, max(MIN_SPEED, float(speed)))
+        self.station_id = station_id
+        self.loop = loop
+        self.max_gap_s = max_gap_s
+        self.passes = 0
+        self.skipped_rows = 0
+        self._rows = None
+        self._wall_anchor = None
+        self._data_anchor = None
+        self._last_data_t = None
+
+    def _files(self):
+        if os.path.isdir(self.path):
+            return sorted(glob.glob(os.path.join(self.path, "recording_*.csv")))
+        return [self.path]
+
+    def _iter_rows(self):
+        while True:
+            for filepath in self._files():
+                with open(filepath, "r", encoding="utf-8", newline="") as f:
+                    for row in csv.DictReader(f):
+                        if self.station_id and row.get("station_id") != self.station_id:
+                            continue
+                        if row.get("event_type", "tick") != "tick" or not row.get("wave_height_m"):
+                            self.skipped_rows += 1
+                            continue
+                        yield row
+            self.passes += 1
+            if not self.loop:
+                return
+            self._wall_anchor = None
+
+    async def start(self):
+        await super().start()
+        if not self._files() or not all(os.path.exists(p) for p in self._files()):
+            raise FileNotFoundError(f"Replay source not found: {self.path}")
+        self._rows = self._iter_rows()
+
+    async def read(self):
+        row = next(self._rows, None)
+        if row is None:
+            return None
+        reading = normalize_reading(row)
+        loop = asyncio.get_running_loop()
+        data_t = reading["timestamp"]
+
+        if self._wall_anchor is None:
+            self._wall_anchor, self._data_anchor = loop.time(), data_t
+        elif self.max_gap_s is not None and data_t - self._last_data_t > self.max_gap_s:
+            # Collapse long outages in the archive instead of sleeping through them.
+            self._data_anchor += (data_t - self._last_data_t) - self.max_gap_s
+        self._last_data_t = data_t
+
+        due = self._wall_anchor + (data_t - self._data_anchor) / self.speed
+        await asyncio.sleep(max(0.0, due - loop.time()))
+        return reading
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats.update({"path": self.path, "speed": self.speed, "station_id": self.station_id,
+                      "passes": self.passes, "skipped_rows": self.skipped_rows})
+        return stats
+
+
+def parse_line(line, last=None):
+    """
+    Parse one line-protocol record into a reading.
+
+    Accepts a JSON object, or an InfluxDB-style line:
+        buoy,station_id=BUOY-MUM-01 wave_height_m=2.4,period_s=9.1 1708271100
+    The trailing timestamp is optional (epoch s/ms/us/ns). Sensors missing from
+    the line are carried forward from `last` for the same station.
+    """
+    raw = _line_fields(line)
+    return None if raw is None else normalize_reading(raw, fallback=last)
+
+
+def _line_fields(line):
+    """Raw field dict of one line-protocol record (station_id included), or None for blanks and comments."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        raw = json.loads(line)
+        if not isinstance(raw, dict):
+            raise ValueError(f"Expected a JSON object: {line!r}")
+    else:
+        parts = line.split()
+        if len(parts) < 2:
+            raise ValueError(f"Malformed line: {line!r}")
+        tags = dict(t.split("=", 1) for t in parts[0].split(",")[1:])
+        raw = dict(f.split("=", 1) for f in parts[1].split(","))
+        raw["station_id"] = tags.get("station_id") or tags.get("station", "")
+        if len(parts) > 2:
+            ts = float(parts[2])
+            while ts > 1e11:
+                ts /= 1000.0
+            raw["timestamp"] = ts
+    return raw
+
+
+class LineProtocolSource(IngestSource):
+    """Listens for line-protocol readings over UDP datagrams or TCP streams."""
+
+    kind = "line"
+
+    def __init__(self, host="127.0.0.1", port=8125, protocol="udp", queue_size=4096):
+        super().__init__()
+        if protocol not in ("udp", "tcp"):
+            raise ValueError(f"Unsupported protocol: {protocol}")
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.malformed = 0
+        self._last = {}
+        self._transport = None
+        self._server = None
+
+    def feed(self, data):
+        """Parse a chunk of text (one or more lines) and enqueue its readings."""
+        for line in data.splitlines():
+            try:
+                raw = _line_fields(line)
+                if raw is None:
+                    continue
+                reading = normalize_reading(raw, fallback=self._last.get(raw.get("station_id") or ""))
+            except (TypeError, ValueError, json.JSONDecodeError):
+                self.malformed += 1
+                continue
+            self._last[reading["station_id"]] = reading
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(reading)
+
+    @staticmethod
+    def _station_hint(line):
+        for token in line.replace(" ", ",").split(","):
+            if token.startswith("station_id=") or token.startswith("station="):
+                return token.split("=", 1)[1]
+        return ""
+
+    async def start(self):
+        await super().start()
+        loop = asyncio.get_running_loop()
+        if self.protocol == "udp":
+            source = self
+
+            class _Datagram(asyncio.DatagramProtocol):
+                def datagram_received(self, data, addr):
+                    source.feed(data.decode("utf-8", errors="replace"))
+
+            self._transport, _ = await loop.create_datagram_endpoint(
+                _Datagram, local_addr=(self.host, self.port))
+        else:
+            async def _handle(reader, writer):
+                try:
+                    while line := await reader.readline():
+                        self.feed(line.decode("utf-8", errors="replace"))
+                finally:
+                    writer.close()
+
+            self._server = await asyncio.start_server(_handle, self.host, self.port)
+        logger.info(f"Line-protocol ingest listening on {self.protocol}://{self.host}:{self.port}")
+
+    async def read(self):
+        return await self.queue.get()
+
+    async def close(self):
+        if self._transport is not None:
+            self._transport.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats.update({"listen": f"{self.protocol}://{self.host}:{self.port}",
+                      "queued": self.queue.qsize(), "dropped": self.dropped,
+                      "malformed": self.malformed, "stations": len(self._last)})
+        return stats
+
+
+def source_from_env(environ=None):
+    """
+    Build the ingest source selected by environment variables:
+      AEGIS_INGEST         synthetic (default) | replay | udp | tcp
+      AEGIS_REPLAY_PATH    CSV file or recordings directory
+      AEGIS_REPLAY_SPEED   time acceleration, 1-1000 (default 60)
+      AEGIS_REPLAY_STATION only replay this station_id; defaults to BUOY-MUM-01 for the
+                           buoy archive, "all" replays every station in the file
+      AEGIS_REPLAY_LOOP    1 to restart at end of archive (default 1)
+      AEGIS_INGEST_HOST / AEGIS_INGEST_PORT   line-protocol listener address
+    """
+    env = os.environ if environ is None else environ
+    kind = env.get("AEGIS_INGEST", "synthetic").lower()
+    if kind == "synthetic":
+        return SyntheticSource()
+    if kind == "replay":
+        path = env.get("AEGIS_REPLAY_PATH", DEFAULT_REPLAY_PATH)
+        station = env.get("AEGIS_REPLAY_STATION") or (DEFAULT_REPLAY_STATION if path == DEFAULT_REPLAY_PATH else "all")
+        return ReplaySource(
+            path=path,
+            speed=float(env.get("AEGIS_REPLAY_SPEED", 60)),
+            station_id=None if station.lower() == "all" else station,
+            loop=env.get("AEGIS_REPLAY_LOOP", "1") == "1",
+        )
+    if kind in ("udp", "tcp"):
+        return LineProtocolSource(
+            host=env.get("AEGIS_INGEST_HOST", "127.0.0.1"),
+            port=int(env.get("AEGIS_INGEST_PORT", 8125)),
+            protocol=kind,
+        )
+    raise ValueError(f"Unknown AEGIS_INGEST source: {kind}")
@@ -0,0 +1,361 @@
+"""
+AEGIS Inundation Engine
+Connected "bathtub" flood extent over a DEM grid at a given water level.
+
+  - Priority-flood (Barnes et al. 2014) runs once per DEM. It gives every
+    cell the lowest water level at which the sea reaches it: the minimax
+    elevation over all paths from the open-sea boundary. Low ground behind a
+    sea wall or ridge is only flooded once the water overtops it.
+  - After that, the extent at level L is one comparison (fill < L), so a
+    tick costs a few vectorized passes over the raster. The fill raster is
+    saved next to the DEM and reused when the DEM is unchanged.
+  - Depth rasters and polygons are cached per quantized level (LRU). The
+    caches are locked, so the tick loop, request threads and the tile
+    prefetcher can share one model; results are computed outside the lock.
+  - Polygons trace cell edges of the (optionally downsampled) extent into
+    GeoJSON MultiPolygon rings: counter-clockwise exteriors with their holes.
+
+DEMs are .npy arrays (metres above mean sea level, row 0 = north) with a .json
+sidecar holding the geotransform. GeoTIFFs are read when rasterio is
+installed. synthetic_dem() builds a plausible coastal DEM for tests and demos.
+"""
+
+import hashlib
+import heapq
+import importlib.util
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+from aegis_sim.cache import LRUCache
+
+logger = logging.getLogger("Aegis.Inundation")
+
+HAVE_RASTERIO = importlib.util.find_spec("rasterio") is not None
+
+M_PER_DEG = 111_320.0
+DEFAULT_LEVEL_STEP_M = 0.05
+# lat_min, lat_max, lon_min, lon_max of the synthetic Mumbai DEM
+MUMBAI_BOUNDS = (18.88, 19.16, 72.76, 72.98)
+
+
+def priority_flood(dem, seeds):
+    """
+    Minimum water level that reaches each cell from the `seeds` mask (inf where
+    no path exists). Seeds keep their own elevation.
+    """
+    H, W = dem.shape
+    Wp = W + 2
+    # A closed border ring of padding removes all bounds checks from the loop
+    elev = np.pad(dem.astype(np.float64), 1, constant_values=np.inf).ravel().tolist()
+    closed = bytearray(np.pad(np.zeros((H, W), np.uint8), 1, constant_values=1).ravel().tobytes())
+    fill = [math.inf] * len(elev)
+    heap = []
+    for i in np.flatnonzero(np.pad(seeds, 1, constant_values=False).ravel()).tolist():
+        closed[i] = 1
+        fill[i] = elev[i]
+        heap.append((elev[i], i))
+    heapq.heapify(heap)
+
+    # Cells at or below the current spill level go through a plain FIFO (no heap cost)
+    pit = deque()
+    push, pop = heapq.heappush, heapq.heappop
+    offsets = (1, -1, Wp, -Wp)
+    while heap or pit:
+        if pit:
+            i = pit.popleft()
+            level = fill[i]
+        else:
+            level, i = pop(heap)
+        for o in offsets:
+            n = i + o
+            if closed[n]:
+                continue
+            closed[n] = 1
+            e = elev[n]
+            if e <= level:
+                fill[n] = level
+                pit.append(n)
+            else:
+                fill[n] = e
+                push(heap, (e, n))
+    return np.array(fill).reshape(H + 2, Wp)[1:-1, 1:-1]
+
+
+def sea_seeds(dem, sea_level_m=0.0):
+    """Open-sea boundary: edge cells at or below sea level."""
+    seeds = np.zeros(dem.shape, dtype=bool)
+    for sl in ((0, slice(None)), (-1, slice(None)), (slice(None), 0), (slice(None), -1)):
+        seeds[sl] = dem[sl] <= sea_level_m
+    return seeds
+
+
+def synthetic_dem(shape=(256, 256), bounds=MUMBAI_BOUNDS, seed=0):
+    """
+    Coastal DEM: sea to the west, a meandering shoreline, land rising inland,
+    and a 3.5 m dune/sea-wall ridge fronting a 1 m low basin on part of the coast.
+    Returns (dem, transform).
+    """
+    rng = np.random.default_rng(seed)
+    H, W = shape
+    y, x = np.mgrid[0:H, 0:W] / np.array([H, W]).reshape(2, 1, 1)
+    shore = 0.3 + 0.06 * np.sin(2 * np.pi * (2 * y + rng.uniform())) + 0.03 * np.sin(2 * np.pi * (7 * y))
+    d = x - shore  # >0 inland (fraction of the width)
+    dem = np.where(d < 0, -2.0 + 60.0 * d, 0.6 + 40.0 * d)
+    # Smooth relief from a handful of random plane waves
+    for _ in range(6):
+        kx, ky = rng.uniform(1, 6, 2)
+        dem += rng.uniform(0.2, 0.8) * np.sin(2 * np.pi * (kx * x + ky * y + rng.uniform()))
+    dem = np.where(d < 0, np.minimum(dem, -0.5), np.maximum(dem, 0.2))
+    # Low basin enclosed by a ridge
+    basin = (y > 0.58) & (y < 0.77) & (d > 0.03) & (d < 0.12)
+    ridge = (y > 0.55) & (y < 0.8) & (d > 0.01) & (d < 0.15) & ~basin
+    dem[ridge] = 3.5
+    dem[basin] = np.minimum(dem[basin], 1.0)
+    lat_min, lat_max, lon_min, lon_max = bounds
+    transform = (lon_min, lat_max, (lon_max - lon_min) / W, (lat_max - lat_min) / H)
+    return dem.astype(np.float32), transform
+
+
+def mask_polygons(mask, transform):
+    """
+    GeoJSON MultiPolygon coordinates tracing the cell edges of a boolean mask.
+    transform = (lon0, lat0, dlon, dlat), the north-west corner and cell size.
+    """
+    h, w = mask.shape
+    m = np.pad(mask, 1)
+    inner = m[1:-1, 1:-1]
+    # Boundary edges directed so the flooded cell is on the left with north up:
+    # exteriors come out counter-clockwise and holes clockwise
+    r, c = np.nonzero(inner & ~m[:-2, 1:-1])           # top edges, walk west
+    starts = [(c + 1, r)]
+    ends = [(c, r)]
+    r, c = np.nonzero(inner & ~m[1:-1, 2:])            # right edges, walk north
+    starts.append((c + 1, r + 1)); ends.append((c + 1, r))
+    r, c = np.nonzero(inner & ~m[2:, 1:-1])            # bottom edges, walk east
+    starts.append((c, r + 1)); ends.append((c + 1, r + 1))
+    r, c = np.nonzero(inner & ~m[1:-1, :-2])           # left edges, walk south
+    starts.append((c, r)); ends.append((c, r + 1))
+
+    stride = w + 1
+    a = np.concatenate([y * stride + x for x, y in starts]).tolist()
+    b = np.concatenate([y * stride + x for x, y in ends]).tolist()
+    nxt = {}
+    for s, e in zip(a, b):
+        nxt.setdefault(s, []).append(e)
+
+    rings = []
+    while nxt:
+        start = next(iter(nxt))
+        ring = [start]
+        cur = start
+        while True:
+            outs = nxt[cur]
+            e = outs.pop()
+            if not outs:
+                del nxt[cur]
+            if e == start:
+                break
+            ring.append(e)
+            cur = e
+        rings.append(_simplify(np.array(ring) % stride, np.array(ring) // stride))
+
+    lon0, lat0, dlon, dlat = transform
+    outers, holes = [], []
+    for x, y in rings:
+        area = _signed_area(x, -y)
+        (outers if area > 0 else holes).append((abs(area), x, y))
+    outers.sort(key=lambda t: t[0])
+    polys = [[(x, y)] for _, x, y in outers]
+    for _, hx, hy in holes:
+        for i, (_, ox, oy) in enumerate(outers):
+            if _contains(ox, oy, hx[0], hy[0]):
+                polys[i].append((hx, hy))
+                break
+
+    def coords(x, y):
+        pts = np.column_stack([lon0 + x * dlon, lat0 - y * dlat]).round(6).tolist()
+        return pts + pts[:1]
+
+    return [[coords(x, y) for x, y in poly] for poly in polys]
+
+
+def _simplify(x, y):
+    """Drop vertices that lie on a straight run."""
+    dx = np.sign(np.roll(x, -1) - x)
+    dy = np.sign(np.roll(y, -1) - y)
+    keep = (dx != np.roll(dx, 1)) | (dy != np.roll(dy, 1))
+    return x[keep], y[keep]
+
+
+def _signed_area(x, y):
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def _contains(x, y, px, py):
+    """Even-odd ray cast of one point against a ring."""
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    cross = (y > py) != (y2 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xi = x + (py - y) * (x2 - x) / (y2 - y)
+    return bool(np.count_nonzero(cross & (px < xi)) % 2)
+
+
+class InundationModel:
+    def __init__(self, dem, transform, sea_level_m=0.0, level_step_m=DEFAULT_LEVEL_STEP_M,
+                 cache_size=32, fill=None):
+        """
+        Args:
+            dem: 2-D elevation array [m above MSL], row 0 = north.
+            transform: (lon0, lat0, dlon, dlat), north-west corner and cell size in degrees.
+            level_step_m: Water levels are rounded to this step for caching.
+            fill: Precomputed priority-flood raster for this DEM (computed if None).
+        """
+        self.dem = np.asarray(dem, dtype=np.float32)
+        self.transform = tuple(float(v) for v in transform)
+        self.sea_level_m = sea_level_m
+        self.level_step_m = level_step_m
+        self.fill = priority_flood(self.dem, sea_seeds(self.dem, sea_level_m)) if fill is None else fill
+        self.fill32 = self.fill.astype(np.float32)
+        self.dem_id = hashlib.sha256(self.dem.tobytes()).hexdigest()[:12]
+        lon0, lat0, dlon, dlat = self.transform
+        lat_c = lat0 - dlat * self.dem.shape[0] / 2.0
+        self.cell_area_m2 = (dlat * M_PER_DEG) * (dlon * M_PER_DEG * math.cos(math.radians(lat_c)))
+        self._depths = LRUCache(cache_size)
+        self._summaries = LRUCache(1024)
+        self._polygons = LRUCache(cache_size)
+        self._lock = threading.Lock()
+
+    def _cached(self, cache, key, compute):
+        with self._lock:
+            value = cache.get(key)
+        if value is None:
+            # Two threads may both compute a miss; the results are identical
+            value = compute()
+            with self._lock:
+                cache.put(key, value)
+        return value
+
+    @classmethod
+    def synthetic(cls, shape=(256, 256), bounds=MUMBAI_BOUNDS, seed=0, **kwargs):
+        dem, transform = synthetic_dem(shape, bounds, seed)
+        return cls(dem, transform, **kwargs)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Load a .npy DEM (+ .json sidecar) or a GeoTIFF, reusing a saved fill raster if current."""
+        if path.lower().endswith((".tif", ".tiff")):
+            if not HAVE_RASTERIO:
+                raise RuntimeError("Reading GeoTIFF DEMs needs the optional rasterio package")
+            import rasterio
+            with rasterio.open(path) as src:
+                dem = src.read(1).astype(np.float32)
+                t = src.transform
+                transform = (t.c, t.f, t.a, -t.e)
+        else:
+            dem = np.load(path).astype(np.float32)
+            with open(_meta_path(path), "r") as f:
+                transform = json.load(f)["transform"]
+
+        digest = hashlib.sha256(dem.tobytes()).hexdigest()
+        fill_path = os.path.splitext(path)[0] + ".fill.npy"
+        fill = None
+        if os.path.exists(fill_path) and os.path.exists(_meta_path(fill_path)):
+            with open(_meta_path(fill_path), "r") as f:
+                if json.load(f).get("dem_sha256") == digest:
+                    fill = np.load(fill_path)
+        model = cls(dem, transform, fill=fill, **kwargs)
+        if fill is None:
+            np.save(fill_path, model.fill)
+            with open(_meta_path(fill_path), "w") as f:
+                json.dump({"dem_sha256": digest}, f)
+            logger.info(f"Computed flood fill for {path} {dem.shape} -> {fill_path}")
+        return model
+
+    def save(self, path):
+        np.save(path, self.dem)
+        with open(_meta_path(path), "w") as f:
+            json.dump({"transform": list(self.transform), "shape": list(self.dem.shape)}, f, indent=2)
+
+    def quantize(self, level_m):
+        return round(round(float(level_m) / self.level_step_m) * self.level_step_m, 4)
+
+    def extent(self, level_m):
+        """Land cells connected to the sea below `level_m` (sea cells excluded)."""
+        level = self.quantize(level_m)
+        return (self.fill32 < level) & (self.fill32 > self.sea_level_m)
+
+    def depth(self, level_m):
+        """Water depth raster [m] at a quantized level; 0 on dry land and at sea."""
+        level = self.quantize(level_m)
+        return self._cached(self._depths, level,
+                            lambda: np.where(self.extent(level), level - self.dem, 0.0).astype(np.float32))
+
+    def summary(self, level_m):
+        level = self.quantize(level_m)
+        return self._cached(self._summaries, level, lambda: self._summary(level))
+
+    def _summary(self, level):
+        depth = self.depth(level)
+        wet = depth > 0
+        cells = int(np.count_nonzero(wet))
+        return {
+            "level_m": level,
+            "flooded_cells": cells,
+            "flooded_km2": round(cells * self.cell_area_m2 / 1e6, 3),
+            "max_depth_m": round(float(depth.max()), 3) if cells else 0.0,
+            "mean_depth_m": round(float(depth[wet].mean()), 3) if cells else 0.0,
+        }
+
+    def polygons(self, level_m, max_cells=256):
+        """GeoJSON Feature (MultiPolygon) of the flood extent, traced on a grid of at most max_cells per side."""
+        level = self.quantize(level_m)
+        return self._cached(self._polygons, (level, max_cells), lambda: self._polygons_at(level, max_cells))
+
+    def _polygons_at(self, level, max_cells):
+        mask = self.extent(level)
+        factor = max(1, math.ceil(max(mask.shape) / max_cells))
+        lon0, lat0, dlon, dlat = self.transform
+        if factor > 1:
+            H, W = mask.shape
+            ph, pw = -H % factor, -W % factor
+            padded = np.pad(mask, ((0, ph), (0, pw)))
+            blocks = padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor)
+            mask = blocks.mean(axis=(1, 3)) >= 0.5
+        coords = mask_polygons(mask, (lon0, lat0, dlon * factor, dlat * factor))
+        return {"type": "Feature", "geometry": {"type": "MultiPolygon", "coordinates": coords},
+                "properties": dict(self.summary(level), downsample=factor)}
+
+    def get_stats(self):
+        lon0, lat0, dlon, dlat = self.transform
+        with self._lock:
+            depth_cache, polygon_cache = self._depths.get_stats(), self._polygons.get_stats()
+        return {
+            "shape": list(self.dem.shape),
+            "dem_id": self.dem_id,
+            "bounds": [round(lat0 - dlat * self.dem.shape[0], 6), round(lat0, 6),
+                       round(lon0, 6), round(lon0 + dlon * self.dem.shape[1], 6)],
+            "cell_m": round(math.sqrt(self.cell_area_m2), 1),
+            "level_step_m": self.level_step_m,
+            "depth_cache": depth_cache,
+            "polygon_cache": polygon_cache,
+        }
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def inundation_from_env(environ=None):
+    """AEGIS_DEM=<path.npy|.tif> loads a DEM; otherwise a synthetic Mumbai DEM (AEGIS_DEM_SIZE cells a side)."""
+    env = os.environ if environ is None else environ
+    path = env.get("AEGIS_DEM")
+    if path:
+        return InundationModel.load(path)
+    n = int(env.get("AEGIS_DEM_SIZE", 256))
+    return InundationModel.synthetic((n, n))
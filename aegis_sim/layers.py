@@ -0,0 +1,97 @@
+"""
+AEGIS Static Map Layers
+GeoJSON layers (city, shelters, infrastructure, ports, population hotspots)
+that are serialized and compressed once, for serving over REST with ETags.
+
+  - publish() builds the JSON body plus gzip and, if the optional `brotli`
+    package is installed, brotli encodings. Each request then only picks
+    pre-built bytes.
+  - The ETag is a content hash. Republishing identical content keeps both
+    the ETag and the store version, so clients revalidate with a 304.
+  - LayerStore.version increases whenever any layer changes. Telemetry frames
+    carry only this number, and clients refetch layers when it moves.
+"""
+
+import gzip
+import hashlib
+import importlib.util
+import json
+
+HAVE_BROTLI = importlib.util.find_spec("brotli") is not None
+if HAVE_BROTLI:
+    import brotli
+
+GEOJSON_MEDIA_TYPE = "application/geo+json"
+
+
+def point_features(records, id_field=None):
+    """FeatureCollection of Points from dicts with lat/lon; other keys become properties."""
+    features = []
+    for i, r in enumerate(records):
+        props = {k: v for k, v in r.items() if k not in ("lat", "lon")}
+        feature = {"type": "Feature", "geometry": {"type": "Point", "coordinates": [r["lon"], r["lat"]]},
+                   "properties": props}
+        if id_field:
+            feature["id"] = r.get(id_field, i)
+        features.append(feature)
+    return {"type": "FeatureCollection", "features": features}
+
+
+class StaticLayer:
+    __slots__ = ("name", "body", "encoded", "etag", "version")
+
+    def __init__(self, name, obj, version):
+        self.name = name
+        self.body = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        self.encoded = {"identity": self.body, "gzip": gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if HAVE_BROTLI:
+            self.encoded["br"] = brotli.compress(self.body, quality=11)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:20]
+        self.version = version
+
+    def select(self, accept_encoding=""):
+        """(body, encoding) for an Accept-Encoding header; prefers brotli, then gzip."""
+        accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+        for enc in ("br", "gzip"):
+            if enc in accepted and enc in self.encoded:
+                return self.encoded[enc], enc
+        return self.body, "identity"
+
+    def matches(self, if_none_match):
+        """True when an If-None-Match header names this layer's current content."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return any(tag.strip().removeprefix("W/").strip('"').split("-")[0] == self.etag
+                   for tag in if_none_match.split(","))
+
+    def etag_for(self, encoding):
+        return f'"{self.etag}"' if encoding == "identity" else f'"{self.etag}-{encoding}"'
+
+    def get_stats(self):
+        return {"etag": self.etag, "version": self.version,
+                "bytes": {enc: len(b) for enc, b in self.encoded.items()}}
+
+
+class LayerStore:
+    def __init__(self):
+        self.layers = {}
+        self.version = 0
+
+    def publish(self, name, obj):
+        """Serialize and compress a layer; returns True if its content changed."""
+        layer = StaticLayer(name, obj, self.version + 1)
+        current = self.layers.get(name)
+        if current is not None and current.etag == layer.etag:
+            return False
+        self.version += 1
+        self.layers[name] = layer
+        return True
+
+    def get(self, name):
+        return self.layers.get(name)
+
+    def index(self):
+        return {"version": self.version, "brotli": HAVE_BROTLI,
+                "layers": {name: layer.get_stats() for name, layer in self.layers.items()}}
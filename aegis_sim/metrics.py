@@ -0,0 +1,262 @@
+"""
+AEGIS Hot-Path Metrics
+Lightweight timers, counters and gauges for the tick pipeline, exported in
+Prometheus text format.
+
+Stage timings go into fixed-bucket histograms: an all-time Prometheus
+histogram plus a rolling window (default 60 s, kept as 6 rotating slots) for
+recent p50/p95/p99. An observation is one bisect and two increments on the
+current slot; the lock is only taken when a slot expires and is folded into
+the all-time totals. Increments from executor threads race only with
+themselves under the GIL, and at worst lose a sample, which is acceptable
+for monitoring. Set AEGIS_METRICS=0 to turn every call into a no-op.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+DEFAULT_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+WINDOW_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RollingHistogram:
+    """
+    Sliding window of per-slot bucket counts. Slots that leave the window are
+    folded into all-time totals, so the hot path only touches the current slot.
+    Each slot is a list of bucket counts with the value sum in the last cell.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS, window_s=60.0, slots=6):
+        self.buckets = tuple(buckets)
+        self._width = len(self.buckets) + 1
+        self._expired = [0] * (self._width + 1)
+        self._slot_s = window_s / slots
+        self._slots = [[0] * (self._width + 1) for _ in range(slots)]
+        self._current = self._slots[0]
+        self._slot_idx = 0
+        self._slot_ends = time.perf_counter() + self._slot_s
+        self._lock = threading.Lock()
+
+    def _rotate(self, now):
+        with self._lock:
+            n = len(self._slots)
+            if now >= self._slot_ends + (n - 1) * self._slot_s:
+                # Idle for at least a whole window: every slot expires at once.
+                for i, old in enumerate(self._slots):
+                    self._expired = [a + b for a, b in zip(self._expired, old)]
+                    self._slots[i] = [0] * (self._width + 1)
+                self._slot_ends = now + self._slot_s
+            while now >= self._slot_ends:
+                self._slot_idx = (self._slot_idx + 1) % n
+                old = self._slots[self._slot_idx]
+                self._expired = [a + b for a, b in zip(self._expired, old)]
+                self._slots[self._slot_idx] = [0] * (self._width + 1)
+                self._slot_ends += self._slot_s
+            self._current = self._slots[self._slot_idx]
+
+    def observe(self, value, now=None):
+        """Add one value; `now` is a time.perf_counter() reading if the caller has one."""
+        if now is None:
+            now = time.perf_counter()
+        if now >= self._slot_ends:
+            self._rotate(now)
+        slot = self._current
+        slot[bisect.bisect_left(self.buckets, value)] += 1
+        slot[-1] += value
+
+    def _totals(self):
+        with self._lock:
+            return [sum(col) for col in zip(self._expired, *self._slots)]
+
+    @property
+    def counts(self):
+        return self._totals()[:-1]
+
+    @property
+    def count(self):
+        return sum(self._totals()[:-1])
+
+    @property
+    def sum(self):
+        return self._totals()[-1]
+
+    def window_counts(self, now=None):
+        self._rotate(time.perf_counter() if now is None else now)
+        with self._lock:
+            return [sum(col) for col in zip(*self._slots)][:-1]
+
+    def window_quantile(self, q, counts=None):
+        """Bucket-interpolated quantile over the rolling window (None if empty)."""
+        counts = counts if counts is not None else self.window_counts()
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if c and seen + c >= rank:
+                lo = self.buckets[i - 1] if i > 0 else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+
+class _Timer:
+    """Reused per stage name: a stage never overlaps with itself, so one start slot suffices."""
+
+    __slots__ = ("hist", "start")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # RollingHistogram.observe, inlined: this runs several times per tick.
+        now = time.perf_counter()
+        hist = self.hist
+        if now >= hist._slot_ends:
+            hist._rotate(now)
+        value = (now - self.start) * 1000.0
+        slot = hist._current
+        slot[bisect.bisect_left(hist.buckets, value)] += 1
+        slot[-1] += value
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Stage duration histograms plus labelled counters and gauges."""
+
+    def __init__(self, enabled=True, namespace="aegis"):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.stages = {}
+        self._timers = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def _hist(self, stage):
+        hist = self.stages.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self.stages.setdefault(stage, RollingHistogram())
+        return hist
+
+    def observe(self, stage, seconds):
+        """Record one duration (seconds) for `stage`."""
+        if self.enabled:
+            self._hist(stage).observe(seconds * 1000.0)
+
+    def timer(self, stage):
+        """Context manager timing the enclosed block into `stage`."""
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self._timers.get(stage)
+        if timer is None:
+            timer = self._timers.setdefault(stage, _Timer(self._hist(stage)))
+        return timer
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_counter(self, name, value, **labels):
+        """Publish a monotonic total that is maintained elsewhere (e.g. cache hit counts)."""
+        if self.enabled:
+            self.counters[(name, tuple(sorted(labels.items())))] = value
+
+    def set_gauge(self, name, value, **labels):
+        if not self.enabled:
+            return
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def record_stage(self, stage, seconds, overrun):
+        """TickScheduler observer hook: duration histogram + overrun counter."""
+        if not self.enabled:
+            return
+        hist = self.stages.get(stage) or self._hist(stage)
+        hist.observe(seconds * 1000.0)
+        if overrun:
+            self.inc("tick_overruns_total", stage=stage)
+
+    def snapshot(self):
+        """Rolling-window quantiles per stage, for JSON status endpoints."""
+        out = {}
+        for stage, hist in list(self.stages.items()):
+            counts = hist.window_counts()
+            totals = hist._totals()
+            count, total = sum(totals[:-1]), totals[-1]
+            row = {"count": count, "mean_ms": round(total / count, 4) if count else 0.0}
+            for q in WINDOW_QUANTILES:
+                v = hist.window_quantile(q, counts)
+                row[f"p{int(q * 100)}_ms"] = None if v is None else round(v, 4)
+            out[stage] = row
+        return out
+
+    def render(self):
+        """Prometheus text exposition (format 0.0.4)."""
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_stage_duration_ms Tick stage wall time in milliseconds.",
+            f"# TYPE {ns}_stage_duration_ms histogram",
+        ]
+        window_lines = [
+            f"# HELP {ns}_stage_duration_window_ms Rolling-window stage duration quantiles.",
+            f"# TYPE {ns}_stage_duration_window_ms gauge",
+        ]
+        for stage, hist in sorted(self.stages.items()):
+            totals = hist._totals()
+            counts, total, count = totals[:-1], totals[-1], sum(totals[:-1])
+            cumulative = 0
+            for bound, c in zip(hist.buckets, counts):
+                cumulative += c
+                lines.append(f'{ns}_stage_duration_ms_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{ns}_stage_duration_ms_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{ns}_stage_duration_ms_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{ns}_stage_duration_ms_count{{stage="{stage}"}} {count}')
+            window = hist.window_counts()
+            for q in WINDOW_QUANTILES:
+                v = hist.window_quantile(q, window)
+                if v is not None:
+                    window_lines.append(
+                        f'{ns}_stage_duration_window_ms{{stage="{stage}",quantile="{q}"}} {v:.6f}')
+        lines.extend(window_lines)
+
+        for kind, store in (("counter", self.counters), ("gauge", self.gauges)):
+            seen = set()
+            for (name, labels), value in sorted(store.items()):
+                if name not in seen:
+                    lines.append(f"# TYPE {ns}_{name} {kind}")
+                    seen.add(name)
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                suffix = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{ns}_{name}{suffix} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def metrics_from_env(environ=None):
+    """AEGIS_METRICS=0 disables instrumentation (default enabled)."""
+    env = os.environ if environ is None else environ
+    return MetricsRegistry(enabled=env.get("AEGIS_METRICS", "1") != "0")
@@ -0,0 +1,135 @@
+"""
+AEGIS Sampling Profiler
+In-process statistical profiler for a live backend: a background thread
+samples the Python stack of every thread (event loop and executor workers)
+at a fixed interval and aggregates them into collapsed-stack format
+("thread;module:func;module:func count"). The output can go straight to
+flamegraph.pl or speedscope.
+
+Optionally records a tracemalloc snapshot over the same window and reports
+the top allocation sites. tracemalloc slows allocation-heavy code while it
+is active, so it is only enabled for the duration of a capture.
+"""
+
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger("Aegis.Profiler")
+
+MAX_DURATION_S = 60.0
+MIN_INTERVAL_S = 0.001
+MAX_STACK_DEPTH = 128
+
+_capture_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """A capture is already running in this process."""
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith("<"):
+        module = filename.strip("<>").replace(" ", "_")  # e.g. <frozen importlib._bootstrap>
+    else:
+        module = os.path.splitext(os.path.basename(filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+def _collapse(frame, thread_name):
+    parts = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        parts.append(_frame_label(frame))
+        frame = frame.f_back
+    parts.append(thread_name)
+    return ";".join(reversed(parts))
+
+
+def sample_stacks(duration_s, interval_s=0.005):
+    """
+    Sample every thread's stack for `duration_s` seconds.
+
+    Returns (Counter of collapsed stacks, number of sampling passes). The
+    calling thread is excluded, so run this in a dedicated thread.
+    """
+    me = threading.get_ident()
+    stacks = collections.Counter()
+    passes = 0
+    deadline = time.perf_counter() + duration_s
+    next_at = time.perf_counter()
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident != me:
+                stacks[_collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+        passes += 1
+        next_at += interval_s
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_at = time.perf_counter()
+    return stacks, passes
+
+
+def to_collapsed(stacks):
+    """Render a stack Counter as collapsed-stack text, heaviest first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def _top_allocations(snapshot, limit):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    rows = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        rows.append({"file": frame.filename, "line": frame.lineno,
+                     "size_kb": round(stat.size / 1024, 2), "count": stat.count})
+    return rows
+
+
+def capture(duration_s=10.0, interval_s=0.005, trace_malloc=False, top=25):
+    """
+    Run one profiling capture (blocking). Only one capture may run at a time.
+
+    Returns dict with "collapsed" (flamegraph text), "samples", "passes",
+    "duration_s" and, if `trace_malloc`, "allocations" (top allocation sites
+    by bytes still held at the end of the window).
+    """
+    duration_s = max(0.1, min(float(duration_s), MAX_DURATION_S))
+    interval_s = max(MIN_INTERVAL_S, float(interval_s))
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profiling capture is already running")
+    started_tracing = False
+    try:
+        if trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        logger.info(f"Profiling capture: {duration_s}s at {interval_s * 1000:.1f} ms")
+        start = time.perf_counter()
+        stacks, passes = sample_stacks(duration_s, interval_s)
+        result = {
+            "duration_s": round(time.perf_counter() - start, 3),
+            "interval_ms": round(interval_s * 1000.0, 3),
+            "passes": passes,
+            "samples": sum(stacks.values()),
+            "collapsed": to_collapsed(stacks),
+        }
+        if trace_malloc:
+            result["allocations"] = _top_allocations(tracemalloc.take_snapshot(), top)
+        return result
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _capture_lock.release()
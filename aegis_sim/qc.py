@@ -0,0 +1,281 @@
+"""
+AEGIS Streaming QC
+Per-station quality control between ingest and the physics/LSTM stages.
+
+Every reading is checked field by field with O(1)-ish state per station:
+  - range   value outside physical bounds (or NaN/inf)
+  - spike   |x - rolling median| > SPIKE_Z robust scales. The median of the
+            last `window` raw samples comes from a sorted sliding window
+            (bisect insert and delete per sample). The scale is an EWMA of accepted squared
+            residuals, floored at the sensor resolution.
+  - onset   the sample after a spike stays at the spike's level: the jump was
+            real (a storm arriving, not a glitch). The spike's raw value is
+            handed back so the previous LSTM row can be restored.
+  - stuck   the raw value repeated exactly for STUCK_SAMPLES readings
+  - gap     time since the station's previous reading > GAP_FACTOR x its
+            EWMA cadence; short gaps are linearly interpolated, long ones
+            reset the downstream window
+  - order   timestamp not after the previous one (reading dropped)
+
+Range and spike values are replaced by the rolling median (or the last clean
+value while the window warms up). A stuck sensor keeps its value but masks the
+reading from the LSTM buffer. Per-field running mean/variance (EWMA, West 1979)
+are kept for the stats endpoint.
+"""
+
+import bisect
+import math
+import os
+from collections import deque
+
+from aegis_sim.ingest import SENSOR_DEFAULTS, SENSOR_FIELDS
+
+# Plausible physical bounds per sensor
+BOUNDS = {
+    "wave_height_m": (0.0, 25.0),
+    "period_s": (1.0, 30.0),
+    "temp_c": (-5.0, 45.0),
+    "wind_speed_mps": (0.0, 90.0),
+    "pressure_hpa": (850.0, 1090.0),
+}
+# Smallest residual scale treated as real variation (about the sensor resolution)
+SCALE_FLOORS = {"wave_height_m": 0.05, "period_s": 0.2, "temp_c": 0.2,
+                "wind_speed_mps": 0.3, "pressure_hpa": 0.3}
+STUCK_SAMPLES = {"wave_height_m": 12, "period_s": 30, "temp_c": 120,
+                 "wind_speed_mps": 20, "pressure_hpa": 120}
+DEFAULT_WINDOW = 9
+SPIKE_Z = 6.0
+EWMA_ALPHA = 0.05
+GAP_FACTOR = 3.0
+MAX_FILL = 6
+
+
+class RollingMedian:
+    """Median of the last `window` values, kept as a sorted list (bisect; O(w) per sample, w is small)."""
+
+    __slots__ = ("window", "_sorted", "_buf")
+
+    def __init__(self, window):
+        self.window = window
+        self._sorted = []
+        self._buf = deque()
+
+    def __len__(self):
+        return len(self._buf)
+
+    def push(self, x):
+        bisect.insort(self._sorted, x)
+        self._buf.append(x)
+        if len(self._buf) > self.window:
+            del self._sorted[bisect.bisect_left(self._sorted, self._buf.popleft())]
+
+    def median(self):
+        n = len(self._sorted)
+        if not n:
+            return None
+        if n % 2:
+            return self._sorted[n // 2]
+        return (self._sorted[n // 2 - 1] + self._sorted[n // 2]) / 2.0
+
+
+class _FieldState:
+    __slots__ = ("median", "mean", "var", "res_var", "last_raw", "repeats", "last_clean", "pending")
+
+    def __init__(self, window):
+        self.median = RollingMedian(window)
+        self.mean = None
+        self.var = 0.0
+        self.res_var = None
+        self.last_raw = None
+        self.repeats = 0
+        self.last_clean = None
+        self.pending = None  # raw value of a spike awaiting confirmation by the next sample
+
+
+class QCResult:
+    """
+    Outcome of one reading: cleaned copy, flags, gap fill, whether to feed the
+    LSTM, and `revise` - raw values to restore in the *previous* reading where
+    a spike turned out to be the onset of a real change.
+    """
+
+    __slots__ = ("reading", "flags", "fill", "reset", "drop", "masked", "revise")
+
+    def __init__(self, reading, flags, fill=(), reset=False, drop=False, masked=False, revise=None):
+        self.reading = reading
+        self.flags = flags
+        self.fill = fill
+        self.reset = reset
+        self.drop = drop
+        self.masked = masked
+        self.revise = revise or {}
+
+
+class StreamQC:
+    """Streaming QC for any number of stations; state is created on first reading."""
+
+    def __init__(self, window=DEFAULT_WINDOW, spike_z=SPIKE_Z, alpha=EWMA_ALPHA,
+                 gap_factor=GAP_FACTOR, max_fill=MAX_FILL, fields=SENSOR_FIELDS):
+        self.window = window
+        self.spike_z = spike_z
+        self.alpha = alpha
+        self.gap_factor = gap_factor
+        self.max_fill = max_fill
+        self.fields = tuple(fields)
+        self._bounds = [BOUNDS.get(f, (-math.inf, math.inf)) for f in self.fields]
+        self._floors = [SCALE_FLOORS.get(f, 0.0) for f in self.fields]
+        self._stuck = [STUCK_SAMPLES.get(f, 30) for f in self.fields]
+        self._stations = {}
+        self.readings = 0
+        self.counts = {}
+
+    def _station(self, station_id):
+        st = self._stations.get(station_id)
+        if st is None:
+            st = self._stations[station_id] = {
+                "fields": [_FieldState(self.window) for _ in self.fields],
+                "last_t": None, "last": None, "cadence": None, "intervals": 0,
+                "flagged": 0, "readings": 0,
+            }
+        return st
+
+    def _count(self, flag):
+        self.counts[flag] = self.counts.get(flag, 0) + 1
+
+    def process(self, reading):
+        """Check one normalized reading; returns a QCResult (never raises on bad values)."""
+        self.readings += 1
+        st = self._station(reading.get("station_id", ""))
+        st["readings"] += 1
+        t = reading["timestamp"]
+        flags = []
+
+        last_t = st["last_t"]
+        if last_t is not None and t <= last_t:
+            self._count("order")
+            st["flagged"] += 1
+            return QCResult(reading, ["order"], drop=True)
+
+        clean = dict(reading)
+        revise = {}
+        masked = False
+        alpha = self.alpha
+        warm = self.window // 2 + 1
+        for i, field in enumerate(self.fields):
+            fs = st["fields"][i]
+            x = reading.get(field)
+            try:
+                x = float(x)
+            except (TypeError, ValueError):
+                x = math.nan
+            lo, hi = self._bounds[i]
+            med = fs.median.median()
+            fallback = med if med is not None else fs.last_clean
+            if fallback is None:
+                fallback = SENSOR_DEFAULTS.get(field, 0.0)
+
+            if not (lo <= x <= hi):  # also catches NaN
+                flags.append(f"{field}:range")
+                clean[field] = fallback
+                continue
+
+            if x == fs.last_raw:
+                fs.repeats += 1
+                if fs.repeats + 1 >= self._stuck[i]:
+                    flags.append(f"{field}:stuck")
+                    masked = True
+            else:
+                fs.repeats = 0
+            fs.last_raw = x
+
+            value = x
+            pending, fs.pending = fs.pending, None
+            if med is not None and len(fs.median) >= warm and fs.res_var is not None:
+                r = x - med
+                limit = self.spike_z * max(math.sqrt(fs.res_var), self._floors[i])
+                if pending is not None and abs(x - pending) <= limit and (x - med) * (pending - med) > 0:
+                    # The previous "spike" held: it was the onset of a real change
+                    flags.append(f"{field}:onset")
+                    revise[field] = pending
+                elif abs(r) > limit:
+                    flags.append(f"{field}:spike")
+                    fs.pending = x
+                    value = med
+                else:
+                    fs.res_var += alpha * (r * r - fs.res_var)
+            elif med is not None:
+                r = x - med
+                fs.res_var = r * r if fs.res_var is None else fs.res_var + alpha * (r * r - fs.res_var)
+            fs.median.push(x)
+
+            # EWMA mean/variance of accepted values (West 1979)
+            if fs.mean is None:
+                fs.mean = value
+            else:
+                d = value - fs.mean
+                fs.mean += alpha * d
+                fs.var = (1.0 - alpha) * (fs.var + alpha * d * d)
+            fs.last_clean = value
+            clean[field] = value
+
+        fill, reset = (), False
+        if last_t is not None:
+            dt = t - last_t
+            cadence = st["cadence"]
+            if cadence is not None and st["intervals"] >= 3 and dt > self.gap_factor * cadence:
+                flags.append("gap")
+                missing = int(round(dt / cadence)) - 1
+                if missing <= self.max_fill:
+                    fill = self._interpolate(st["last"], clean, missing)
+                else:
+                    reset = True
+            else:
+                st["cadence"] = dt if cadence is None else cadence + 0.1 * (dt - cadence)
+                st["intervals"] += 1
+        st["last_t"] = t
+        st["last"] = clean
+
+        if flags:
+            st["flagged"] += 1
+            for f in flags:
+                self._count(f.rsplit(":", 1)[-1])
+        return QCResult(clean, flags, fill, reset, masked=masked, revise=revise)
+
+    def _interpolate(self, a, b, n):
+        out = []
+        for j in range(1, n + 1):
+            w = j / (n + 1)
+            r = {"station_id": b.get("station_id", ""), "timestamp": a["timestamp"] + w * (b["timestamp"] - a["timestamp"])}
+            for field in self.fields:
+                r[field] = a[field] + w * (b[field] - a[field])
+            out.append(r)
+        return out
+
+    def station_stats(self, station_id):
+        st = self._stations.get(station_id)
+        if st is None:
+            return None
+        return {
+            "readings": st["readings"], "flagged": st["flagged"],
+            "cadence_s": round(st["cadence"], 3) if st["cadence"] is not None else None,
+            "fields": {f: {"mean": round(fs.mean, 4) if fs.mean is not None else None,
+                           "std": round(math.sqrt(fs.var), 4),
+                           "median": fs.median.median(), "repeats": fs.repeats}
+                       for f, fs in zip(self.fields, st["fields"])},
+        }
+
+    def get_stats(self):
+        flagged = {s: st["flagged"] for s, st in self._stations.items() if st["flagged"]}
+        return {"readings": self.readings, "stations": len(self._stations), "flags": dict(self.counts),
+                "flagged_stations": dict(sorted(flagged.items(), key=lambda kv: -kv[1])[:10]),
+                "window": self.window, "spike_z": self.spike_z}
+
+
+def qc_from_env(environ=None):
+    """AEGIS_QC=0 disables QC (readings pass through); AEGIS_QC_WINDOW, AEGIS_QC_SPIKE_Z and AEGIS_QC_MAX_FILL tune it."""
+    env = os.environ if environ is None else environ
+    if env.get("AEGIS_QC", "1") == "0":
+        return None
+    return StreamQC(window=int(env.get("AEGIS_QC_WINDOW", DEFAULT_WINDOW)),
+                    spike_z=float(env.get("AEGIS_QC_SPIKE_Z", SPIKE_Z)),
+                    max_fill=int(env.get("AEGIS_QC_MAX_FILL", MAX_FILL)))
@@ -23,6 +23,8 @@ class DataRecorder:
         "hybrid_runup_m", "hybrid_risk",
         "inference_device", "model_loaded", "prediction_mode",
         "is_cyclone", "event_type",
+        # Appended last so files started before it still parse column-for-column
+        "qc_flags",
     ]
 
     def __init__(self, base_dir=None):
@@ -30,7 +32,6 @@ class DataRecorder:
             root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             base_dir = os.path.join(root, "data", "recordings")
         self.base_dir = base_dir
-        os.makedirs(self.base_dir, exist_ok=True)
         self._lock = threading.Lock()
         self._current_date = None
         self._current_file = None
@@ -46,6 +47,7 @@ class DataRecorder:
             return
         if self._current_file is not None:
             self._current_file.close()
+        os.makedirs(self.base_dir, exist_ok=True)
         filepath = self._get_filepath(d)
         file_exists = os.path.exists(filepath)
         self._current_file = open(filepath, "a", newline="", encoding="utf-8")
@@ -68,8 +70,11 @@ class DataRecorder:
             self._current_file.flush()
             self._record_count += 1
 
-    def record_telemetry(self, ocean, physics, lstm=None, system=None, mode="physics"):
+    def record_telemetry(self, ocean, physics, lstm=None, system=None, mode="physics",
+                         station_id="", qc_flags=""):
         data = {
+            "station_id": station_id,
+            "qc_flags": qc_flags,
             "wave_height_m": ocean.get("wave_height_m", ""),
             "period_s": ocean.get("wave_period_s", ""),
             "wind_speed_mps": ocean.get("wind_speed_mps", ""),
@@ -104,7 +109,9 @@ class DataRecorder:
         return records[-n:]
 
     def get_stats(self):
-        files = [f for f in os.listdir(self.base_dir) if f.startswith("recording_")]
+        files = []
+        if os.path.isdir(self.base_dir):
+            files = [f for f in os.listdir(self.base_dir) if f.startswith("recording_")]
         return {
             "session_start": self._session_start,
             "total_records": self._record_count,
@@ -123,7 +130,8 @@ class DataRecorder:
 _recorder = None
 
 def get_recorder(base_dir=None):
+    """Process-wide recorder; AEGIS_RECORDINGS_DIR overrides the default data/recordings."""
     global _recorder
     if _recorder is None:
-        _recorder = DataRecorder(base_dir)
+        _recorder = DataRecorder(base_dir or os.environ.get("AEGIS_RECORDINGS_DIR"))
     return _recorder
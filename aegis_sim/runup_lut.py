@@ -0,0 +1,149 @@
+"""
+AEGIS Run-Up Lookup Table
+Precomputed Stockdon (2006) R2% run-up on a regular 3-D grid with trilinear
+interpolation, for bulk scoring paths (ensemble members, whole-coastline
+sweeps, scenario batches).
+
+The H0 axis is stored in sqrt(H0) space. Run-up is proportional to
+sqrt(H0) * T * f(beta), so along the first two axes the interpolation is
+exact, and the only approximation error comes from the curvature of f(beta).
+That keeps the grid small for a tight error bound.
+
+Tables are saved as .npy (memory-mapped on load) plus a .json sidecar that
+holds the axis ranges and the verified error bound. Points outside the grid
+fall back to the exact formula.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+
+from aegis_sim.engine import calculate_stockdon_runup_array
+
+logger = logging.getLogger("Aegis.RunupLUT")
+
+# Domain: H0 0-16 m, T 1-26 s, beach slope 0.005-0.25
+DEFAULT_RANGES = {"sqrt_h0": (0.0, 4.0), "period_s": (1.0, 26.0), "beta": (0.005, 0.25)}
+DEFAULT_SHAPE = (9, 11, 64)
+DEFAULT_ERROR_BOUND_M = 0.002
+
+
+class RunupLUT:
+    """Trilinear run-up table over (sqrt(H0), T, beta)."""
+
+    def __init__(self, grid, ranges, max_error_m=None):
+        self.grid = grid
+        self.ranges = {k: tuple(v) for k, v in ranges.items()}
+        self.max_error_m = max_error_m
+        self.shape = grid.shape
+        self._flat = grid.reshape(-1)
+        self._lo = np.array([self.ranges[k][0] for k in ("sqrt_h0", "period_s", "beta")])
+        self._hi = np.array([self.ranges[k][1] for k in ("sqrt_h0", "period_s", "beta")])
+        self._step = (self._hi - self._lo) / (np.array(self.shape) - 1)
+
+    @classmethod
+    def build(cls, shape=DEFAULT_SHAPE, ranges=DEFAULT_RANGES):
+        axes = [np.linspace(lo, hi, n) for (lo, hi), n in
+                zip((ranges["sqrt_h0"], ranges["period_s"], ranges["beta"]), shape)]
+        u, T, beta = np.meshgrid(*axes, indexing="ij")
+        grid = calculate_stockdon_runup_array(u * u, T, beta)
+        return cls(np.ascontiguousarray(grid), ranges)
+
+    @classmethod
+    def build_within(cls, error_bound_m=DEFAULT_ERROR_BOUND_M, shape=DEFAULT_SHAPE,
+                     ranges=DEFAULT_RANGES, max_beta_points=4096, samples=20000):
+        """Refine the beta axis (the only non-linear one) until verify() meets the bound."""
+        n_u, n_t, n_b = shape
+        while True:
+            lut = cls.build((n_u, n_t, n_b), ranges)
+            err = lut.verify(samples)
+            if err <= error_bound_m or n_b >= max_beta_points:
+                break
+            n_b = 2 * n_b - 1
+        if err > error_bound_m:
+            logger.warning(f"Run-up LUT error {err:.4f} m exceeds bound {error_bound_m} m")
+        return lut
+
+    def verify(self, samples=20000, seed=0):
+        """Max absolute error [m] against the exact formula at random in-domain points."""
+        rng = np.random.default_rng(seed)
+        u = rng.uniform(*self.ranges["sqrt_h0"], samples)
+        T = rng.uniform(*self.ranges["period_s"], samples)
+        beta = rng.uniform(*self.ranges["beta"], samples)
+        H0 = u * u
+        err = np.abs(self.lookup(H0, T, beta) - calculate_stockdon_runup_array(H0, T, beta))
+        self.max_error_m = float(err.max())
+        return self.max_error_m
+
+    def lookup(self, H0, T, beta_f):
+        """Interpolated R2% run-up over broadcastable arrays; exact outside the grid."""
+        H0, T, beta_f = np.broadcast_arrays(np.asarray(H0, dtype=np.float64),
+                                            np.asarray(T, dtype=np.float64),
+                                            np.asarray(beta_f, dtype=np.float64))
+        u = np.sqrt(np.maximum(H0, 0.0))
+        nu, nt, nb = self.shape
+
+        fu = (u - self._lo[0]) / self._step[0]
+        ft = (T - self._lo[1]) / self._step[1]
+        fb = (beta_f - self._lo[2]) / self._step[2]
+        iu = np.clip(fu.astype(np.intp), 0, nu - 2)
+        it = np.clip(ft.astype(np.intp), 0, nt - 2)
+        ib = np.clip(fb.astype(np.intp), 0, nb - 2)
+        wu, wt, wb = fu - iu, ft - it, fb - ib
+
+        g = self._flat
+        base = (iu * nt + it) * nb + ib
+        su, st = nt * nb, nb
+        c00 = g[base] * (1 - wb) + g[base + 1] * wb
+        c01 = g[base + st] * (1 - wb) + g[base + st + 1] * wb
+        c10 = g[base + su] * (1 - wb) + g[base + su + 1] * wb
+        c11 = g[base + su + st] * (1 - wb) + g[base + su + st + 1] * wb
+        c0 = c00 * (1 - wt) + c01 * wt
+        c1 = c10 * (1 - wt) + c11 * wt
+        out = c0 * (1 - wu) + c1 * wu
+
+        outside = ((fu < 0) | (fu > nu - 1) | (ft < 0) | (ft > nt - 1) | (fb < 0) | (fb > nb - 1))
+        if outside.any():
+            out[outside] = calculate_stockdon_runup_array(H0[outside], T[outside], beta_f[outside])
+        out[H0 <= 0] = 0.0
+        return out
+
+    def save(self, path):
+        np.save(path, self.grid)
+        with open(_meta_path(path), "w") as f:
+            json.dump({"ranges": self.ranges, "shape": list(self.shape),
+                       "max_error_m": self.max_error_m}, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved table; pages are only read as lookups touch them."""
+        with open(_meta_path(path), "r") as f:
+            meta = json.load(f)
+        grid = np.load(path, mmap_mode="r")
+        if list(grid.shape) != meta["shape"]:
+            raise ValueError(f"Run-up LUT {path} does not match its metadata")
+        return cls(grid, meta["ranges"], meta.get("max_error_m"))
+
+    def get_stats(self):
+        return {"shape": list(self.shape), "ranges": self.ranges,
+                "max_error_m": self.max_error_m, "bytes": int(self.grid.nbytes)}
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def load_or_build(path, error_bound_m=DEFAULT_ERROR_BOUND_M):
+    """Load the table at `path`, or build one within `error_bound_m` and save it there."""
+    if os.path.exists(path) and os.path.exists(_meta_path(path)):
+        lut = RunupLUT.load(path)
+        if lut.max_error_m is not None and lut.max_error_m <= error_bound_m:
+            return lut
+        logger.info(f"Run-up LUT {path} is coarser than {error_bound_m} m; rebuilding")
+    lut = RunupLUT.build_within(error_bound_m)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    lut.save(path)
+    logger.info(f"Built run-up LUT {lut.shape} (max error {lut.max_error_m:.5f} m) -> {path}")
+    return RunupLUT.load(path)
@@ -0,0 +1,163 @@
+"""
+AEGIS Tick Scheduler
+Runs each backend stage (physics, LSTM, forecast, recording, broadcast...) on
+its own drift-free clock so that slow stages no longer stretch the fast ones.
+
+Deadlines are anchored to the stage start (t0 + k * period), not to the end
+of the previous run, so work time never accumulates as drift. A run that
+takes longer than one period counts as an overrun; periods that are missed
+entirely are skipped rather than replayed in a burst.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+
+logger = logging.getLogger("Aegis.Scheduler")
+
+NOT_READY_RETRY_S = 0.5
+
+
+def parse_rates(spec, defaults):
+    """
+    Parse "physics=2,lstm=0.2,forecast=1/60" into {stage: hz}, on top of `defaults`.
+    Rates may be given as decimals or as fractions ("1/60" = once a minute).
+    """
+    rates = dict(defaults)
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        num, _, den = value.partition("/")
+        hz = float(num) / float(den) if den else float(num)
+        if hz <= 0:
+            raise ValueError(f"Stage rate must be positive: {item!r}")
+        rates[name.strip()] = hz
+    return rates
+
+
+class Stage:
+    """One periodically executed unit of work plus its timing statistics."""
+
+    def __init__(self, name, fn, rate_hz):
+        self.name = name
+        self.fn = fn
+        self.rate_hz = rate_hz
+        self.runs = 0
+        self.not_ready = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.task = None
+
+    @property
+    def period(self):
+        return 1.0 / self.rate_hz
+
+    def get_stats(self):
+        return {
+            "rate_hz": round(self.rate_hz, 4),
+            "runs": self.runs,
+            "not_ready": self.not_ready,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped,
+            "errors": self.errors,
+            "last_ms": round(self.last_ms, 3),
+            "avg_ms": round(self.total_ms / self.runs, 3) if self.runs else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+            "budget_pct": round(100.0 * self.last_ms / (1000.0 * self.period), 1),
+        }
+
+
+class TickScheduler:
+    """Drives registered stages at independent fixed rates on the asyncio loop."""
+
+    def __init__(self, observer=None, clock=None, sleep=None):
+        """
+        `observer(stage_name, seconds, overrun)` is called after every counted run.
+        `clock()` and `sleep(seconds)` replace the loop's monotonic time and
+        asyncio.sleep (tests drive the stages from a virtual clock).
+        """
+        self.stages = {}
+        self.started_at = None
+        self.observer = observer
+        self.clock = clock
+        self.sleep = sleep or asyncio.sleep
+
+    def add_stage(self, name, fn, rate_hz):
+        """
+        Register `fn` (sync or async, no arguments) to run at `rate_hz`.
+        Returning False signals "inputs not ready yet": the run is not counted
+        and the stage retries after NOT_READY_RETRY_S instead of a full period.
+        """
+        if rate_hz <= 0:
+            raise ValueError(f"Stage {name} needs a positive rate")
+        self.stages[name] = Stage(name, fn, rate_hz)
+        return self.stages[name]
+
+    def start(self):
+        self.started_at = time.time()
+        for stage in self.stages.values():
+            stage.task = asyncio.create_task(self._run_stage(stage), name=f"stage:{stage.name}")
+
+    async def stop(self):
+        tasks = [s.task for s in self.stages.values() if s.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_stage(self, stage):
+        now = self.clock or asyncio.get_running_loop().time
+        deadline = now()
+        while True:
+            delay = deadline - now()
+            if delay > 0:
+                await self.sleep(delay)
+            start = now()
+            stage.max_lag_ms = max(stage.max_lag_ms, (start - deadline) * 1000.0)
+            try:
+                result = stage.fn()
+                if inspect.isawaitable(result):
+                    result = await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                stage.errors += 1
+                logger.exception(f"Stage {stage.name} failed")
+                result = None
+            end = now()
+
+            if result is False:
+                stage.not_ready += 1
+                deadline = end + min(stage.period, NOT_READY_RETRY_S)
+                continue
+
+            took = end - start
+            stage.runs += 1
+            stage.last_ms = took * 1000.0
+            stage.total_ms += stage.last_ms
+            stage.max_ms = max(stage.max_ms, stage.last_ms)
+            overrun = took > stage.period
+            if overrun:
+                stage.overruns += 1
+            if self.observer is not None:
+                self.observer(stage.name, took, overrun)
+
+            deadline += stage.period
+            behind = end - deadline
+            if behind > 0:
+                missed = int(behind // stage.period) + 1
+                stage.skipped += missed
+                deadline += missed * stage.period
+
+    def get_stats(self):
+        return {
+            "started_at": self.started_at,
+            "stages": {name: s.get_stats() for name, s in self.stages.items()},
+        }
@@ -0,0 +1,289 @@
+"""
+AEGIS Tide Prediction
+Harmonic astronomical tide for a set of stations, with a precomputed,
+memory-mapped tide table for fast lookups.
+
+  h(t) = Z0 + sum_i f_i * A_i * cos(V_i(t) + u_i - g_i)
+
+  - V_i is built from Doodson numbers over the mean longitudes of the moon (s),
+    sun (h), lunar perigee (p) and node (N). V is linear in time, so every
+    constituent reduces to a phase at J2000 plus a speed.
+  - The nodal corrections f and u change over the 18.6-year nodal cycle. They
+    are evaluated once, at the middle of each requested span (the usual
+    practice for yearly predictions).
+  - predict() takes arbitrary time arrays (stations x times, one cos per
+    constituent). predict_grid() handles regular steps. It splits
+    t = t_a + t_b and uses cos(a + b) = cos a cos b - sin a sin b, which turns
+    the sum over constituents into one (stations*n_a x 2K) @ (2K x n_b) matrix
+    product. A year at 1-minute resolution for all stations takes a few
+    milliseconds.
+  - TideTable stores predict_grid() output as float32 .npy (memory-mapped on
+    load) plus a .json sidecar. Lookups interpolate linearly. Times outside
+    the table fall back to predict().
+
+Heights are metres relative to mean sea level, the datum the sea-wall
+heights use.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+
+import numpy as np
+
+logger = logging.getLogger("Aegis.Tides")
+
+J2000_EPOCH_S = 946728000.0  # 2000-01-01 12:00 UT
+CENTURY_S = 36525.0 * 86400.0
+
+# Mean longitudes [deg] at J2000 and rates [deg / Julian century]
+_S = (218.3164477, 481267.88123421)
+_H = (280.4664567, 36000.76982779)
+_P = (83.3532465, 4069.0137287)
+_N = (125.04452, -1934.136261)
+
+# name -> (Doodson numbers on (tau, s, h, p), phase offset [deg])
+CONSTITUENTS = {
+    "M2": ((2, 0, 0, 0), 0.0),
+    "S2": ((2, 2, -2, 0), 0.0),
+    "N2": ((2, -1, 0, 1), 0.0),
+    "K2": ((2, 2, 0, 0), 0.0),
+    "K1": ((1, 1, 0, 0), 90.0),
+    "O1": ((1, -1, 0, 0), -90.0),
+    "P1": ((1, 1, -2, 0), -90.0),
+    "Q1": ((1, -2, 0, 1), -90.0),
+    "M4": ((4, 0, 0, 0), 0.0),
+    "MS4": ((4, 2, -2, 0), 0.0),
+}
+
+# Approximate harmonic constants (amplitude m, Greenwich phase lag deg) for the
+# Mumbai coast. Spring range comes out at about 4.5 m. These are demo values:
+# replace them with surveyed constants (e.g. from a tide-gauge analysis) via
+# TideModel(stations=...).
+MUMBAI_STATIONS = {
+    "APOLLO-BUNDER": {"lat": 18.9220, "lon": 72.8347, "z0": 0.0, "constituents": {
+        "M2": (1.21, 330.0), "S2": (0.47, 5.0), "N2": (0.30, 315.0), "K2": (0.13, 2.0),
+        "K1": (0.44, 40.0), "O1": (0.21, 40.0), "P1": (0.14, 38.0), "Q1": (0.05, 35.0),
+        "M4": (0.03, 240.0), "MS4": (0.02, 280.0)}},
+    "JNPT": {"lat": 18.9500, "lon": 72.9500, "z0": 0.0, "constituents": {
+        "M2": (1.28, 334.0), "S2": (0.50, 9.0), "N2": (0.32, 319.0), "K2": (0.14, 6.0),
+        "K1": (0.45, 42.0), "O1": (0.21, 42.0), "P1": (0.14, 40.0), "Q1": (0.05, 37.0),
+        "M4": (0.04, 250.0), "MS4": (0.02, 290.0)}},
+    "VERSOVA": {"lat": 19.1350, "lon": 72.8080, "z0": 0.0, "constituents": {
+        "M2": (1.18, 326.0), "S2": (0.46, 1.0), "N2": (0.29, 311.0), "K2": (0.13, 358.0),
+        "K1": (0.43, 38.0), "O1": (0.21, 38.0), "P1": (0.14, 36.0), "Q1": (0.05, 33.0),
+        "M4": (0.03, 235.0), "MS4": (0.02, 275.0)}},
+}
+
+
+def _fundamental(t):
+    """(tau, s, h, p, N) in degrees at epoch seconds t (linear in t)."""
+    c = (np.asarray(t, dtype=np.float64) - J2000_EPOCH_S) / CENTURY_S
+    s = _S[0] + _S[1] * c
+    h = _H[0] + _H[1] * c
+    p = _P[0] + _P[1] * c
+    n = _N[0] + _N[1] * c
+    # Mean lunar time: 15 deg/h of UT from midnight (lower transit of the mean sun), + h - s
+    tau = 360.0 * (c * 36525.0 + 0.5) + h - s
+    return tau, s, h, p, n
+
+
+def nodal_corrections(names, t):
+    """Amplitude factors f and phase corrections u [deg] for constituents at epoch seconds t."""
+    n = math.radians(float(_fundamental(t)[4]))
+    cn, sn = math.cos(n), math.sin(n)
+    fm2, um2 = 1.0 - 0.037 * cn, -2.1 * sn
+    table = {
+        "M2": (fm2, um2), "N2": (fm2, um2), "S2": (1.0, 0.0), "P1": (1.0, 0.0),
+        "K2": (1.024 + 0.286 * cn, -17.7 * sn),
+        "K1": (1.006 + 0.115 * cn, -8.9 * sn),
+        "O1": (1.009 + 0.187 * cn, 10.8 * sn), "Q1": (1.009 + 0.187 * cn, 10.8 * sn),
+        "M4": (fm2 * fm2, 2 * um2), "MS4": (fm2, um2),
+    }
+    f = np.array([table[k][0] for k in names])
+    u = np.array([table[k][1] for k in names])
+    return f, u
+
+
+class TideModel:
+    def __init__(self, stations=None):
+        """
+        Args:
+            stations: {name: {"z0": m, "constituents": {name: (amplitude m, phase lag deg)}}};
+                defaults to MUMBAI_STATIONS.
+        """
+        self.stations_config = stations or MUMBAI_STATIONS
+        self.stations = list(self.stations_config)
+        self.names = sorted({c for s in self.stations_config.values() for c in s["constituents"]},
+                            key=list(CONSTITUENTS).index)
+        S, K = len(self.stations), len(self.names)
+        self.amplitude = np.zeros((S, K))
+        self.phase_lag = np.zeros((S, K))
+        self.z0 = np.array([self.stations_config[s].get("z0", 0.0) for s in self.stations])
+        for i, st in enumerate(self.stations):
+            for k, name in enumerate(self.names):
+                a, g = self.stations_config[st]["constituents"].get(name, (0.0, 0.0))
+                self.amplitude[i, k], self.phase_lag[i, k] = a, g
+
+        # V_k(t) = v0_k + speed_k * (t - J2000), in degrees
+        doodson = np.array([CONSTITUENTS[n][0] for n in self.names], dtype=np.float64)
+        offset = np.array([CONSTITUENTS[n][1] for n in self.names])
+        arg0 = np.array([v for v in _fundamental(J2000_EPOCH_S)[:4]])
+        rate = np.array([360.0 * 36525.0 + _H[1] - _S[1], _S[1], _H[1], _P[1]]) / CENTURY_S
+        self.v0 = doodson @ arg0 + offset
+        self.speed = doodson @ rate  # deg/s
+        self.table = None
+        # The arguments are part of the digest so tables built with older astronomy get rebuilt
+        key = [self.stations_config, np.round(self.v0, 6).tolist(), np.round(self.speed * 3600.0, 9).tolist()]
+        self.digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+    def index(self, stations=None):
+        if stations is None:
+            return np.arange(len(self.stations))
+        return np.array([self.stations.index(s) for s in stations])
+
+    def _station_terms(self, idx, t_mid):
+        f, u = nodal_corrections(self.names, t_mid)
+        amp = self.amplitude[idx] * f
+        phase = self.v0 + u - self.phase_lag[idx]  # deg, (S, K)
+        return amp, phase
+
+    def predict(self, times, stations=None):
+        """Tide [m] at epoch seconds `times`, shape (stations, times)."""
+        t = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        idx = self.index(stations)
+        amp, phase = self._station_terms(idx, 0.5 * (t.min() + t.max()))
+        # Reduce the angle mod 360 before the multiply-add keeps float64 precision
+        ang = np.radians(np.mod(np.outer(t - J2000_EPOCH_S, self.speed), 360.0))  # (N, K)
+        ph = np.radians(phase)  # (S, K)
+        out = (np.cos(ang) @ (amp * np.cos(ph)).T - np.sin(ang) @ (amp * np.sin(ph)).T).T
+        return out + self.z0[idx][:, None]
+
+    def predict_grid(self, start, step_s, n, stations=None):
+        """Tide at start + i * step_s for i < n, shape (stations, n), via one matrix product."""
+        idx = self.index(stations)
+        S = idx.size
+        amp, phase = self._station_terms(idx, start + 0.5 * step_s * (n - 1))
+        nb = max(1, int(math.ceil(math.sqrt(n))))
+        na = -(-n // nb)
+        w = np.radians(self.speed)  # rad/s
+        a = np.radians(phase)[:, None, :] + np.outer(np.arange(na) * nb * step_s + (start - J2000_EPOCH_S), w)[None]
+        a = np.mod(a, 2 * np.pi)  # (S, na, K)
+        b = np.outer(np.arange(nb) * step_s, w)  # (nb, K)
+        amp = amp[:, None, :]
+        left = np.concatenate([amp * np.cos(a), -amp * np.sin(a)], axis=2).reshape(S * na, -1)
+        right = np.concatenate([np.cos(b), np.sin(b)], axis=1).T  # (2K, nb)
+        out = (left @ right).reshape(S, na * nb)[:, :n]
+        return out + self.z0[idx][:, None]
+
+    def use_table(self, table):
+        """Serve level() from `table` (a TideTable built from this model) where it covers, or None."""
+        if table is not None and (table.stations != self.stations or table.digest != self.digest):
+            raise ValueError("Tide table was built for different stations or constants")
+        self.table = table
+
+    def level(self, times, stations=None):
+        """Tide [m], (stations, times): table lookup where covered, harmonic prediction elsewhere."""
+        t = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        if self.table is not None and self.table.covers(t):
+            return self.table.lookup(t, self.index(stations))
+        return self.predict(t, stations)
+
+    def get_stats(self):
+        return {"stations": self.stations, "constituents": self.names,
+                "table": self.table.get_stats() if self.table is not None else None}
+
+
+class TideTable:
+    """Regularly sampled tide for every station of a TideModel."""
+
+    def __init__(self, levels, stations, start, step_s, digest):
+        self.levels = levels
+        self.stations = list(stations)
+        self.start = float(start)
+        self.step_s = float(step_s)
+        self.digest = digest
+        self.end = self.start + self.step_s * (levels.shape[1] - 1)
+
+    @classmethod
+    def build(cls, model, start, days, step_s=60.0):
+        n = int(days * 86400 / step_s) + 1
+        levels = model.predict_grid(start, step_s, n).astype(np.float32)
+        return cls(levels, model.stations, start, step_s, model.digest)
+
+    def covers(self, t):
+        return self.start <= t.min() and t.max() <= self.end
+
+    def lookup(self, t, idx):
+        """Linear interpolation at times `t` (within the table) for station indices `idx`."""
+        pos = (t - self.start) / self.step_s
+        i = np.minimum(pos.astype(np.intp), self.levels.shape[1] - 2)
+        w = pos - i
+        # 2-D fancy indexing only gathers the samples needed, so a memmap reads just those pages
+        rows = idx[:, None]
+        return self.levels[rows, i] * (1.0 - w) + self.levels[rows, i + 1] * w
+
+    def save(self, path):
+        np.save(path, self.levels)
+        with open(_meta_path(path), "w") as f:
+            json.dump({"stations": self.stations, "start": self.start, "step_s": self.step_s,
+                       "shape": list(self.levels.shape), "digest": self.digest}, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved table."""
+        with open(_meta_path(path), "r") as f:
+            meta = json.load(f)
+        levels = np.load(path, mmap_mode="r")
+        if list(levels.shape) != meta["shape"]:
+            raise ValueError(f"Tide table {path} does not match its metadata")
+        return cls(levels, meta["stations"], meta["start"], meta["step_s"], meta["digest"])
+
+    def get_stats(self):
+        return {"start": self.start, "end": self.end, "step_s": self.step_s,
+                "samples": int(self.levels.shape[1]), "bytes": int(self.levels.nbytes)}
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def load_or_build(model, path, days=400.0, step_s=60.0, now=None):
+    """Load the table at `path` if it matches `model` and covers the next days/2; otherwise rebuild it."""
+    now = time.time() if now is None else now
+    if os.path.exists(path) and os.path.exists(_meta_path(path)):
+        try:
+            table = TideTable.load(path)
+            if (table.digest == model.digest and table.stations == model.stations
+                    and table.start <= now - 86400 and now + days * 86400 / 2 <= table.end):
+                return table
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Tide table {path} unreadable ({e}); rebuilding")
+    start = math.floor((now - 86400) / 86400) * 86400
+    table = TideTable.build(model, start, days, step_s)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    table.save(path)
+    logger.info(f"Built tide table {table.levels.shape} from {time.strftime('%Y-%m-%d', time.gmtime(start))} -> {path}")
+    return TideTable.load(path)
+
+
+def tides_from_env(environ=None, now=None):
+    """
+    AEGIS_TIDES=0 disables tides (wave run-up only).
+    AEGIS_TIDE_TABLE=<path.npy> keeps a memory-mapped table there (AEGIS_TIDE_TABLE_DAYS, default 400);
+    otherwise a 32-day in-memory table is built from yesterday.
+    """
+    env = os.environ if environ is None else environ
+    if env.get("AEGIS_TIDES", "1") == "0":
+        return None
+    model = TideModel()
+    now = time.time() if now is None else now
+    path = env.get("AEGIS_TIDE_TABLE")
+    if path:
+        model.use_table(load_or_build(model, path, float(env.get("AEGIS_TIDE_TABLE_DAYS", 400)), now=now))
+    else:
+        model.use_table(TideTable.build(model, math.floor((now - 86400) / 86400) * 86400, 32))
+    return model
@@ -0,0 +1,389 @@
+"""
+AEGIS Map Tiles
+Web-Mercator raster tiles (256 px PNG) rendered from backend state, with an
+in-memory LRU, an optional disk cache and background prefetch.
+
+  - Each layer is registered with a version function and a render function.
+    The version (e.g. the DEM id plus the quantized water level) is part of
+    every cache key, so a tile is rendered at most once per version.
+    Operators panning over the same area at the same water level only read
+    from cache.
+  - Lookups go memory LRU -> disk (<cache_dir>/<layer>/<version>/<z>/<x>/<y>.png)
+    -> render. Rendered tiles are written to both. Each layer keeps its
+    `disk_versions` most recently used version directories on disk; older
+    ones (including those left by earlier runs) are deleted.
+  - After each request, the neighbouring tiles and the four children one
+    zoom deeper are queued for a background worker. When a layer's version
+    changes (the surge rises), refresh() re-queues the recently viewed tiles
+    for the new version, so the next pan is already rendered.
+  - PNGs are encoded with zlib and struct only (RGBA, filter 0), so Pillow is
+    not required.
+"""
+
+import logging
+import math
+import os
+import shutil
+import struct
+import threading
+import zlib
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from aegis_sim.cache import LRUCache
+
+logger = logging.getLogger("Aegis.Tiles")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TILE_SIZE = 256
+MAX_ZOOM = 18
+
+
+def encode_png(rgba, level=6):
+    """Encode an (H, W, 4) uint8 array as a PNG."""
+    h, w, _ = rgba.shape
+    raw = np.zeros((h, w * 4 + 1), dtype=np.uint8)  # leading 0 per row = no filter
+    raw[:, 1:] = rgba.reshape(h, w * 4)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), level))
+            + chunk(b"IEND", b""))
+
+
+EMPTY_TILE = encode_png(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
+
+
+def tile_bounds(z, x, y):
+    """(lon_w, lat_s, lon_e, lat_n) of a slippy-map tile."""
+    n = 2 ** z
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def tile_grid(z, x, y, size=TILE_SIZE):
+    """Pixel-centre longitudes (size,) and latitudes (size,) of a tile."""
+    n = 2 ** z
+    f = (np.arange(size) + 0.5) / size
+    lon = (x + f) / n * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + f) / n))))
+    return lon, lat
+
+
+def colour_ramp(values, stops, colours):
+    """Piecewise-linear RGBA ramp: values (any shape) -> uint8 (..., 4)."""
+    out = np.empty(values.shape + (4,), dtype=np.uint8)
+    colours = np.asarray(colours, dtype=np.float64)
+    for ch in range(4):
+        out[..., ch] = np.interp(values, stops, colours[:, ch]).astype(np.uint8)
+    return out
+
+
+class TileLayer:
+    __slots__ = ("name", "version", "render", "bounds")
+
+    def __init__(self, name, version, render, bounds=None):
+        """
+        Args:
+            version: () -> hashable version string of the current state, or None if not ready.
+            render: (version, lon (N,), lat (N,)) -> (N, N, 4) uint8 RGBA.
+            bounds: (lat_min, lat_max, lon_min, lon_max); tiles outside are empty.
+        """
+        self.name = name
+        self.version = version
+        self.render = render
+        self.bounds = bounds
+
+
+def depth_layer(model, level_fn, name="inundation", max_depth_m=3.0):
+    """
+    Flood depth from an InundationModel at the water level given by level_fn() (None = not ready).
+    The version is '<dem id>@<quantized level>', so each level is rendered once.
+    """
+    lon0, lat0, dlon, dlat = model.transform
+    H, W = model.dem.shape
+    stops = (0.0, 0.01, 0.5, 1.5, max_depth_m)
+    colours = ((0, 0, 0, 0), (120, 200, 255, 140), (40, 120, 230, 170), (15, 60, 180, 200), (10, 25, 110, 220))
+
+    def version():
+        level = level_fn()
+        return None if level is None else f"{model.dem_id}@{model.quantize(level):.2f}"
+
+    def render(version, lon, lat):
+        # The model's depth cache is thread-safe: tiles render on request threads and the prefetch worker
+        depth = model.depth(float(version.rsplit("@", 1)[1]))
+        cols = np.floor((lon - lon0) / dlon).astype(np.int64)
+        rows = np.floor((lat0 - lat) / dlat).astype(np.int64)
+        inside = ((rows >= 0) & (rows < H))[:, None] & ((cols >= 0) & (cols < W))[None, :]
+        d = depth[np.clip(rows, 0, H - 1)[:, None], np.clip(cols, 0, W - 1)[None, :]]
+        return colour_ramp(np.where(inside, d, 0.0), stops, colours)
+
+    bounds = (lat0 - dlat * H, lat0, lon0, lon0 + dlon * W)
+    return TileLayer(name, version, render, bounds)
+
+
+def heatmap_layer(lats, lons, scores_fn, name="risk", radius_m=2500.0, step=5):
+    """
+    Risk heatmap: each point contributes score * Gaussian(radius_m), combined by max.
+    scores_fn() returns one 0-100 score per point (None = not ready); scores are
+    rounded to `step` for the version, so small score jitter does not re-render.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    sigma_lat = radius_m / 111_320.0
+    sigma_lon = sigma_lat / np.cos(np.radians(lats))
+    stops = (0.0, 15.0, 40.0, 65.0, 85.0, 100.0)
+    colours = ((0, 0, 0, 0), (40, 180, 80, 0), (120, 200, 60, 110), (250, 200, 40, 150),
+               (245, 110, 30, 180), (220, 30, 30, 210))
+
+    def version():
+        scores = scores_fn()
+        if scores is None:
+            return None
+        return ".".join(str(int(round(float(s) / step)) * step) for s in scores)
+
+    def render(version, lon, lat):
+        scores = [float(s) for s in version.split(".")]
+        out = np.zeros((lat.size, lon.size))
+        for i, score in enumerate(scores):
+            if score <= 0:
+                continue
+            # Separable kernel: one outer product per point
+            gy = np.exp(-0.5 * ((lat - lats[i]) / sigma_lat) ** 2)
+            gx = np.exp(-0.5 * ((lon - lons[i]) / sigma_lon[i]) ** 2)
+            np.maximum(out, score * np.outer(gy, gx), out=out)
+        return colour_ramp(out, stops, colours)
+
+    pad_lat = 4 * sigma_lat
+    pad_lon = 4 * float(sigma_lon.max()) if lons.size else 0.0
+    bounds = (lats.min() - pad_lat, lats.max() + pad_lat, lons.min() - pad_lon, lons.max() + pad_lon) if lats.size else None
+    return TileLayer(name, version, render, bounds)
+
+
+class TileCache:
+    def __init__(self, cache_dir=None, mem_size=2048, prefetch=True, max_queue=512, hot_tiles=256,
+                 disk_versions=8):
+        self.cache_dir = cache_dir
+        self.layers = {}
+        self._mem = LRUCache(mem_size)
+        self._lock = threading.Lock()
+        self._queue = OrderedDict()
+        self._max_queue = max_queue
+        self._wake = threading.Event()
+        self._hot = {}
+        self._hot_size = hot_tiles
+        self._versions = {}
+        self.rendered = 0
+        self.disk_hits = 0
+        self.prefetched = 0
+        self.prefetch = prefetch
+        self._worker = None
+        self._disk_versions = disk_versions
+        self._on_disk = {}  # layer -> OrderedDict of versions on disk, least recently used first
+        self.disk_evicted = 0
+        if cache_dir:
+            self._scan_disk()
+
+    def register(self, layer):
+        self.layers[layer.name] = layer
+        self._hot[layer.name] = deque(maxlen=self._hot_size)
+
+    # --- lookup ---
+
+    def get(self, name, z, x, y):
+        """(png bytes, version) for a tile; raises KeyError for an unknown layer, ValueError for bad coordinates."""
+        layer = self.layers[name]
+        if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f"Tile {z}/{x}/{y} is outside the pyramid")
+        version = layer.version()
+        if version is None:
+            return EMPTY_TILE, None
+        png = self._lookup(layer, version, z, x, y)
+        self._hot[name].append((z, x, y))
+        if self.prefetch:
+            self._enqueue_around(name, version, z, x, y)
+        return png, version
+
+    def _lookup(self, layer, version, z, x, y):
+        key = (layer.name, version, z, x, y)
+        with self._lock:
+            png = self._mem.get(key)
+        if png is not None:
+            return png
+        self._touch_disk(layer.name, version)
+        png = self._read_disk(key)
+        if png is not None:
+            self.disk_hits += 1
+        else:
+            png = self._render(layer, version, z, x, y)
+            self._write_disk(key, png)
+        with self._lock:
+            self._mem.put(key, png)
+        return png
+
+    def _render(self, layer, version, z, x, y):
+        if layer.bounds is not None:
+            lat_min, lat_max, lon_min, lon_max = layer.bounds
+            w, s, e, n = tile_bounds(z, x, y)
+            if e < lon_min or w > lon_max or n < lat_min or s > lat_max:
+                return EMPTY_TILE
+        lon, lat = tile_grid(z, x, y)
+        rgba = layer.render(version, lon, lat)
+        self.rendered += 1
+        if not rgba[..., 3].any():
+            return EMPTY_TILE
+        return encode_png(rgba)
+
+    def _path(self, key):
+        name, version, z, x, y = key
+        return os.path.join(self.cache_dir, name, str(version), str(z), str(x), f"{y}.png")
+
+    def _scan_disk(self):
+        """Pick up version directories from earlier runs (oldest first) and prune them to the limit."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        stale = []
+        for name in names:
+            layer_dir = os.path.join(self.cache_dir, name)
+            try:
+                versions = sorted(os.listdir(layer_dir), key=lambda v: os.path.getmtime(os.path.join(layer_dir, v)))
+            except OSError:
+                continue
+            on_disk = self._on_disk[name] = OrderedDict.fromkeys(versions)
+            while len(on_disk) > self._disk_versions:
+                stale.append((name, on_disk.popitem(last=False)[0]))
+        self._evict(stale)
+
+    def _touch_disk(self, name, version):
+        """Mark a layer version as used; delete the least recently used versions beyond the limit."""
+        if not self.cache_dir:
+            return
+        stale = []
+        with self._lock:
+            on_disk = self._on_disk.setdefault(name, OrderedDict())
+            on_disk[str(version)] = None
+            on_disk.move_to_end(str(version))
+            while len(on_disk) > self._disk_versions:
+                stale.append((name, on_disk.popitem(last=False)[0]))
+        self._evict(stale)
+
+    def _evict(self, stale):
+        for name, version in stale:
+            shutil.rmtree(os.path.join(self.cache_dir, name, version), ignore_errors=True)
+            self.disk_evicted += 1
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, png):
+        if not self.cache_dir or png is EMPTY_TILE:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Tile cache write failed ({path}): {e}")
+
+    # --- prefetch ---
+
+    def _enqueue(self, name, version, z, x, y):
+        if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return
+        key = (name, version, z, x, y)
+        with self._lock:
+            if key in self._mem or key in self._queue:
+                return
+            self._queue[key] = None
+            while len(self._queue) > self._max_queue:
+                self._queue.popitem(last=False)  # drop the stalest requests first
+        self._wake.set()
+
+    def _enqueue_around(self, name, version, z, x, y):
+        n = 2 ** z
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx or dy:
+                    self._enqueue(name, version, z, (x + dx) % n, y + dy)
+        if z < MAX_ZOOM:
+            for cx in (2 * x, 2 * x + 1):
+                for cy in (2 * y, 2 * y + 1):
+                    self._enqueue(name, version, z + 1, cx, cy)
+
+    def refresh(self):
+        """Queue recently viewed tiles of every layer whose version changed since the last call."""
+        for name, layer in self.layers.items():
+            version = layer.version()
+            if version is None or self._versions.get(name) == version:
+                continue
+            self._versions[name] = version
+            for z, x, y in reversed(list(self._hot[name])):
+                self._enqueue(name, version, z, x, y)
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="aegis-tile-prefetch", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        self._wake.clear()
+                        break
+                    key, _ = self._queue.popitem(last=True)  # newest first: closest to the viewer
+                name, version, z, x, y = key
+                layer = self.layers.get(name)
+                if layer is None or layer.version() != version:
+                    continue
+                try:
+                    self._lookup(layer, version, z, x, y)
+                    self.prefetched += 1
+                except Exception:
+                    logger.exception(f"Prefetch of {key} failed")
+
+    def get_stats(self):
+        with self._lock:
+            mem = self._mem.get_stats()
+            queued = len(self._queue)
+            disk_versions = sum(len(v) for v in self._on_disk.values())
+        return {"memory": mem, "disk_dir": self.cache_dir, "disk_hits": self.disk_hits,
+                "disk_versions": disk_versions, "disk_evicted": self.disk_evicted,
+                "rendered": self.rendered, "prefetched": self.prefetched, "queued": queued,
+                "versions": dict(self._versions)}
+
+
+def tiles_from_env(environ=None):
+    """
+    AEGIS_TILE_CACHE: disk cache directory (default <repo>/data/tiles; "" or "off" = memory only)
+    AEGIS_TILE_MEM: tiles kept in memory (default 2048)
+    AEGIS_TILE_DISK_VERSIONS: versions per layer kept on disk (default 8)
+    AEGIS_TILE_PREFETCH: 0 disables background prefetch
+    """
+    env = os.environ if environ is None else environ
+    cache_dir = env.get("AEGIS_TILE_CACHE", os.path.join(ROOT, "data", "tiles"))
+    if cache_dir.lower() in ("", "off", "none"):
+        cache_dir = None
+    return TileCache(cache_dir=cache_dir, mem_size=int(env.get("AEGIS_TILE_MEM", 2048)),
+                     prefetch=env.get("AEGIS_TILE_PREFETCH", "1") != "0",
+                     disk_versions=int(env.get("AEGIS_TILE_DISK_VERSIONS", 8)))
@@ -0,0 +1,97 @@
+"""
+AEGIS Telemetry Topics
+Per-client projections of the telemetry frame for /ws/telemetry.
+
+A client sends a subscribe message naming the topics it renders, optionally
+restricted to some sectors and stations:
+
+    {"action": "subscribe", "topics": ["alerts", "sectors"],
+     "sectors": ["Sector 3 - Dharavi"], "stations": ["synthetic-0"], "hz": 1}
+
+Clients with the same topics and sector filter share one Subscription key.
+The fan-out builds and serializes each distinct projection once per frame
+and sends the same text to every client with that key. Clients that never
+subscribe keep receiving the full frame, with no parsing at all.
+"""
+
+# Topic -> telemetry frame fields it carries
+TOPICS = {
+    "ocean": ("ocean", "physics", "key_metrics", "risk_zone", "window_for_action"),
+    "sectors": ("sectors", "risk_zone", "shelters", "inundation"),
+    "roads": ("roads",),
+    "forecast": ("forecast", "forecast_exceedance", "lstm_prediction", "hybrid_prediction",
+                 "prediction_mode", "cyclone"),
+    "fleet": ("drones", "ships"),
+    "alerts": ("alerts_seq", "risk_zone"),
+    "system": ("system", "recording"),
+}
+# Always sent, so every projection is a self-describing frame
+BASE_FIELDS = ("type", "timestamp", "data_timestamp", "station_id", "layers_version")
+# Fields keyed by sector name, trimmed by a sector filter
+SECTOR_KEYED = ("sectors", "forecast_exceedance")
+
+
+class Subscription:
+    __slots__ = ("topics", "sectors", "stations", "key", "fields")
+
+    def __init__(self, topics=None, sectors=None, stations=None):
+        """None for any argument means no restriction."""
+        self.topics = frozenset(topics) if topics is not None else None
+        self.sectors = frozenset(sectors) if sectors is not None else None
+        self.stations = frozenset(stations) if stations is not None else None
+        self.key = (self.topics, self.sectors)
+        if self.topics is None:
+            self.fields = None
+        else:
+            fields = dict.fromkeys(BASE_FIELDS)
+            for topic in sorted(self.topics):
+                fields.update(dict.fromkeys(TOPICS[topic]))
+            self.fields = tuple(fields)
+
+    @classmethod
+    def parse(cls, msg):
+        """Build a Subscription from a subscribe message; raises ValueError on bad input."""
+        topics = msg.get("topics")
+        if isinstance(topics, str):
+            topics = [topics]
+        sectors, stations = msg.get("sectors"), msg.get("stations")
+        for name, value in (("topics", topics), ("sectors", sectors), ("stations", stations)):
+            if value is not None and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+                raise ValueError(f"'{name}' must be a list of strings")
+        if topics is not None:
+            if "all" in topics:
+                topics = None
+            else:
+                unknown = sorted(set(topics) - set(TOPICS))
+                if unknown:
+                    raise ValueError(f"Unknown topics {unknown}; expected some of {sorted(TOPICS)}")
+        return cls(topics, sectors, stations)
+
+    @property
+    def full(self):
+        return self.topics is None and self.sectors is None
+
+    def wants(self, topic):
+        return self.topics is None or topic in self.topics
+
+    def accepts_station(self, station_id):
+        return self.stations is None or station_id in self.stations
+
+    def describe(self):
+        return {
+            "topics": sorted(self.topics) if self.topics is not None else "all",
+            "sectors": sorted(self.sectors) if self.sectors is not None else "all",
+            "stations": sorted(self.stations) if self.stations is not None else "all",
+        }
+
+
+def project(frame, sub):
+    """The part of a telemetry frame (dict) that `sub` asked for."""
+    fields = sub.fields if sub.fields is not None else tuple(frame)
+    out = {k: frame[k] for k in fields if k in frame}
+    if sub.sectors is not None:
+        for k in SECTOR_KEYED:
+            value = out.get(k)
+            if isinstance(value, dict):
+                out[k] = {name: v for name, v in value.items() if name in sub.sectors}
+    return out
@@ -0,0 +1,255 @@
+"""
+AEGIS Vessel Tracker
+AIS-style tracking of many vessels with vectorized dead reckoning and
+incremental zone events (sectors, port approaches).
+
+  - Positions, speeds and headings are NumPy arrays; step(dt) advances every
+    vessel along its heading. Vessels that leave the operating area turn
+    back towards its centre.
+  - Zones are circles. A uniform grid over the operating area maps each cell
+    to the few zones that overlap it, so a step only runs distance tests for
+    vessels in cells near a zone, plus vessels that were inside a zone on the
+    previous step.
+  - Zone membership is kept between steps, and step() returns only changes
+    as "enter" / "leave" events. They are also kept in a bounded history
+    addressed by sequence number.
+"""
+
+import itertools
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+M_PER_DEG = 111_320.0
+MS_PER_KNOT = 0.514444
+
+# lat_min, lat_max, lon_min, lon_max around Mumbai harbour and JNPT
+DEFAULT_BOUNDS = (18.80, 19.20, 72.70, 73.00)
+
+
+class VesselTracker:
+    def __init__(self, zones=(), bounds=DEFAULT_BOUNDS, turn_sigma_deg=1.0, history=1000, seed=None):
+        """
+        Args:
+            zones: Dicts with name, kind, lat, lon and radius_m.
+            bounds: Operating area (lat_min, lat_max, lon_min, lon_max).
+            turn_sigma_deg: Heading random walk per sqrt(second) for moving vessels.
+            history: Number of recent zone events kept for events_since().
+        """
+        self.rng = np.random.default_rng(seed)
+        self.bounds = bounds
+        self.turn_sigma_deg = turn_sigma_deg
+        lat0, lat1, lon0, lon1 = bounds
+        self.ref_lat, self.ref_lon = (lat0 + lat1) / 2.0, (lon0 + lon1) / 2.0
+        self._m_per_deg_lon = M_PER_DEG * math.cos(math.radians(self.ref_lat))
+
+        self.ids, self.names, self.types, self.statuses = [], [], [], []
+        f = np.zeros(0)
+        self.lat, self.lon, self.speed_knots, self.heading = f.copy(), f.copy(), f.copy(), f.copy()
+        self.steps = 0
+        self.events = deque(maxlen=history)
+        self._seq = itertools.count(1)
+        self.last_seq = 0
+        self.set_zones(zones)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- zones & spatial index ---
+
+    def set_zones(self, zones):
+        self.zones = [dict(z) for z in zones]
+        self.zone_index = {z["name"]: i for i, z in enumerate(self.zones)}
+        self.zone_risk = [z.get("risk", "LOW") for z in self.zones]
+        self._zx, self._zy = self._project(np.array([z["lat"] for z in self.zones], dtype=float),
+                                           np.array([z["lon"] for z in self.zones], dtype=float))
+        self._zr2 = np.array([z["radius_m"] for z in self.zones], dtype=float) ** 2
+        self.inside = np.zeros((len(self), len(self.zones)), dtype=bool)
+        self._build_grid()
+
+    def _build_grid(self):
+        lat0, lat1, lon0, lon1 = self.bounds
+        (x0, x1), (y0, y1) = self._project_x(np.array([lon0, lon1])), self._project_y(np.array([lat0, lat1]))
+        radius = max((z["radius_m"] for z in self.zones), default=1000.0)
+        self._cell = max(500.0, radius)
+        self._origin = (x0, y0)
+        nx = int(math.ceil((x1 - x0) / self._cell)) + 1
+        ny = int(math.ceil((y1 - y0) / self._cell)) + 1
+        self._shape = (nx, ny)
+
+        # Candidate zones per cell: every zone whose circle touches the cell
+        cx = x0 + (np.arange(nx) + 0.5) * self._cell
+        cy = y0 + (np.arange(ny) + 0.5) * self._cell
+        gx, gy = np.meshgrid(cx, cy, indexing="ij")
+        half = self._cell / 2.0
+        per_cell = [[] for _ in range(nx * ny)]
+        for zi in range(len(self.zones)):
+            ex = np.maximum(np.abs(gx - self._zx[zi]) - half, 0.0)
+            ey = np.maximum(np.abs(gy - self._zy[zi]) - half, 0.0)
+            for c in np.flatnonzero((ex * ex + ey * ey).ravel() <= self._zr2[zi]):
+                per_cell[c].append(zi)
+        width = max((len(c) for c in per_cell), default=0)
+        rows = [c for c in per_cell if c]
+        self._cell_row = np.full(nx * ny, -1, dtype=np.intp)
+        self._cand = np.full((len(rows), max(width, 1)), -1, dtype=np.intp)
+        r = 0
+        for c, zs in enumerate(per_cell):
+            if zs:
+                self._cell_row[c] = r
+                self._cand[r, :len(zs)] = zs
+                r += 1
+
+    def set_zone_risk(self, name, risk):
+        """Tag a zone with its current risk level; reported on later events."""
+        i = self.zone_index.get(name)
+        if i is not None:
+            self.zone_risk[i] = risk
+
+    def _project_x(self, lon):
+        return (lon - self.ref_lon) * self._m_per_deg_lon
+
+    def _project_y(self, lat):
+        return (lat - self.ref_lat) * M_PER_DEG
+
+    def _project(self, lat, lon):
+        return self._project_x(lon), self._project_y(lat)
+
+    # --- vessels ---
+
+    def add(self, id, name, lat, lon, speed_knots=0.0, heading=0.0, type="cargo", status="In Transit"):
+        self.ids.append(id)
+        self.names.append(name)
+        self.types.append(type)
+        self.statuses.append(status)
+        self.lat = np.append(self.lat, float(lat))
+        self.lon = np.append(self.lon, float(lon))
+        self.speed_knots = np.append(self.speed_knots, float(speed_knots))
+        self.heading = np.append(self.heading, float(heading) % 360.0)
+        self.inside = np.vstack([self.inside, np.zeros((1, len(self.zones)), dtype=bool)])
+
+    def add_random(self, n, prefix="ais-sim"):
+        """Add `n` vessels at random positions, speeds and headings inside the bounds."""
+        lat0, lat1, lon0, lon1 = self.bounds
+        base = len(self)
+        rng = self.rng
+        types = rng.choice(["cargo", "fishing", "tanker", "passenger"], n)
+        speeds = np.where(types == "fishing", rng.uniform(1, 5, n), rng.uniform(4, 16, n))
+        self.ids += [f"{prefix}-{base + i}" for i in range(n)]
+        self.names += [f"AIS-{base + i}" for i in range(n)]
+        self.types += types.tolist()
+        self.statuses += ["In Transit"] * n
+        self.lat = np.concatenate([self.lat, rng.uniform(lat0, lat1, n)])
+        self.lon = np.concatenate([self.lon, rng.uniform(lon0, lon1, n)])
+        self.speed_knots = np.concatenate([self.speed_knots, speeds])
+        self.heading = np.concatenate([self.heading, rng.uniform(0, 360, n)])
+        self.inside = np.vstack([self.inside, np.zeros((n, len(self.zones)), dtype=bool)])
+
+    @classmethod
+    def from_records(cls, records, zones=(), **kwargs):
+        """Build a tracker from backend-style ship dicts (id, name, type, status, lat, lon, ...)."""
+        tracker = cls(zones, **kwargs)
+        for s in records:
+            tracker.add(s["id"], s["name"], s["lat"], s["lon"], s.get("speed_knots", 0.0),
+                        s.get("heading", 0.0), s.get("type", "cargo"), s.get("status", "In Transit"))
+        tracker.step(0.0)  # initial membership
+        return tracker
+
+    def step(self, dt):
+        """Dead-reckon every vessel by `dt` seconds and return the zone events it caused."""
+        if len(self) == 0:
+            return []
+        if dt > 0:
+            self._advance(dt)
+        self.steps += 1
+        return self._update_zones()
+
+    def _advance(self, dt):
+        moving = self.speed_knots > 0
+        n_moving = int(moving.sum())
+        if n_moving == 0:
+            return
+        self.heading[moving] += self.rng.normal(0.0, self.turn_sigma_deg * math.sqrt(dt), n_moving)
+        h = np.radians(self.heading)
+        d = self.speed_knots * MS_PER_KNOT * dt
+        self.lat += d * np.cos(h) / M_PER_DEG
+        self.lon += d * np.sin(h) / self._m_per_deg_lon
+
+        lat0, lat1, lon0, lon1 = self.bounds
+        out = moving & ((self.lat < lat0) | (self.lat > lat1) | (self.lon < lon0) | (self.lon > lon1))
+        if out.any():
+            x, y = self._project(self.lat[out], self.lon[out])
+            self.heading[out] = np.degrees(np.arctan2(-x, -y))
+        self.heading %= 360.0
+
+    def _update_zones(self):
+        if not self.zones:
+            return []
+        x, y = self._project(self.lat, self.lon)
+        nx, ny = self._shape
+        ix = np.floor((x - self._origin[0]) / self._cell).astype(np.intp)
+        iy = np.floor((y - self._origin[1]) / self._cell).astype(np.intp)
+        inb = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+        row = np.full(len(self), -1, dtype=np.intp)
+        row[inb] = self._cell_row[ix[inb] * ny + iy[inb]]
+
+        near = np.flatnonzero(row >= 0)
+        # Only rows near a zone now, or inside one before, can change
+        check = np.union1d(near, np.flatnonzero(self.inside.any(axis=1)))
+        if check.size == 0:
+            return []
+        new = np.zeros((check.size, len(self.zones)), dtype=bool)
+        pos = np.searchsorted(check, near)
+        if near.size:
+            cz = self._cand[row[near]]
+            valid = cz >= 0
+            czc = np.where(valid, cz, 0)
+            dx = x[near, None] - self._zx[czc]
+            dy = y[near, None] - self._zy[czc]
+            hit = valid & (dx * dx + dy * dy <= self._zr2[czc])
+            vi, k = np.nonzero(hit)
+            new[pos[vi], czc[vi, k]] = True
+
+        old = self.inside[check]
+        changed = new != old
+        if not changed.any():
+            return []
+        self.inside[check] = new
+        now = time.time()
+        events = []
+        for r, zi in zip(*np.nonzero(changed)):
+            vi = int(check[r])
+            zone = self.zones[zi]
+            event = {"seq": next(self._seq), "time": now, "event": "enter" if new[r, zi] else "leave",
+                     "vessel_id": self.ids[vi], "vessel": self.names[vi], "vessel_type": self.types[vi],
+                     "zone": zone["name"], "zone_kind": zone["kind"], "risk": self.zone_risk[zi]}
+            events.append(event)
+            self.events.append(event)
+        self.last_seq = events[-1]["seq"]
+        return events
+
+    def events_since(self, seq=0, limit=500):
+        """Recorded events with a sequence number above `seq` (oldest first)."""
+        return [e for e in self.events if e["seq"] > seq][:limit]
+
+    def occupancy(self):
+        counts = self.inside.sum(axis=0)
+        return {z["name"]: int(c) for z, c in zip(self.zones, counts)}
+
+    def snapshot(self, limit=None):
+        """Backend payload records (the first `limit` vessels)."""
+        n = len(self) if limit is None else min(limit, len(self))
+        cols = zip(self.ids[:n], self.names[:n], self.types[:n], self.statuses[:n],
+                   np.round(self.speed_knots[:n], 1).tolist(), np.round(self.lat[:n], 5).tolist(),
+                   np.round(self.lon[:n], 5).tolist(), np.round(self.heading[:n]).astype(int).tolist())
+        return [
+            {"id": i, "name": name, "type": t, "status": st, "speed_knots": spd,
+             "lat": la, "lon": lo, "heading": hd}
+            for i, name, t, st, spd, la, lo, hd in cols
+        ]
+
+    def get_stats(self):
+        return {"vessels": len(self), "zones": len(self.zones), "steps": self.steps,
+                "last_event_seq": self.last_seq, "grid_cells": int(self._cell_row.size),
+                "occupancy": self.occupancy()}
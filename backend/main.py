@@ -3,21 +3,46 @@ AEGIS Cortex - FastAPI Backend
 AI-Powered Predictive Flood Monitoring System
 Target: Mumbai, Maharashtra, India
 """
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Header, HTTPException
+from fastapi import Query
+from fastapi.responses import PlainTextResponse, Response
+from pydantic import BaseModel, Field, model_validator
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
-import math
 import time
 import random
 import sys
 import os
+import json
+import logging
 import numpy as np
 from collections import deque
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from aegis_sim.engine import calculate_stockdon_runup, calculate_flood_risk
+from aegis_sim.engine import calculate_stockdon_runup, calculate_runup_bulk, calculate_flood_risk, get_runup_backend
+from aegis_sim.ensemble import forecast_ensemble
 from aegis_sim.inference import InferenceEngine
 from aegis_sim.recorder import get_recorder
+from aegis_sim.ingest import SENSOR_FIELDS, source_from_env
+from aegis_sim.scheduler import TickScheduler, parse_rates
+from aegis_sim.executor import executor_from_env
+from aegis_sim.bus import bus_from_env
+from aegis_sim.metrics import metrics_from_env
+from aegis_sim import profiler
+from aegis_sim.cache import LRUCache
+from aegis_sim.evaluator import ShadowEvaluator
+from aegis_sim.fleet import DroneFleet
+from aegis_sim.vessels import VesselTracker
+from aegis_sim.alerts import AlertEngine
+from aegis_sim.topics import Subscription, project
+from aegis_sim.layers import GEOJSON_MEDIA_TYPE, LayerStore, point_features
+from aegis_sim.inundation import inundation_from_env
+from aegis_sim.tiles import depth_layer, heatmap_layer, tiles_from_env
+from aegis_sim.tides import tides_from_env
+from aegis_sim.cyclone import CATEGORIES, CycloneTrack, evaluate_track
+from aegis_sim.analogs import DEFAULT_WINDOW, CadenceBuffer, analogs_from_env
+from aegis_sim.qc import qc_from_env
+from aegis_sim.features import FEATURE_NAMES, FeatureEngine
 
 app = FastAPI(title="AEGIS Cortex", version="1.0",
               description="AI-Powered Predictive Flood Monitoring - Mumbai, India")
@@ -27,11 +52,44 @@ app.add_middleware(
     allow_methods=["*"], allow_headers=["*"],
 )
 
-inference = InferenceEngine()
+logger = logging.getLogger("Aegis.Backend")
+
+# Heavy pieces stay cold until startup: ONNX sessions load in the background
+# while ticks run physics-only, so a restart accepts connections immediately.
+inference = InferenceEngine(lazy=True)
 recorder = get_recorder()
+ingest = source_from_env()
+executor = executor_from_env()
+bus = bus_from_env()
+metrics = metrics_from_env()
 sensor_buffer = deque(maxlen=24)
+# Derived LSTM inputs (aegis_sim/features.py), one incremental update per buffered reading;
+# the LSTM picks the columns its scaler_params name
+feature_engine = FeatureEngine()
+feature_buffer = deque(maxlen=sensor_buffer.maxlen)
+# Streaming QC between ingest and the stages (None = AEGIS_QC=0, readings pass through);
+# flags raised since the last recorded row are written with it
+qc = qc_from_env()
+qc_pending = set()
 PREDICTION_MODE = "hybrid"
 
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get("AEGIS_ADMIN_TOKEN", "")
+# Live forecast skill; AEGIS_ADAPTIVE_ALPHA=0 keeps the fixed 0.6 blend (score only)
+evaluator = ShadowEvaluator(adapt=os.environ.get("AEGIS_ADAPTIVE_ALPHA", "1") != "0")
+# Poll models/ for a retrained LSTM every N seconds (0 disables; admin reload still works)
+MODEL_WATCH_S = float(os.environ.get("AEGIS_MODEL_WATCH_S", 5))
+
+# Per-stage tick rates in Hz; override with e.g. AEGIS_RATES="physics=4,forecast=1/30"
+STAGE_RATES = parse_rates(os.environ.get("AEGIS_RATES", ""), {
+    "physics": 2.0,
+    "lstm": 0.2,
+    "forecast": 1 / 60,
+    "simulation": 2.0,
+    "record": 1.0,
+    "broadcast": 2.0,
+})
+
 
 CITY = {
     "name": "Mumbai",
@@ -70,6 +128,27 @@ SECTORS = {
     },
 }
 
+SECTOR_WALLS = {name: info["wall_height"] for name, info in SECTORS.items()}
+SECTOR_NAMES = tuple(SECTORS)
+SECTOR_WALL_ARRAY = np.array([SECTORS[n]["wall_height"] for n in SECTOR_NAMES])
+
+# Astronomical tide (aegis_sim/tides.py); None = wave run-up on mean sea level only.
+# Row 0 of every lookup is the city gauge, then one row per sector's nearest gauge.
+tides = tides_from_env()
+CITY_TIDE_STATION = "APOLLO-BUNDER"
+SECTOR_TIDE_STATIONS = {"Sector 4 - JNPT / Nhava Sheva": "JNPT", "Sector 5 - Juhu Beach": "VERSOVA"}
+TIDE_ROWS = [CITY_TIDE_STATION] + [SECTOR_TIDE_STATIONS.get(n, CITY_TIDE_STATION) for n in SECTOR_NAMES]
+FORECAST_HOURS, FORECAST_STEP_MIN = 4, 10
+
+# Cyclone track set by operators (/api/admin/cyclone); re-scored on every forecast run
+CYCLONE_STEP_MIN = 15
+CYCLONE_HORIZON_H = float(os.environ.get("AEGIS_CYCLONE_HORIZON_H", 48))
+SECTOR_SITES = {"lat": np.array([SECTORS[n]["lat"] for n in SECTOR_NAMES]),
+                "lon": np.array([SECTORS[n]["lon"] for n in SECTOR_NAMES]),
+                "wall_height": SECTOR_WALL_ARRAY}
+cyclone = {"track": None, "result": None}
+ENSEMBLE_MEMBERS = int(os.environ.get("AEGIS_ENSEMBLE_MEMBERS", 200))
+
 ROADS = {
     "Marine Drive": 1.8,
     "Western Express Hwy": 4.5,
@@ -137,9 +216,15 @@ DRONES = [
      "signal_dbm": -30, "data_rate": "0kb/s"},
     {"id": "drone-delta", "name": "Delta", "status": "RETURNING", "battery": 23,
      "altitude_m": 45, "speed_ms": 6.1, "lat": 19.0988, "lon": 72.8267,
-     "signal_dbm": -68, "data_rate": "4kb/s"},
+     "signal_dbm": -68, "data_rate": "4kb/s",
+     "home_lat": 19.0981, "home_lon": 72.8342},  # flying back to its pad at Juhu Aerodrome
 ]
 
+# Vectorized fleet state; AEGIS_EXTRA_DRONES adds simulated drones around the city
+fleet = DroneFleet.from_records(DRONES)
+fleet.add_random(int(os.environ.get("AEGIS_EXTRA_DRONES", 0)), CITY["lat"], CITY["lon"])
+_sim_clock = {"last": None}
+
 SHIPS = [
     {"id": "mv-101", "name": "MV Mumbai Maersk", "type": "cargo", "status": "In Transit", "speed_knots": 12.5, "lat": 18.8800, "lon": 72.9200, "heading": 310},
     {"id": "mv-102", "name": "INS Teg", "type": "military", "status": "Patrol", "speed_knots": 18.0, "lat": 18.9200, "lon": 72.7500, "heading": 290},
@@ -154,6 +239,20 @@ PORTS = [
     {"id": "port-3", "name": "Mumbai Port Trust Docks", "lat": 18.9350, "lon": 72.8450, "status": "Active", "capacity": 65},
 ]
 
+# Vessel tracking zones: coastal sectors and port approaches
+SECTOR_ZONE_M = 3000
+PORT_APPROACH_M = 4000
+VESSEL_ZONES = (
+    [{"name": name, "kind": "sector", "lat": info["lat"], "lon": info["lon"], "radius_m": SECTOR_ZONE_M}
+     for name, info in SECTORS.items()]
+    + [{"name": p["name"], "kind": "port", "lat": p["lat"], "lon": p["lon"], "radius_m": PORT_APPROACH_M}
+       for p in PORTS]
+)
+# AEGIS_EXTRA_VESSELS adds simulated AIS traffic; AEGIS_SHIPS_IN_PAYLOAD caps the broadcast list
+vessels = VesselTracker.from_records(SHIPS, VESSEL_ZONES)
+vessels.add_random(int(os.environ.get("AEGIS_EXTRA_VESSELS", 0)))
+SHIPS_IN_PAYLOAD = int(os.environ.get("AEGIS_SHIPS_IN_PAYLOAD", 500))
+
 POPULATION_HOTSPOTS = [
     {"lat": 19.0438, "lon": 72.8534, "density": "Very High", "count": 65000, "label": "Dharavi"},
     {"lat": 19.0540, "lon": 72.8400, "density": "High", "count": 35000, "label": "Kurla West"},
@@ -162,42 +261,106 @@ POPULATION_HOTSPOTS = [
 ]
 
 
+# Shelter fields that change at runtime; the rest is served as a static layer
+SHELTER_LIVE_FIELDS = ("current_occupancy", "status", "safe_routes_available")
+
+# Static map layers, served from /api/layers/{name}; telemetry carries only layers.version
+layers = LayerStore()
+layers.publish("city", point_features([CITY]))
+layers.publish("shelters", point_features(
+    [{k: v for k, v in sh.items() if k not in SHELTER_LIVE_FIELDS} for sh in SHELTERS], "id"))
+layers.publish("infrastructure", point_features(INFRASTRUCTURE))
+layers.publish("ports", point_features(PORTS, "id"))
+layers.publish("population_hotspots", point_features(POPULATION_HOTSPOTS))
+
+
 class ConnectionManager:
     def __init__(self):
         self.active: list[WebSocket] = []
+        self.min_interval: dict[WebSocket, float] = {}
+        self.last_sent: dict[WebSocket, float] = {}
+        self.subs: dict[WebSocket, Subscription] = {}
     async def connect(self, ws: WebSocket):
         await ws.accept()
         self.active.append(ws)
     def disconnect(self, ws: WebSocket):
         self.active.remove(ws)
+        self.min_interval.pop(ws, None)
+        self.last_sent.pop(ws, None)
+        self.subs.pop(ws, None)
+    def subscribe(self, ws: WebSocket, sub: Subscription):
+        """Restrict this client's frames to a topic/sector/station projection."""
+        if sub.full and sub.stations is None:
+            self.subs.pop(ws, None)
+        else:
+            self.subs[ws] = sub
+    def set_rate(self, ws: WebSocket, hz):
+        """Client preference for telemetry frames per second (capped by the broadcast stage)."""
+        try:
+            hz = float(hz)
+        except (TypeError, ValueError):
+            return
+        if hz > 0:
+            self.min_interval[ws] = 1.0 / hz
     async def broadcast(self, msg: dict):
         for ws in list(self.active):
             try:
                 await ws.send_json(msg)
             except:
                 pass
+    async def broadcast_text(self, text: str, topic: str = None):
+        for ws in list(self.active):
+            sub = self.subs.get(ws)
+            if topic and sub is not None and not sub.wants(topic):
+                continue
+            try:
+                await ws.send_text(text)
+            except:
+                pass
+    async def broadcast_telemetry(self, text: str, nbytes: int = None):
+        """Send a pre-serialized frame to every client whose preferred rate is due.
+        Subscribed clients get their projection; each distinct projection is built and
+        serialized once per frame and shared. Returns (clients sent to, bytes sent,
+        projections built)."""
+        now = time.monotonic()
+        full = (text, len(text.encode("utf-8")) if nbytes is None else nbytes)
+        frame = None
+        projections = {}
+        sent = total = 0
+        for ws in list(self.active):
+            interval = self.min_interval.get(ws)
+            # 5% slack so a 1 Hz client on a 2 Hz stage is not pushed to every 3rd frame by jitter
+            if interval and now - self.last_sent.get(ws, 0.0) < interval * 0.95:
+                continue
+            out = full
+            sub = self.subs.get(ws)
+            if sub is not None:
+                if frame is None:
+                    frame = json.loads(text)
+                if not sub.accepts_station(frame.get("station_id")):
+                    continue
+                if not sub.full:
+                    out = projections.get(sub.key)
+                    if out is None:
+                        body = encode_message(project(frame, sub))
+                        out = projections[sub.key] = (body.decode("utf-8"), len(body))
+            try:
+                await ws.send_text(out[0])
+                self.last_sent[ws] = now
+                sent += 1
+                total += out[1]
+            except:
+                pass
+        return sent, total, len(projections)
 
 mgr = ConnectionManager()
 
-def generate_forecast(base_H0: float, base_T: float, beta: float, hours: int = 4):
-    forecast = []
-    for minute in range(0, hours * 60, 10):
-        storm_factor = 1.0 + 0.25 * math.sin(minute * 0.015) + 0.08 * (minute / 240)
-        H0 = max(0.3, base_H0 * storm_factor + random.uniform(-0.15, 0.15))
-        T = max(4, base_T + math.sin(minute * 0.01) * 1.2)
-        runup = calculate_stockdon_runup(H0, T, beta)
-        forecast.append({
-            "time_offset_min": minute,
-            "label": f"+{minute}m",
-            "wave_height": round(H0, 2),
-            "runup_m": round(runup, 3),
-        })
-    return forecast
-
-def compute_sector_risks(runup: float):
+def compute_sector_risks(runup: float, still_water=None):
+    """Score sectors for run-up on top of the still-water level; `still_water` maps sector -> level [m] (default MSL)."""
     sectors = {}
     for name, info in SECTORS.items():
-        margin = info["wall_height"] - runup
+        level = runup + (still_water[name] if still_water else 0.0)
+        margin = info["wall_height"] - level
         if margin < 0:
             score = min(100, int(88 + abs(margin) * 12))
             status = "CRITICAL"
@@ -215,7 +378,7 @@ def compute_sector_risks(runup: float):
             status = "LOW"
             rate = "Stable"
         
-        affected_pop = int(info["population"] * max(0, min(1, (runup / info["wall_height"])**2)))
+        affected_pop = int(info["population"] * max(0, min(1, (max(level, 0.0) / info["wall_height"])**2)))
         sectors[name] = {
             "score": min(100, max(0, score)),
             "status": status,
@@ -247,12 +410,6 @@ def compute_road_status(runup: float):
             result[road] = {"depth_cm": round(depth * 100, 1), "status": "FLOODED", "color": "red", "passable": False}
     return result, safe_count
 
-def get_coastal_temp():
-    hour = int(time.strftime("%H"))
-    base = 28.0
-    variation = -2 * math.cos((hour - 14) * math.pi / 12)
-    return round(base + variation + random.uniform(-0.5, 0.5), 1)
-
 def get_risk_zone(overall_risk: str, runup: float, min_wall: float):
     margin = min_wall - runup
     if overall_risk == "CRITICAL":
@@ -279,173 +436,647 @@ def compute_window_for_action(runup: float, min_wall: float):
     s = total_secs % 60
     return {"hours": min(h, 99), "mins": m, "secs": s, "total_secs": total_secs, "urgent": total_secs < 3600}
 
-alert_log = []
+# What-if scenarios are quantized (1 cm, 0.1 s, 0.001 slope, 1 cm still water) so that
+# slider sweeps land on cached entries; each entry is the encoded JSON body.
+SCENARIO_QUANTUM = (0.01, 0.1, 0.001, 0.01)
+SCENARIO_BATCH_MAX = 1000
+SCENARIO_OFFLOAD_MIN = 64
+scenario_cache = LRUCache(int(os.environ.get("AEGIS_SCENARIO_CACHE", 4096)))
 
-async def telemetry_loop():
-    t0 = time.time()
-    while True:
-        await asyncio.sleep(0.5)
-        elapsed = time.time() - t0
+def scenario_key(H0: float, T: float, beta: float, tide: float):
+    return tuple(round(v / q) for v, q in zip((H0, T, beta, tide), SCENARIO_QUANTUM))
+
+def evaluate_scenarios(keys):
+    """Evaluate quantized scenario keys, returning encoded JSON bodies.
+    Run-up is computed for the whole batch in one vectorized call and scored on
+    top of the scenario's still-water level, like the live physics stage."""
+    grid = np.array(keys, dtype=np.float64) * np.array(SCENARIO_QUANTUM)
+    runups = calculate_runup_bulk(grid[:, 0], grid[:, 1], grid[:, 2])
+    min_wall = min(SECTOR_WALLS.values())
+    bodies = []
+    for (H0, T, beta, tide), runup in zip(grid.tolist(), runups.tolist()):
+        water_level = runup + tide
+        overall_risk = calculate_flood_risk(water_level, min_wall)
+        sectors = compute_sector_risks(runup, dict.fromkeys(SECTOR_NAMES, tide))
+        roads, safe_routes = compute_road_status(water_level)
+        bodies.append(encode_message({
+            "inputs": {"H0": round(H0, 2), "T": round(T, 1), "beta": round(beta, 3), "tide": round(tide, 2)},
+            "runup_m": round(runup, 3),
+            "water_level_m": round(water_level, 3),
+            "overall_risk": overall_risk,
+            "sectors": sectors,
+            "roads": roads,
+            "safe_routes": f"{safe_routes}/{len(roads)}",
+            "total_affected": sum(s["affected_population"] for s in sectors.values()),
+            "risk_zone": get_risk_zone(overall_risk, water_level, min_wall),
+            "window_for_action": compute_window_for_action(water_level, min_wall),
+        }))
+    return bodies
+
+async def cached_scenarios(keys):
+    """Serve keys from the LRU cache and evaluate the misses in one batch."""
+    bodies = [scenario_cache.get(k) for k in keys]
+    missing = list(dict.fromkeys(k for k, b in zip(keys, bodies) if b is None))
+    if not missing:
+        return bodies
+    if len(missing) >= SCENARIO_OFFLOAD_MIN:
+        fresh = await executor.run_io(evaluate_scenarios, missing)
+    else:
+        fresh = evaluate_scenarios(missing)
+    fresh = dict(zip(missing, fresh))
+    for k, body in fresh.items():
+        scenario_cache.put(k, body)
+    return [b if b is not None else fresh[k] for k, b in zip(keys, bodies)]
+
+alerts = AlertEngine()
+inundation = None  # InundationModel, loaded in the background at startup
+analogs = None  # AnalogIndex over the buoy archive + recordings, built in the background at startup
+analog_buffer = None  # CadenceBuffer: live readings averaged to the archive's cadence, once the index is built
+# Station searched for live analogs when the live feed's own station has no history
+ANALOG_STATION = os.environ.get("AEGIS_ANALOG_STATION", "BUOY-MUM-01")
+
+# XYZ raster tiles; "inundation" is registered once the DEM has loaded
+tiles = tiles_from_env()
+tiles.register(heatmap_layer(
+    [SECTORS[n]["lat"] for n in SECTOR_NAMES], [SECTORS[n]["lon"] for n in SECTOR_NAMES],
+    lambda: [world["sectors"][n]["score"] for n in SECTOR_NAMES] if world["sectors"] else None))
+
+
+world = {
+    "reading": None,
+    "runup": None,
+    "tide": 0.0,
+    "water_level": None,
+    "min_wall": None,
+    "overall_risk": None,
+    "sectors": None,
+    "roads": None,
+    "safe_routes": 0,
+    "total_affected": 0,
+    "risk_zone": None,
+    "window": None,
+    "lstm_prediction": None,
+    "hybrid_prediction": None,
+    "forecast": None,
+    "forecast_exceedance": {},
+    "inundation": None,
+    "cyclone": None,
+    "cyclone_margin": None,
+    "recording": recorder.get_stats(),
+    "qc_flags": [],
+}
 
-        H0 = max(0.5, 2.0 + 1.2 * math.sin(elapsed * 0.025) + random.uniform(-0.1, 0.1))
-        T = max(5, 9.0 + 2.0 * math.cos(elapsed * 0.018))
-        wind = max(1, 6.0 + 3.0 * math.sin(elapsed * 0.03) + random.uniform(-0.5, 0.5))
-        pressure = max(970, 1008 - 8 * math.sin(elapsed * 0.02) + random.uniform(-1, 1))
-        temp = get_coastal_temp()
 
-        runup = calculate_stockdon_runup(H0, T, CITY["beach_slope"])
+def buffer_reading(reading):
+    row = [reading[f] for f in SENSOR_FIELDS]
+    sensor_buffer.append(row)
+    feature_buffer.append(feature_engine.update(row, reading["timestamp"]))
+    if analog_buffer is not None:
+        analog_buffer.add(reading["timestamp"], row)
+
+
+def reset_buffers():
+    sensor_buffer.clear()
+    feature_buffer.clear()
+    feature_engine.reset()
+    if analog_buffer is not None:
+        analog_buffer.clear()
+
+
+async def ingest_loop():
+    """Pump readings from the ingest source through QC into the shared sensor state."""
+    await ingest.start()
+    buffered = False  # whether sensor_buffer[-1] is the previous reading
+    async for reading in ingest:
+        if qc is not None:
+            with metrics.timer("ingest.qc"):
+                result = qc.process(reading)
+            qc_pending.update(result.flags)
+            if result.drop:
+                continue
+            if result.revise and buffered:
+                # The last "spike" was a real onset: give the LSTM its raw values back
+                for field, value in result.revise.items():
+                    sensor_buffer[-1][SENSOR_FIELDS.index(field)] = value
+                feature_buffer[-1] = feature_engine.revise(sensor_buffer[-1])
+            if result.reset:
+                reset_buffers()
+            for filled in result.fill:
+                buffer_reading(filled)
+            reading = result.reading
+            world["qc_flags"] = result.flags
+        # A stuck sensor still drives physics but is kept out of the LSTM window
+        buffered = qc is None or not result.masked
+        if buffered:
+            buffer_reading(reading)
+        world["reading"] = reading
+    logger.warning("Ingest source exhausted; no new readings will arrive")
+
+
+def physics_stage():
+    reading = world["reading"]
+    if reading is None:
+        return False
+    with metrics.timer("physics.runup"):
+        runup = calculate_stockdon_runup(reading["wave_height_m"], reading["period_s"], CITY["beach_slope"])
+    # Total water level = astronomical tide + wave run-up, now and 3 h ahead
+    if tides is not None:
+        with metrics.timer("physics.tide"):
+            tide_now, tide_3h = tides.level([reading["timestamp"], reading["timestamp"] + 3 * 3600], TIDE_ROWS).T
+    else:
+        tide_now = tide_3h = np.zeros(len(TIDE_ROWS))
+    tide = float(tide_now[0])
+    water_level = runup + tide
+    sector_tide = tide_now[1:]
+    with metrics.timer("physics.scoring"):
         min_wall = min(s["wall_height"] for s in SECTORS.values())
-        overall_risk = calculate_flood_risk(runup, min_wall)
+        overall_risk = calculate_flood_risk(water_level, min_wall)
+        sectors = compute_sector_risks(runup, dict(zip(SECTOR_NAMES, sector_tide.tolist())))
+        roads, safe_routes = compute_road_status(water_level)
+    evaluator.observe(reading["timestamp"], runup, reading["station_id"])
+    world.update({
+        "runup": runup,
+        "tide": tide,
+        "water_level": water_level,
+        "min_wall": min_wall,
+        "overall_risk": overall_risk,
+        "sectors": sectors,
+        "roads": roads,
+        "safe_routes": safe_routes,
+        "total_affected": sum(s["affected_population"] for s in sectors.values()),
+        "risk_zone": get_risk_zone(overall_risk, water_level, min_wall),
+        "window": compute_window_for_action(water_level, min_wall),
+    })
+    if inundation is not None:
+        with metrics.timer("physics.inundation"):
+            world["inundation"] = inundation.summary(water_level)
+    tiles.refresh()
 
-        sensor_buffer.append([H0, T, temp, wind, pressure])
-        
-        lstm_prediction = None
-        hybrid_prediction = None
-        if len(sensor_buffer) >= 24:
-            sequence = np.array(list(sensor_buffer), dtype=np.float32)
-            lstm_prediction = inference.predict_lstm(sequence)
-            hybrid_prediction = inference.predict_hybrid(sequence, runup, alpha=0.6)
-
-        sectors = compute_sector_risks(runup)
-        roads, safe_routes = compute_road_status(runup)
-        forecast = generate_forecast(H0, T, CITY["beach_slope"], hours=4)
-        
-        total_affected = sum(s["affected_population"] for s in sectors.values())
-        risk_zone = get_risk_zone(overall_risk, runup, min_wall)
-        window = compute_window_for_action(runup, min_wall)
-
-        # Simulate drone updates
-        for d in DRONES:
-            if d["status"] == "ACTIVE":
-                d["lat"] += random.uniform(-0.0005, 0.0005)
-                d["lon"] += random.uniform(-0.0005, 0.0005)
-                d["battery"] = max(10, d["battery"] - random.uniform(0, 0.05))
-                d["altitude_m"] += random.uniform(-2, 2)
-                d["speed_ms"] = max(0, d["speed_ms"] + random.uniform(-0.3, 0.3))
-        
-        # Simulate Ship Movement
-        for s in SHIPS:
-            if s["speed_knots"] > 0:
-                s["lat"] += random.uniform(-0.0002, 0.0002) * (s["speed_knots"]/20)
-                s["lon"] += random.uniform(-0.0002, 0.0002) * (s["speed_knots"]/20)
-                s["heading"] = (s["heading"] + random.uniform(-2, 2)) % 360
-        
-        # Update shelter occupancy
-        for sh in SHELTERS:
-            if sh["status"] == "OPEN" and risk_zone["zone"] != "GREEN ZONE":
-                pct = sh["current_occupancy"] / sh["capacity"]
-                if pct < 0.9:
-                    sh["current_occupancy"] = min(sh["capacity"],
-                        sh["current_occupancy"] + random.randint(0, 3))
-
-        # Generate alerts
-        for name, s in sectors.items():
-            if s["status"] == "CRITICAL" and random.random() < 0.015:
-                ts = time.strftime("%H:%M")
-                alert_log.append({"time": ts, "message": f"{name} - Risk Level CRITICAL",
-                                  "severity": "critical", "type": "risk"})
-            elif s["status"] == "HIGH" and random.random() < 0.008:
-                ts = time.strftime("%H:%M")
-                alert_log.append({"time": ts, "message": f"{name} - Risk Updated to HIGH",
-                                  "severity": "high", "type": "risk"})
-        
-        while len(alert_log) > 30:
-            alert_log.pop(0)
-
-        peak_prediction_time = "06:00 AM" if H0 < 2.5 else "04:30 AM"
-
-        recorder.record_telemetry(
-            ocean={"wave_height_m": H0, "wave_period_s": T, "wind_speed_mps": wind,
-                   "pressure_hpa": pressure, "temp_c": temp},
-            physics={"runup_m": runup, "overall_risk": overall_risk},
-            lstm=lstm_prediction,
-            system={"inference_device": inference.get_device_status(),
-                    "model_loaded": inference.lstm_loaded},
-            mode=PREDICTION_MODE,
-        )
-
-        payload = {
-            "type": "telemetry",
-            "timestamp": time.time(),
-            "city": CITY,
-            "ocean": {
-                "wave_height_m": round(H0, 2),
-                "wave_period_s": round(T, 1),
-                "wind_speed_mps": round(wind, 2),
-                "pressure_hpa": round(pressure, 1),
-                "temp_c": temp,
-            },
-            "physics": {
-                "runup_m": round(runup, 3),
-                "overall_risk": overall_risk,
-                "max_runup_m": round(max(f["runup_m"] for f in forecast), 3),
-            },
-            "lstm_prediction": lstm_prediction,
-            "hybrid_prediction": hybrid_prediction,
+    for name, s in sectors.items():
+        vessels.set_zone_risk(name, s["status"])
+
+    # Rule-based alerts with hysteresis and cooldown (aegis_sim/alerts.py)
+    lstm = world["lstm_prediction"]
+    lstm_3h = lstm["runup_3h"] if lstm and lstm.get("source") == "LSTM-ONNX" else np.nan
+    alerts.evaluate({
+        "score": np.array([sectors[n]["score"] for n in SECTOR_NAMES], dtype=np.float64),
+        "margin_m": SECTOR_WALL_ARRAY - (runup + sector_tide),
+        "forecast_margin_3h_m": SECTOR_WALL_ARRAY - (lstm_3h + tide_3h[1:]),
+        "cyclone_margin_m": world["cyclone_margin"] if world["cyclone_margin"] is not None else np.nan,
+    }, SECTOR_NAMES)
+
+
+def _predict(sequence, runup, feature_names=None):
+    with metrics.timer("lstm.inference"):
+        lstm = inference.predict_lstm(sequence, feature_names)
+    with metrics.timer("lstm.hybrid"):
+        hybrid = inference.predict_hybrid(sequence, runup, alpha=evaluator.alpha(), lstm_pred=lstm)
+    return lstm, hybrid
+
+
+async def lstm_stage():
+    if not inference.ready or len(sensor_buffer) < sensor_buffer.maxlen or world["runup"] is None:
+        return False
+    # Snapshot on the loop thread; ONNX Runtime releases the GIL while the pool runs it.
+    sequence = np.array(list(feature_buffer), dtype=np.float32)
+    reading = world["reading"]
+    lstm, hybrid = await executor.run_io(_predict, sequence, world["runup"], FEATURE_NAMES)
+    world["lstm_prediction"] = lstm
+    world["hybrid_prediction"] = hybrid
+    if lstm["source"] == "LSTM-ONNX":  # never score the mock fallback as LSTM skill
+        evaluator.record_forecast(reading["timestamp"], lstm["raw_forecast"], hybrid["physics_forecast"],
+                                  hybrid["hybrid_forecast"], reading["station_id"])
+
+
+async def forecast_stage():
+    reading = world["reading"]
+    if reading is None:
+        return False
+    still_water = None
+    if tides is not None:
+        minutes = np.arange(0, FORECAST_HOURS * 60, FORECAST_STEP_MIN)
+        still_water = tides.level(reading["timestamp"] + minutes * 60.0, [CITY_TIDE_STATION])[0]
+    ensemble = await executor.run_cpu(
+        forecast_ensemble, reading["wave_height_m"], reading["period_s"], CITY["beach_slope"],
+        wall_heights=SECTOR_WALLS, members=ENSEMBLE_MEMBERS, hours=FORECAST_HOURS,
+        step_min=FORECAST_STEP_MIN, still_water=still_water)
+    world["forecast"] = ensemble["steps"]
+    world["forecast_exceedance"] = ensemble["exceedance"]
+    with metrics.timer("forecast.cyclone"):
+        update_cyclone()
+
+
+def update_cyclone(now=None):
+    """Score tide + surge + run-up at every sector along the current cyclone track."""
+    track = cyclone["track"]
+    now = time.time() if now is None else now
+    end = min(track.times[-1], now + CYCLONE_HORIZON_H * 3600) if track is not None else now
+    if track is None or end <= now:
+        if track is not None:
+            logger.info(f"Cyclone track {track.name} has passed; clearing it")
+        cyclone.update(track=None, result=None)
+        world.update(cyclone=None, cyclone_margin=None)
+        return
+    times = np.arange(now, end + 1, CYCLONE_STEP_MIN * 60.0)
+    tide = tides.level(times, TIDE_ROWS[1:]).T if tides is not None else None
+    reading = world["reading"]
+    result = evaluate_track(track, SECTOR_SITES, times,
+                            base_hs=reading["wave_height_m"] if reading else 0.0,
+                            base_tp=reading["period_s"] if reading else 8.0,
+                            beta=CITY["beach_slope"], tide=tide)
+    scored = compute_sector_risks(0.0, dict(zip(SECTOR_NAMES, result["peak_total_m"].tolist())))
+    sectors = {}
+    for i, name in enumerate(SECTOR_NAMES):
+        sectors[name] = {
+            "peak_water_level_m": round(float(result["peak_total_m"][i]), 3),
+            "peak_time": float(result["peak_time"][i]),
+            "peak_surge_m": round(float(result["peak_surge_m"][i]), 3),
+            "max_wind_ms": round(float(result["max_wind_ms"][i]), 1),
+            "min_pressure_hpa": round(float(result["min_pressure_hpa"][i]), 1),
+            "closest_km": round(float(result["closest_km"][i]), 1),
+            "margin_m": round(float(result["min_margin_m"][i]), 3),
+            "score": scored[name]["score"],
+            "status": scored[name]["status"],
+        }
+    cyclone["result"] = result
+    world["cyclone"] = {"track": track.describe(), "evaluated_at": now, "step_min": CYCLONE_STEP_MIN,
+                        "sectors": sectors}
+    world["cyclone_margin"] = result["min_margin_m"]
+
+
+def simulation_stage():
+    # Advance drones and vessels by the wall time since the last run
+    now = time.monotonic()
+    last = _sim_clock["last"]
+    _sim_clock["last"] = now
+    if last is not None:
+        fleet.step(now - last)
+        for e in vessels.step(now - last):
+            if e["event"] == "enter" and e["zone_kind"] == "sector" and e["risk"] in ("HIGH", "CRITICAL"):
+                alerts.add(f"{e['vessel']} entered {e['zone']} ({e['risk']})",
+                           e["risk"].lower(), "vessel", subject=e["zone"])
+
+    # Update shelter occupancy
+    risk_zone = world["risk_zone"]
+    if risk_zone is None:
+        return
+    for sh in SHELTERS:
+        if sh["status"] == "OPEN" and risk_zone["zone"] != "GREEN ZONE":
+            pct = sh["current_occupancy"] / sh["capacity"]
+            if pct < 0.9:
+                sh["current_occupancy"] = min(sh["capacity"],
+                    sh["current_occupancy"] + random.randint(0, 3))
+
+
+def _record(**kwargs):
+    recorder.record_telemetry(**kwargs)
+    return recorder.get_stats()
+
+
+def _drain_qc_flags():
+    flags = ";".join(sorted(qc_pending))
+    qc_pending.clear()
+    return flags
+
+
+async def record_stage():
+    reading = world["reading"]
+    if reading is None or world["runup"] is None:
+        return False
+    world["recording"] = await executor.run_io(
+        _record,
+        ocean={"wave_height_m": reading["wave_height_m"], "wave_period_s": reading["period_s"],
+               "wind_speed_mps": reading["wind_speed_mps"],
+               "pressure_hpa": reading["pressure_hpa"], "temp_c": reading["temp_c"]},
+        physics={"runup_m": world["runup"], "overall_risk": world["overall_risk"]},
+        lstm=world["lstm_prediction"],
+        system={"inference_device": inference.get_device_status(),
+                "model_loaded": inference.lstm_loaded},
+        mode=PREDICTION_MODE,
+        station_id=reading["station_id"],
+        qc_flags=_drain_qc_flags(),
+    )
+
+
+def build_payload():
+    """Assemble the telemetry frame from the latest output of every stage."""
+    reading = world["reading"]
+    H0 = reading["wave_height_m"]
+    runup = world["runup"]
+    roads = world["roads"]
+    forecast = world["forecast"]
+    temp = reading["temp_c"]
+    peak_prediction_time = "06:00 AM" if H0 < 2.5 else "04:30 AM"
+
+    return {
+        "type": "telemetry",
+        "timestamp": time.time(),
+        "data_timestamp": reading["timestamp"],
+        "station_id": reading["station_id"],
+        "layers_version": layers.version,
+        "ocean": {
+            "wave_height_m": round(H0, 2),
+            "wave_period_s": round(reading["period_s"], 1),
+            "wind_speed_mps": round(reading["wind_speed_mps"], 2),
+            "pressure_hpa": round(reading["pressure_hpa"], 1),
+            "temp_c": temp,
+            "qc_flags": world["qc_flags"],
+        },
+        "physics": {
+            "runup_m": round(runup, 3),
+            "overall_risk": world["overall_risk"],
+            "max_runup_m": round(max(f["runup_m"] for f in forecast), 3),
+            "max_runup_p90_m": round(max(f["runup_p90"] for f in forecast), 3),
+            "tide_m": round(world["tide"], 3),
+            "water_level_m": round(world["water_level"], 3),
+        },
+        "lstm_prediction": world["lstm_prediction"],
+        "hybrid_prediction": world["hybrid_prediction"],
+        "prediction_mode": PREDICTION_MODE,
+        "risk_zone": world["risk_zone"],
+        "window_for_action": world["window"],
+        "key_metrics": {
+            "max_wave_runup": round(runup, 2),
+            "affected_population": world["total_affected"],
+            "safe_routes": f"{world['safe_routes']}/{len(roads)}",
+            "coastal_temp_c": temp,
+            "est_water_level_m": round(world["water_level"], 1),
+            "rate_of_rise": f"+{random.uniform(0.2, 0.8):.1f}cm/hr",
+            "risk_velocity": round(random.uniform(8, 18), 1),
+            "peak_prediction": peak_prediction_time,
+            "flood_water_rise_12h": round(runup * 0.6, 1),
+        },
+        "sectors": world["sectors"],
+        "inundation": world["inundation"],
+        "cyclone": world["cyclone"],
+        "roads": roads,
+        "forecast": forecast,
+        "forecast_exceedance": world["forecast_exceedance"],
+        "shelters": [{"id": sh["id"], **{k: sh[k] for k in SHELTER_LIVE_FIELDS}} for sh in SHELTERS],
+        "drones": fleet.snapshot(),
+        "ships": vessels.snapshot(SHIPS_IN_PAYLOAD),
+        "alerts_seq": alerts.last_seq,
+        "recording": world["recording"],
+        "system": {
+            "inference_device": inference.get_device_status(),
+            "onnx_providers": inference.providers,
+            "model_loaded": inference.session is not None,
+            "lstm_loaded": inference.lstm_loaded,
+            "update_hz": STAGE_RATES["broadcast"],
+            "physics_engine": "Stockdon2006",
+            "lstm_engine": "AEGIS-LSTM-v1" if inference.lstm_loaded else "Mock",
+            "lstm_version": inference.lstm_version,
             "prediction_mode": PREDICTION_MODE,
-            "risk_zone": risk_zone,
-            "window_for_action": window,
-            "key_metrics": {
-                "max_wave_runup": round(runup, 2),
-                "affected_population": total_affected,
-                "safe_routes": f"{safe_routes}/{len(roads)}",
-                "coastal_temp_c": temp,
-                "est_water_level_m": round(runup, 1),
-                "rate_of_rise": f"+{random.uniform(0.2, 0.8):.1f}cm/hr",
-                "risk_velocity": round(random.uniform(8, 18), 1),
-                "peak_prediction": peak_prediction_time,
-                "flood_water_rise_12h": round(runup * 0.6, 1),
-            },
-            "sectors": sectors,
-            "roads": roads,
-            "forecast": forecast,
-            "shelters": SHELTERS,
-            "infrastructure": INFRASTRUCTURE,
-            "drones": DRONES,
-            "ships": SHIPS,
-            "ports": PORTS,
-            "population_hotspots": POPULATION_HOTSPOTS,
-            "alerts": alert_log[-10:],
-            "recording": recorder.get_stats(),
-            "system": {
-                "inference_device": inference.get_device_status(),
-                "onnx_providers": inference.providers,
-                "model_loaded": inference.session is not None,
-                "lstm_loaded": inference.lstm_loaded,
-                "update_hz": 2,
-                "physics_engine": "Stockdon2006",
-                "lstm_engine": "AEGIS-LSTM-v1" if inference.lstm_loaded else "Mock",
-                "prediction_mode": PREDICTION_MODE,
-            }
+            "role": bus.role,
+            "ingest": ingest.get_stats(),
+            "scheduler": scheduler.get_stats(),
+            "executor": executor.get_stats(),
         }
-        await mgr.broadcast(payload)
+    }
+
+
+def encode_message(msg: dict) -> bytes:
+    return json.dumps(msg, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+async def broadcast_stage():
+    if world["runup"] is None or world["forecast"] is None:
+        return False
+    with metrics.timer("broadcast.build"):
+        payload = build_payload()
+    with metrics.timer("broadcast.serialize"):
+        body = encode_message(payload)
+    metrics.set_gauge("telemetry_frame_bytes", len(body))
+    new_alerts = alerts.drain()
+    if new_alerts:
+        await bus.publish("alert", encode_message({"type": "alerts", "alerts": new_alerts}))
+    await bus.publish("telemetry", body)
+
+
+def handle_command(msg: str):
+    """Apply an operator command to producer state; returns the alert action to announce."""
+    if msg.startswith("{"):
+        # Structured commands only come from admin REST endpoints, never from WebSocket clients
+        command = json.loads(msg)
+        if command.get("command") == "cyclone_track":
+            try:
+                track = CycloneTrack.from_points(command["points"], command.get("name", "TC"))
+            except (KeyError, TypeError, ValueError):
+                logger.exception("Rejected cyclone track command")
+                return None
+            cyclone["track"] = track
+            # Clears the track again if it has already passed
+            update_cyclone()
+            alerts.add(f"Cyclone track updated: {track.name}", "high", "cyclone")
+            return "CYCLONE_TRACK_UPDATED"
+        if command.get("command") == "cyclone_clear":
+            cyclone["track"] = None
+            update_cyclone()
+            return "CYCLONE_TRACK_CLEARED"
+        return None
+    if "AUTHORIZE" in msg:
+        alerts.add("EVACUATION AUTHORIZED by Commander", "critical", "action")
+        return "EVACUATION_AUTHORIZED"
+    elif "DEPLOY_WARNING" in msg:
+        alerts.add("Warning deployed to all zones", "high", "action")
+        return "WARNING_DEPLOYED"
+    elif "EMERGENCY_BROADCAST" in msg:
+        alerts.add("Emergency broadcast sent to all users", "critical", "broadcast")
+        return "EMERGENCY_BROADCAST"
+    return None
+
+
+async def command_loop():
+    """Producer side: apply commands forwarded by every gateway worker."""
+    while True:
+        msg = (await bus.next_command()).decode("utf-8", errors="replace")
+        try:
+            action = handle_command(msg)
+            if action:
+                await bus.publish("alert", encode_message({"type": "alert", "action": action}))
+        except Exception:
+            logger.exception(f"Command failed: {msg[:200]}")
+
+
+async def fanout_loop():
+    """Every worker: relay bus frames to the WebSocket clients connected to this process."""
+    async for topic, body in bus.subscribe():
+        text = body.decode("utf-8")
+        if topic == "telemetry":
+            start = time.perf_counter()
+            sent, nbytes, projections = await mgr.broadcast_telemetry(text, len(body))
+            metrics.observe("fanout", time.perf_counter() - start)
+            metrics.inc("ws_bytes_sent_total", nbytes)
+            metrics.set_gauge("ws_bytes_per_tick", nbytes)
+            metrics.set_gauge("ws_projections_per_tick", projections)
+        else:
+            if topic == "alert" and bus.role != "producer" and text.startswith('{"type":"alerts"'):
+                alerts.remember(json.loads(text)["alerts"])
+            await mgr.broadcast_text(text, topic="alerts")
+
+
+# Reads of producer-only state (water level, sectors, cyclone, models, sensor history, vessels).
+# A gateway worker never fills that state, so it proxies these reads to the producer
+# over the bus and every worker answers from the one world state.
+PROXY_TIMEOUT_S = float(os.environ.get("AEGIS_PROXY_TIMEOUT_S", 5))
+producer_reads = {}
+
+
+def producer_read(name, offload=False):
+    """Register `fn(**params) -> Response` (or a coroutine function) as a producer read; `offload` runs it on the thread pool."""
+    def register(fn):
+        producer_reads[name] = (fn, offload)
+        return fn
+    return register
+
+
+def json_response(body, status_code=200):
+    return Response(content=encode_message(body), status_code=status_code, media_type="application/json")
+
+
+async def _run_read(name, params):
+    fn, offload = producer_reads[name]
+    try:
+        if asyncio.iscoroutinefunction(fn):
+            return await fn(**params)
+        return await executor.run_io(fn, **params) if offload else fn(**params)
+    except HTTPException as e:
+        return json_response({"detail": e.detail}, e.status_code)
+
+
+async def read_state(name, **params):
+    """Answer a producer-state read in this worker, or proxy it to the producer from a gateway."""
+    if bus.role != "gateway":
+        return await _run_read(name, params)
+    try:
+        reply = await bus.request(encode_message({"read": name, "params": params}), PROXY_TIMEOUT_S)
+    except (asyncio.TimeoutError, ConnectionError):
+        raise HTTPException(status_code=503, detail="Telemetry producer is not reachable")
+    head, _, content = reply.partition(b"\n")
+    meta = json.loads(head)
+    return Response(content=content, status_code=meta["status"], headers=meta["headers"])
+
+
+async def answer_read(token, body):
+    try:
+        request = json.loads(body)
+        response = await _run_read(request["read"], request["params"])
+    except Exception:
+        logger.exception("Proxied read failed")
+        response = json_response({"detail": "Internal Server Error"}, 500)
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    bus.reply(token, encode_message({"status": response.status_code, "headers": headers}) + b"\n" + response.body)
+
+
+async def request_loop():
+    """Producer side: answer reads proxied by gateway workers."""
+    while True:
+        token, body = await bus.next_request()
+        asyncio.create_task(answer_read(token, body))
+
+
+scheduler = TickScheduler(observer=metrics.record_stage)
+scheduler.add_stage("physics", physics_stage, STAGE_RATES["physics"])
+scheduler.add_stage("lstm", lstm_stage, STAGE_RATES["lstm"])
+scheduler.add_stage("forecast", forecast_stage, STAGE_RATES["forecast"])
+scheduler.add_stage("simulation", simulation_stage, STAGE_RATES["simulation"])
+scheduler.add_stage("record", record_stage, STAGE_RATES["record"])
+scheduler.add_stage("broadcast", broadcast_stage, STAGE_RATES["broadcast"])
+
+STARTED_AT = time.time()
+
+async def load_models():
+    try:
+        await executor.run_io(inference.load)
+        logger.info(f"Models ready in {inference.load_s:.3f}s (LSTM loaded: {inference.lstm_loaded})")
+    except Exception:
+        inference.state = "failed"
+        logger.exception("Model loading failed; serving physics-only")
+
+async def load_inundation():
+    global inundation
+    try:
+        inundation = await executor.run_io(inundation_from_env)
+        tiles.register(depth_layer(inundation, lambda: world["water_level"]))
+        logger.info(f"Inundation DEM ready: {inundation.get_stats()['shape']}")
+    except Exception:
+        logger.exception("Inundation DEM failed to load; flood extents disabled")
+
+async def load_analogs():
+    global analogs, analog_buffer
+    try:
+        analogs = await executor.run_io(analogs_from_env)
+        if analogs is not None:
+            logger.info(f"Analog index ready: {len(analogs.stations)} stations")
+            # Live queries are averaged to the archive's cadence, never compared sample for sample
+            ref = analogs.stations.get(ANALOG_STATION) or next(iter(analogs.stations.values()), None)
+            if ref is not None and ref.step_s > 0:
+                analog_buffer = CadenceBuffer(ref.step_s)
+    except Exception:
+        logger.exception("Analog index failed to build; analog search disabled")
+
+async def model_watch_loop():
+    """Hot-swap the LSTM when its files change; a failed load keeps the current model."""
+    while True:
+        await asyncio.sleep(MODEL_WATCH_S)
+        if inference.ready:
+            await executor.run_io(inference.check_for_update)
 
 @app.on_event("startup")
 async def startup():
-    asyncio.create_task(telemetry_loop())
+    role = await bus.start()
+    asyncio.create_task(fanout_loop())
+    if role == "producer":
+        # Flood extents, tiles and analogs serve producer state; gateways proxy to them
+        asyncio.create_task(load_inundation())
+        asyncio.create_task(load_analogs())
+        if tiles.prefetch:
+            tiles.start()
+        asyncio.create_task(request_loop())
+        asyncio.create_task(load_models())
+        if MODEL_WATCH_S > 0:
+            asyncio.create_task(model_watch_loop())
+        asyncio.create_task(ingest_loop())
+        asyncio.create_task(command_loop())
+        scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await scheduler.stop()
+    executor.shutdown()
+    await bus.close()
 
 @app.websocket("/ws/telemetry")
 async def ws_telemetry(ws: WebSocket):
     await mgr.connect(ws)
     try:
+        # Alerts are pushed once as they are raised; new clients get the recent backlog
+        await ws.send_text(encode_message({"type": "alerts", "alerts": alerts.recent(10), "backlog": True})
+                           .decode("utf-8"))
         while True:
             msg = await ws.receive_text()
-            if "AUTHORIZE" in msg:
-                ts = time.strftime("%H:%M")
-                alert_log.append({"time": ts, "message": "EVACUATION AUTHORIZED by Commander",
-                                  "severity": "critical", "type": "action"})
-                await mgr.broadcast({"type": "alert", "action": "EVACUATION_AUTHORIZED"})
-            elif "DEPLOY_WARNING" in msg:
-                ts = time.strftime("%H:%M")
-                alert_log.append({"time": ts, "message": "Warning deployed to all zones",
-                                  "severity": "high", "type": "action"})
-                await mgr.broadcast({"type": "alert", "action": "WARNING_DEPLOYED"})
-            elif "EMERGENCY_BROADCAST" in msg:
-                ts = time.strftime("%H:%M")
-                alert_log.append({"time": ts, "message": "Emergency broadcast sent to all users",
-                                  "severity": "critical", "type": "broadcast"})
-                await mgr.broadcast({"type": "alert", "action": "EMERGENCY_BROADCAST"})
+            if msg.startswith("{"):
+                try:
+                    command = json.loads(msg)
+                except json.JSONDecodeError:
+                    continue
+                if command.get("action") == "set_rate":
+                    mgr.set_rate(ws, command.get("hz"))
+                elif command.get("action") == "subscribe":
+                    try:
+                        sub = Subscription.parse(command)
+                    except ValueError as e:
+                        await ws.send_text(encode_message({"type": "error", "detail": str(e)}).decode("utf-8"))
+                        continue
+                    mgr.subscribe(ws, sub)
+                    if command.get("hz") is not None:
+                        mgr.set_rate(ws, command.get("hz"))
+                    await ws.send_text(encode_message({"type": "subscribed", **sub.describe()}).decode("utf-8"))
+            elif any(k in msg for k in ("AUTHORIZE", "DEPLOY_WARNING", "EMERGENCY_BROADCAST")):
+                await bus.send_command(msg.encode("utf-8"))
     except WebSocketDisconnect:
+        pass
+    finally:
         mgr.disconnect(ws)
 
 @app.get("/")
@@ -453,6 +1084,25 @@ def root():
     return {"status": "AEGIS Cortex Online", "version": "1.0", "city": CITY["name"],
             "lstm_loaded": inference.lstm_loaded, "prediction_mode": PREDICTION_MODE}
 
+@app.get("/health/live")
+def health_live():
+    """The process is up and serving requests."""
+    return {"status": "live", "pid": os.getpid(), "uptime_s": round(time.time() - STARTED_AT, 3)}
+
+@app.get("/health/ready")
+def health_ready():
+    """503 until this worker can serve full telemetry: models loaded (producer) or upstream connected (gateway)."""
+    if bus.role == "gateway":
+        ready = bus.get_stats().get("upstream_connected", False)
+        detail = {"role": "gateway", "upstream_connected": ready}
+    else:
+        ready = inference.ready
+        detail = {"role": bus.role, "model_state": inference.state, "lstm_loaded": inference.lstm_loaded,
+                  "model_load_s": round(inference.load_s, 3) if inference.load_s is not None else None}
+    body = {"status": "ready" if ready else "not_ready", **detail}
+    return Response(content=encode_message(body), media_type="application/json",
+                    status_code=200 if ready else 503)
+
 @app.get("/api/system")
 def system_status():
     return {
@@ -468,9 +1118,360 @@ def system_status():
         "sectors": list(SECTORS.keys()),
         "roads": list(ROADS.keys()),
         "shelters": [s["name"] for s in SHELTERS],
-        "drones": [d["name"] for d in DRONES],
-        "ships": [s["name"] for s in SHIPS],
+        "drones": list(fleet.names),
+        "fleet": fleet.get_stats(),
+        "ships": vessels.names[:SHIPS_IN_PAYLOAD],
+        "vessels": vessels.get_stats(),
+        "alerts": alerts.get_stats(),
+        "inundation": inundation.get_stats() if inundation is not None else None,
+        "tides": tides.get_stats() if tides is not None else None,
+        "analogs": analogs.get_stats() if analogs is not None else None,
+        "analog_buffer": analog_buffer.get_stats() if analog_buffer is not None else None,
+        "qc": qc.get_stats() if qc is not None else None,
+        "tiles": tiles.get_stats(),
+        "role": bus.role,
+        "pid": os.getpid(),
+        "bus": bus.get_stats(),
+        "ingest": ingest.get_stats(),
+        "scheduler": scheduler.get_stats(),
+        "executor": executor.get_stats(),
+        "stage_timings": metrics.snapshot(),
+        "scenario_cache": scenario_cache.get_stats(),
+        "runup_lut": get_runup_backend().get_stats() if get_runup_backend() else None,
+    }
+
+class Scenario(BaseModel):
+    H0: float = Field(gt=0, le=30, description="Deep-water wave height [m]")
+    T: float = Field(gt=0, le=30, description="Wave period [s]")
+    beta: float = Field(default=CITY["beach_slope"], gt=0, le=1, description="Beach slope")
+    tide: float | None = Field(default=None, ge=-5, le=10, description="Still-water level [m above MSL]; default the current predicted tide")
+
+class ScenarioBatch(BaseModel):
+    scenarios: list[Scenario] = Field(min_length=1, max_length=SCENARIO_BATCH_MAX)
+
+@producer_read("still_water")
+def _still_water():
+    return json_response({"tide": world["tide"]})
+
+async def current_still_water():
+    """The producer's current predicted tide at the city gauge (0 = MSL when tides are off)."""
+    if bus.role != "gateway":
+        return world["tide"]
+    response = await read_state("still_water")
+    return json.loads(response.body)["tide"]
+
+@app.get("/api/scenario")
+async def scenario(H0: float = Query(gt=0, le=30), T: float = Query(gt=0, le=30),
+                   beta: float = Query(default=CITY["beach_slope"], gt=0, le=1),
+                   tide: float = Query(default=None, ge=-5, le=10, description="Still-water level [m above MSL]; default the current predicted tide")):
+    """What-if run-up, sector and road impact for one (H0, T, beta) on a still-water level."""
+    if tide is None:
+        tide = await current_still_water()
+    (body,) = await cached_scenarios([scenario_key(H0, T, beta, tide)])
+    return Response(content=body, media_type="application/json")
+
+@app.post("/api/scenario/batch")
+async def scenario_batch(batch: ScenarioBatch):
+    """Evaluate up to SCENARIO_BATCH_MAX scenarios; results keep the request order."""
+    now = await current_still_water() if any(s.tide is None for s in batch.scenarios) else None
+    bodies = await cached_scenarios([scenario_key(s.H0, s.T, s.beta, now if s.tide is None else s.tide)
+                                     for s in batch.scenarios])
+    content = b'{"count":%d,"results":[' % len(bodies) + b",".join(bodies) + b"]}"
+    return Response(content=content, media_type="application/json")
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Per-stage tick timings, overruns, clients and bytes/tick in Prometheus text format."""
+    metrics.set_gauge("ws_clients", len(mgr.active))
+    for name, stage in scheduler.stages.items():
+        metrics.set_gauge("stage_skipped_ticks", stage.skipped, stage=name)
+    metrics.set_gauge("bus_subscriber_drops", bus.get_stats()["subscriber_drops"])
+    cache = scenario_cache.get_stats()
+    metrics.set_counter("scenario_cache_hits_total", cache["hits"])
+    metrics.set_counter("scenario_cache_misses_total", cache["misses"])
+    metrics.set_gauge("scenario_cache_entries", cache["size"])
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def require_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/api/admin/profile")
+async def admin_profile(seconds: float = 10.0, interval_ms: float = 5.0, tracemalloc: bool = False,
+                        x_aegis_admin_token: str = Header(default="")):
+    """
+    Sample every thread of this worker for `seconds` and return a collapsed-stack
+    flamegraph file, or JSON with top allocation sites when `tracemalloc=true`.
+    """
+    require_admin(x_aegis_admin_token)
+    try:
+        # Own thread, not the executor: the pools being profiled must stay free.
+        result = await asyncio.to_thread(profiler.capture, seconds, interval_ms / 1000.0, tracemalloc)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if tracemalloc:
+        return result
+    filename = f"aegis-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return PlainTextResponse(result["collapsed"], headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Profile-Samples": str(result["samples"]),
+    })
+
+class TrackPoint(BaseModel):
+    time: float = Field(description="Epoch seconds")
+    lat: float = Field(ge=-60, le=60)
+    lon: float = Field(ge=-180, le=360)
+    vmax_ms: float = Field(default=None, gt=0, le=100, description="Max sustained wind [m/s]")
+    vmax_kt: float = Field(default=None, gt=0, le=200, description="Max sustained wind [kt], if vmax_ms is not given")
+    pc_hpa: float = Field(default=None, ge=850, le=1015, description="Central pressure [hPa]")
+    rmax_km: float = Field(default=None, gt=0, le=500, description="Radius of maximum wind [km]")
+
+    @model_validator(mode="after")
+    def _has_wind(self):
+        if self.vmax_ms is None and self.vmax_kt is None:
+            raise ValueError("Each track point needs vmax_ms or vmax_kt")
+        return self
+
+class CycloneTrackIn(BaseModel):
+    name: str = "TC"
+    points: list[TrackPoint] = Field(default=None, min_length=2, max_length=500)
+    category: str = Field(default=None, description=f"Synthetic straight track instead of points: {', '.join(CATEGORIES)}")
+    landfall_lat: float = CITY["lat"]
+    landfall_lon: float = CITY["lon"]
+    landfall_in_h: float = Field(default=24.0, ge=0, le=240)
+    heading_deg: float = 60.0
+    speed_kmh: float = Field(default=15.0, gt=0, le=80)
+
+@app.post("/api/admin/cyclone")
+async def admin_cyclone_track(body: CycloneTrackIn, x_aegis_admin_token: str = Header(default="")):
+    """Set the cyclone track (observed + forecast points, or a synthetic IMD-category track) to score against."""
+    require_admin(x_aegis_admin_token)
+    try:
+        if body.points is not None:
+            track = CycloneTrack.from_points([p.model_dump() for p in body.points], body.name)
+        elif body.category in CATEGORIES:
+            track = CycloneTrack.synthetic(body.category, body.landfall_lat, body.landfall_lon,
+                                           time.time() + body.landfall_in_h * 3600, body.heading_deg,
+                                           body.speed_kmh, name=body.name if body.name != "TC" else None)
+        else:
+            raise ValueError(f"Give either points or a category from {list(CATEGORIES)}")
+        if track.times[-1] <= time.time():
+            raise ValueError("Track ends in the past; give at least one forecast point")
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    points = [{"time": t, "lat": la, "lon": lo, "vmax_ms": v, "pc_hpa": p, "rmax_km": r / 1000.0}
+              for t, la, lo, v, p, r in zip(*(a.tolist() for a in (track.times, track.lat, track.lon, track.vmax,
+                                                                    track.pc, track.rmax)))]
+    # Scored on the producer, like every other operator command
+    await bus.send_command(encode_message({"command": "cyclone_track", "name": track.name, "points": points}))
+    return {"accepted": True, "track": track.describe()}
+
+@app.delete("/api/admin/cyclone")
+async def admin_cyclone_clear(x_aegis_admin_token: str = Header(default="")):
+    require_admin(x_aegis_admin_token)
+    await bus.send_command(encode_message({"command": "cyclone_clear"}))
+    return {"accepted": True}
+
+@app.post("/api/admin/model/reload")
+async def admin_model_reload(x_aegis_admin_token: str = Header(default="")):
+    """Load, warm up and swap in the LSTM from models/ without dropping clients."""
+    require_admin(x_aegis_admin_token)
+    # Models run on the producer; gateways forward the swap to it
+    return await read_state("model_reload")
+
+
+@producer_read("model_reload")
+async def _model_reload():
+    try:
+        await executor.run_io(inference.reload_lstm)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Reload failed, current model kept: {e}")
+    return json_response(inference.get_model_status())
+
+
+@app.post("/api/admin/model/rollback")
+async def admin_model_rollback(x_aegis_admin_token: str = Header(default="")):
+    """Swap the previous LSTM version back in."""
+    require_admin(x_aegis_admin_token)
+    return await read_state("model_rollback")
+
+
+@producer_read("model_rollback")
+def _model_rollback():
+    if inference.rollback_lstm() is None:
+        raise HTTPException(status_code=409, detail="No previous model version to roll back to")
+    return json_response(inference.get_model_status())
+
+
+@app.get("/api/vessels/events")
+async def vessel_events(since: int = Query(0, ge=0), limit: int = Query(500, ge=1, le=5000)):
+    """Vessel enter/leave events for sectors and port approaches after sequence number `since`."""
+    return await read_state("vessel_events", since=since, limit=limit)
+
+
+@producer_read("vessel_events")
+def _vessel_events(since, limit):
+    return json_response({"events": vessels.events_since(since, limit), "last_seq": vessels.last_seq,
+                          "occupancy": vessels.occupancy()})
+
+
+@app.get("/api/layers")
+def layer_index():
+    """Static layer versions and ETags; fetch each from /api/layers/{name}?v={version}."""
+    return layers.index()
+
+@app.get("/api/layers/{name}")
+def static_layer(name: str, v: int = None, if_none_match: str = Header(default=""),
+                 accept_encoding: str = Header(default="")):
+    """Pre-compressed GeoJSON layer with ETag revalidation."""
+    layer = layers.get(name)
+    if layer is None:
+        raise HTTPException(status_code=404, detail=f"Unknown layer '{name}'")
+    body, encoding = layer.select(accept_encoding)
+    headers = {
+        "ETag": layer.etag_for(encoding),
+        "Vary": "Accept-Encoding",
+        # A URL pinned to the current version never changes; bare URLs revalidate each use
+        "Cache-Control": "public, max-age=31536000, immutable" if v == layers.version else "public, no-cache",
     }
+    if layer.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=GEOJSON_MEDIA_TYPE, headers=headers)
+
+
+@app.get("/api/inundation")
+async def inundation_extent(level: float = Query(None, ge=-5, le=20, description="Water level [m]; default current tide + run-up")):
+    """Connected flood extent at a water level as a GeoJSON MultiPolygon with depth stats."""
+    return await read_state("inundation", level=level)
+
+
+@producer_read("inundation", offload=True)
+def _inundation_extent(level):
+    if inundation is None:
+        raise HTTPException(status_code=503, detail="Inundation DEM is still loading")
+    if level is None:
+        level = world["water_level"] if world["water_level"] is not None else 0.0
+    return json_response({"type": "FeatureCollection", "features": [inundation.polygons(level)]})
+
+
+@app.get("/tiles/{layer}/{z}/{x}/{y}.png")
+async def map_tile(layer: str, z: int, x: int, y: int, if_none_match: str = Header(default="")):
+    """256 px XYZ tile of flood depth ("inundation") or sector risk ("risk") at the current state."""
+    return await read_state("tile", layer=layer, z=z, x=x, y=y, if_none_match=if_none_match)
+
+
+@producer_read("tile", offload=True)
+def _map_tile(layer, z, x, y, if_none_match):
+    try:
+        png, version = tiles.get(layer, z, x, y)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown tile layer '{layer}'; have {sorted(tiles.layers)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"Cache-Control": "public, no-cache"}
+    if version is not None:
+        # Same layer version => same pixels; clients revalidate as the water level moves
+        headers["ETag"] = f'"{layer}-{version}"'
+        if if_none_match.strip() == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+    return Response(content=png, media_type="image/png", headers=headers)
+
+
+@app.get("/api/cyclone")
+async def cyclone_status(series: bool = Query(False, description="Include per-sector time series")):
+    """Peak tide + surge + run-up per sector along the current cyclone track (null when there is none)."""
+    return await read_state("cyclone", series=series)
+
+
+@producer_read("cyclone")
+def _cyclone_status(series):
+    out = {"cyclone": world["cyclone"]}
+    result = cyclone["result"]
+    if series and result is not None and world["cyclone"] is not None:
+        out["series"] = {"times": result["times"].tolist(), **{
+            k: {name: np.round(result[k][:, i], 3).tolist() for i, name in enumerate(SECTOR_NAMES)}
+            for k in ("total_m", "surge_m", "runup_m", "wind_ms")}}
+    return json_response(out)
+
+
+@app.get("/api/analogs")
+async def analog_search(station: str = Query(None, description="Station to search; 'all' searches every station"),
+                        k: int = Query(10, ge=1, le=50), horizon: int = Query(6, ge=1, le=72),
+                        window: int = Query(None, ge=4, le=240, description=f"Samples at the archive's cadence (step_s); default {DEFAULT_WINDOW}"),
+                        end: float = Query(None, description="Epoch seconds: search analogs of the archived window ending here")):
+    """Past windows most like the latest readings (or an archived window) and the run-up that followed them."""
+    return await read_state("analogs", station=station, k=k, horizon=horizon, window=window, end=end)
+
+
+@producer_read("analogs")
+async def _analog_search(station, k, horizon, window, end):
+    if analogs is None:
+        raise HTTPException(status_code=503, detail="Analog index is still building (or disabled with AEGIS_ANALOGS=0)")
+    window = window or DEFAULT_WINDOW
+    try:
+        if end is not None:
+            if station not in analogs.stations:
+                raise HTTPException(status_code=400, detail="end requires an indexed station")
+            return json_response(await executor.run_io(analogs.query_history, station, end, window, k=k, horizon=horizon))
+        if analog_buffer is None:
+            raise HTTPException(status_code=503, detail="Analog index has no stations")
+        if len(analog_buffer) < window:
+            raise HTTPException(status_code=503, detail=f"Waiting for {window} readings at the archive's "
+                                                        f"{analog_buffer.step_s:g} s cadence ({len(analog_buffer)} so far)")
+        if station is None:
+            live = world["reading"]["station_id"] if world["reading"] else None
+            station = live if live in analogs.stations else ANALOG_STATION
+        # Snapshot on the event loop, where ingest appends; search on the thread pool
+        recent = analog_buffer.window(window)
+        return json_response(await executor.run_io(
+            analogs.query, recent, None if station == "all" else station, k=k, horizon=horizon,
+            fields=SENSOR_FIELDS, runup_now=world["runup"], step_s=analog_buffer.step_s))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No history for station {station!r}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/tide")
+def tide_prediction(hours: float = Query(24, gt=0, le=24 * 31), step_min: float = Query(10, ge=1, le=180),
+                    start: float = Query(None, description="Epoch seconds; default now")):
+    """Predicted astronomical tide [m above MSL] at every tide station."""
+    if tides is None:
+        raise HTTPException(status_code=404, detail="Tide prediction is disabled (AEGIS_TIDES=0)")
+    start = time.time() if start is None else start
+    times = start + np.arange(0, hours * 3600 + 1, step_min * 60)
+    levels = tides.level(times)
+    return {"start": start, "step_min": step_min, "datum": "MSL",
+            "levels": {st: np.round(row, 3).tolist() for st, row in zip(tides.stations, levels)}}
+
+
+@app.get("/api/alerts")
+async def alert_history(since: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=500)):
+    """Alerts after sequence number `since`, plus the rule/subject pairs currently active."""
+    # Rules are evaluated on the producer; a gateway only mirrors the raised alerts
+    return await read_state("alerts", since=since, limit=limit)
+
+
+@producer_read("alerts")
+def _alert_history(since, limit):
+    return json_response({"alerts": alerts.since(since, limit), "last_seq": alerts.last_seq,
+                          "active": alerts.active(), "stats": alerts.get_stats()})
+
+
+@app.get("/api/forecast-skill")
+async def forecast_skill():
+    """Rolling MAE/RMSE/bias per source (lstm, physics, hybrid) and horizon, plus the live blend weights."""
+    return await read_state("forecast_skill")
+
+
+@producer_read("forecast_skill")
+def _forecast_skill():
+    return json_response(evaluator.get_stats())
+
 
 @app.get("/api/recordings")
 def get_recordings():
@@ -481,6 +1482,11 @@ def get_recordings():
     }
 
 @app.get("/api/model-status")
-def model_status():
+async def model_status():
     """Return comprehensive model and inference status."""
-    return inference.get_model_status()
+    return await read_state("model_status")
+
+
+@producer_read("model_status")
+def _model_status():
+    return json_response(inference.get_model_status())
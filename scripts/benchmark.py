@@ -1,49 +1,676 @@
+"""
+AEGIS Benchmark Suite
+Measures the real hot paths of the backend and compares them with a stored
+baseline so regressions show up before capacity planning does.
+
+Usage:
+  python scripts/benchmark.py                              # full run, JSON to stdout
+  python scripts/benchmark.py --quick                      # fewer iterations (CI smoke)
+  python scripts/benchmark.py --output results.json
+  python scripts/benchmark.py --compare scripts/benchmark_baseline.json
+  python scripts/benchmark.py --save-baseline scripts/benchmark_baseline.json
+
+Exit status is 1 when --compare finds a metric worse than the baseline by more
+than --tolerance (default 25%), or a tracked metric missing from either run.
+"""
+
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.append(BACKEND_DIR)
 
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
 import time
 import numpy as np
-from aegis_sim.engine import calculate_stockdon_runup
-from aegis_sim.inference import InferenceEngine
-
-def benchmark_engine(n=100000):
-    print(f"🌊 Starting Stress Test: {n} Wave Calculations...")
-    
-    # Generate random "Real Life" data
-    H0s = np.random.uniform(0.5, 5.0, n)
-    Ts = np.random.uniform(5.0, 15.0, n)
-    betas = np.random.uniform(0.01, 0.1, n)
-    
-    start_time = time.time()
-    
-    # Run loop
-    for h, t, b in zip(H0s, Ts, betas):
-        _ = calculate_stockdon_runup(h, t, b)
-        
-    end_time = time.time()
-    duration = end_time - start_time
-    fps = n / duration
-    
-    print(f"✅ Physics Engine Speed: {fps:.2f} calcs/sec")
-    print(f"⚡ Latency per prediction: {1000/fps:.4f} ms")
-    
-    if fps > 60:
-        print("🚀 STATUS: REAL-TIME READY (Runs faster than 60Hz)")
-    else:
-        print("⚠️ STATUS: LAG DETECTED")
 
-def benchmark_inference():
-    print("\n🧠 Testing AI Inference Speed (Mock/Simulated)...")
+from aegis_sim.engine import calculate_stockdon_runup, calculate_stockdon_runup_array
+from aegis_sim.runup_lut import RunupLUT
+from aegis_sim.recorder import DataRecorder
+
+SEQ_LEN = 24
+N_FEATURES = 5
+
+
+def latency_stats(samples_s):
+    """p50/p95/p99/mean of a list of durations, in milliseconds."""
+    ms = np.asarray(samples_s) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "samples": int(ms.size),
+    }
+
+
+def timed(fn, iterations, warmup=0):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def random_sequences(batch, rng):
+    """Plausible sensor windows: wave height, period, temp, wind, pressure."""
+    lo = np.array([0.5, 5.0, 24.0, 1.0, 965.0])
+    hi = np.array([6.0, 14.0, 31.0, 30.0, 1015.0])
+    return (lo + rng.random((batch, SEQ_LEN, N_FEATURES)) * (hi - lo)).astype(np.float32)
+
+
+def bench_physics(n, rng):
+    H0s = rng.uniform(0.5, 5.0, n)
+    Ts = rng.uniform(5.0, 15.0, n)
+    betas = rng.uniform(0.01, 0.1, n)
+
+    start = time.perf_counter()
+    for h, t, b in zip(H0s.tolist(), Ts.tolist(), betas.tolist()):
+        calculate_stockdon_runup(h, t, b)
+    scalar_s = time.perf_counter() - start
+
+    vec = timed(lambda: calculate_stockdon_runup_array(H0s, Ts, betas), 20, warmup=2)
+    vec_s = float(np.median(vec))
+
+    lut = RunupLUT.build_within()
+    lut_s = float(np.median(timed(lambda: lut.lookup(H0s, Ts, betas), 20, warmup=2)))
+    return {
+        "n": n,
+        "scalar_calcs_per_s": round(n / scalar_s),
+        "scalar_ns_per_calc": round(scalar_s / n * 1e9, 1),
+        "vectorized_calcs_per_s": round(n / vec_s),
+        "vectorized_ns_per_calc": round(vec_s / n * 1e9, 2),
+        "lut_ns_per_calc": round(lut_s / n * 1e9, 2),
+        "lut_max_error_m": round(lut.max_error_m, 5),
+        "lut_shape": list(lut.shape),
+    }
+
+
+def bench_lstm(iterations, rng):
+    from aegis_sim.inference import InferenceEngine
     engine = InferenceEngine()
-    
-    start_time = time.time()
-    for _ in range(100): # 100 frames
-        engine.predict_dummy(np.zeros((224, 224, 3)))
-    duration = time.time() - start_time
-    
-    print(f"✅ Inference Speed: {100/duration:.2f} FPS")
+    result = {"lstm_loaded": engine.lstm_loaded, "device": engine.get_device_status()}
+    seq = random_sequences(1, rng)[0]
+    result["single"] = latency_stats(timed(lambda: engine.predict_lstm(seq), iterations, warmup=20))
+    if engine.lstm_loaded:
+        for batch in (8, 64):
+            seqs = random_sequences(batch, rng)
+            stats = latency_stats(timed(lambda: engine.predict_lstm_batch(seqs), max(10, iterations // 4), warmup=5))
+            stats["sequences_per_s"] = round(batch / (stats["p50_ms"] / 1000.0))
+            result[f"batch_{batch}"] = stats
+    return result
+
+
+def bench_tick(iterations, rng):
+    """One full tick (every stage except disk recording) against the real backend state."""
+    import main as backend
+
+    # Through buffer_reading, as ingest does, so the LSTM gets the served feature rows
+    t0 = time.time() - SEQ_LEN * 0.5
+    for i, row in enumerate(random_sequences(1, rng)[0]):
+        backend.buffer_reading({"timestamp": t0 + i * 0.5, **dict(zip(backend.SENSOR_FIELDS, row.tolist()))})
+    backend.world["reading"] = {
+        "timestamp": time.time(), "station_id": "BENCH",
+        **dict(zip(backend.SENSOR_FIELDS, backend.sensor_buffer[-1])),
+    }
+    backend.world["reading"]["wave_height_m"] = 2.6
+
+    def forecast():
+        r = backend.world["reading"]
+        ensemble = backend.forecast_ensemble(r["wave_height_m"], r["period_s"], backend.CITY["beach_slope"],
+                                             wall_heights=backend.SECTOR_WALLS,
+                                             members=backend.ENSEMBLE_MEMBERS, hours=4)
+        backend.world["forecast"] = ensemble["steps"]
+        backend.world["forecast_exceedance"] = ensemble["exceedance"]
+
+    def lstm():
+        seq = np.array(list(backend.feature_buffer), dtype=np.float32)
+        backend.world["lstm_prediction"], backend.world["hybrid_prediction"] = backend._predict(
+            seq, backend.world["runup"], backend.FEATURE_NAMES)
+
+    parts = {
+        "physics": backend.physics_stage,
+        "lstm": lstm,
+        "forecast": forecast,
+        "simulation": backend.simulation_stage,
+        "payload": backend.build_payload,
+    }
+    for fn in parts.values():
+        fn()
+
+    samples = {name: [] for name in parts}
+    totals = []
+    for _ in range(iterations):
+        tick_start = time.perf_counter()
+        for name, fn in parts.items():
+            start = time.perf_counter()
+            fn()
+            samples[name].append(time.perf_counter() - start)
+        totals.append(time.perf_counter() - tick_start)
+
+    payload = backend.build_payload()
+    ser = timed(lambda: backend.encode_message(payload), iterations, warmup=5)
+    result = {name: latency_stats(s) for name, s in samples.items()}
+    result["total"] = latency_stats(totals)
+    result["serialize"] = latency_stats(ser)
+    result["payload_bytes"] = len(backend.encode_message(payload))
+    return result
+
+
+_STARTUP_PROBE = """
+import time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    t2 = time.perf_counter()
+    client.get("/health/live")
+    t3 = time.perf_counter()
+    while client.get("/health/ready").status_code != 200 and time.perf_counter() - t1 < 30:
+        time.sleep(0.005)
+    t4 = time.perf_counter()
+print(t1 - t0, t2 - t1, t3 - t1, t4 - t1)
+"""
+
+
+def bench_startup(runs):
+    """Cold-process import, startup-hook and first-response times, plus time until /health/ready."""
+    rec_dir = tempfile.mkdtemp(prefix="aegis-bench-")
+    env = dict(os.environ, AEGIS_INGEST="synthetic", AEGIS_RECORDINGS_DIR=rec_dir)
+    samples = []
+    try:
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE], cwd=BACKEND_DIR, env=env,
+                                 capture_output=True, text=True, check=True).stdout
+            samples.append([float(v) for v in out.split()[-4:]])
+    finally:
+        shutil.rmtree(rec_dir, ignore_errors=True)
+    cols = (np.median(np.array(samples), axis=0) * 1000.0).tolist()
+    return {"runs": runs, "import_ms": round(cols[0], 1), "startup_ms": round(cols[1], 1),
+            "first_response_ms": round(cols[2], 1), "ready_ms": round(cols[3], 1)}
+
+
+def bench_recorder(n):
+    base_dir = tempfile.mkdtemp(prefix="aegis-bench-")
+    try:
+        rec = DataRecorder(base_dir)
+        ocean = {"wave_height_m": 2.1, "wave_period_s": 9.0, "wind_speed_mps": 6.0,
+                 "pressure_hpa": 1004.0, "temp_c": 28.1}
+        physics = {"runup_m": 1.2, "overall_risk": "HIGH"}
+        lstm = {"runup_1h": 1.1, "runup_3h": 1.3, "runup_6h": 1.4, "confidence": 0.9}
+        start = time.perf_counter()
+        for _ in range(n):
+            rec.record_telemetry(ocean, physics, lstm=lstm, mode="hybrid", station_id="BENCH")
+        took = time.perf_counter() - start
+        rec.close()
+        return {"records": n, "records_per_s": round(n / took), "us_per_record": round(took / n * 1e6, 2)}
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+class _FakeSocket:
+    """Stands in for a WebSocket: yields to the loop like a real send does."""
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def send_text(self, text):
+        self.bytes_sent += len(text)
+        await asyncio.sleep(0)
+
+
+def bench_fanout(client_counts, rounds, payload_text):
+    """Rate-limited broadcast of one pre-serialized frame to N simulated clients."""
+    from main import ConnectionManager
+
+    async def run(n):
+        mgr = ConnectionManager()
+        mgr.active = [_FakeSocket() for _ in range(n)]
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await mgr.broadcast_telemetry(payload_text)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    result = {}
+    for n in client_counts:
+        stats = latency_stats(asyncio.run(run(n)))
+        stats["us_per_client"] = round(stats["p50_ms"] * 1000.0 / n, 2)
+        result[f"clients_{n}"] = stats
+    return result
+
+
+def bench_fanout_topics(n, rounds, payload_text):
+    """Fan-out to N clients split across dashboard views that subscribe to topics."""
+    from main import ConnectionManager
+    from aegis_sim.topics import Subscription
+
+    views = [None, Subscription(["alerts"]), Subscription(["ocean", "sectors", "alerts"]),
+             Subscription(["fleet"]), Subscription(["forecast", "system"])]
+
+    async def run():
+        mgr = ConnectionManager()
+        mgr.active = [_FakeSocket() for _ in range(n)]
+        for i, ws in enumerate(mgr.active):
+            if views[i % len(views)] is not None:
+                mgr.subscribe(ws, views[i % len(views)])
+        samples, sent = [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            sent.append(await mgr.broadcast_telemetry(payload_text))
+            samples.append(time.perf_counter() - start)
+        return samples, sent[-1]
+
+    samples, (clients, nbytes, projections) = asyncio.run(run())
+    stats = latency_stats(samples)
+    stats.update({"clients": clients, "bytes_per_tick": nbytes, "projections": projections,
+                  "full_frame_bytes_per_tick": len(payload_text.encode("utf-8")) * n})
+    return stats
+
+
+def bench_metrics(n, tick_p50_ms):
+    """Instrumentation cost of one tick: 6 scheduler observations plus 7 sub-stage timers."""
+    from aegis_sim.metrics import MetricsRegistry
+
+    reg = MetricsRegistry()
+    stages = ("physics", "lstm", "forecast", "simulation", "record", "broadcast")
+    timers = ("physics.runup", "physics.scoring", "lstm.inference", "lstm.hybrid",
+              "broadcast.build", "broadcast.serialize", "fanout")
+    start = time.perf_counter()
+    for _ in range(n):
+        for name in stages:
+            reg.record_stage(name, 0.001, False)
+        for name in timers:
+            with reg.timer(name):
+                pass
+    us = (time.perf_counter() - start) / n * 1e6
+    return {
+        "us_per_tick": round(us, 2),
+        "tick_overhead_pct": round(100.0 * us / (tick_p50_ms * 1000.0), 3) if tick_p50_ms else None,
+    }
+
+
+def bench_fleet(sizes, steps):
+    """Cost of one vectorized fleet step and one payload snapshot per fleet size."""
+    from aegis_sim.fleet import DroneFleet
+
+    out = {}
+    for n in sizes:
+        fleet = DroneFleet(seed=0)
+        fleet.add_random(n, 19.0, 72.85)
+        step = latency_stats(timed(lambda: fleet.step(0.5), steps, warmup=5))
+        snap = latency_stats(timed(fleet.snapshot, max(5, steps // 10), warmup=1))
+        out[f"drones_{n}"] = {"step_us": round(step["p50_ms"] * 1000, 1),
+                              "snapshot_us": round(snap["p50_ms"] * 1000, 1)}
+    return out
+
+
+def bench_vessels(n, steps):
+    """Dead reckoning plus zone membership for `n` vessels around the backend's zones."""
+    import main as backend
+    from aegis_sim.vessels import VesselTracker
+
+    tracker = VesselTracker(backend.VESSEL_ZONES, seed=0)
+    tracker.add_random(n)
+    tracker.step(0.0)  # initial membership
+    events = []
+    step = latency_stats(timed(lambda: events.append(len(tracker.step(1.0))), steps, warmup=5))
+    return {"vessels": n, "step_us": round(step["p50_ms"] * 1000, 1),
+            "events_per_step": round(sum(events) / len(events), 2)}
+
+
+def bench_alerts(n_sectors, steps):
+    """Alert rule evaluation over `n_sectors` drifting sectors."""
+    from aegis_sim.alerts import AlertEngine
+
+    rng = np.random.default_rng(0)
+    engine = AlertEngine()
+    subjects = tuple(f"sector-{i}" for i in range(n_sectors))
+    score = rng.uniform(0, 100, n_sectors)
+    margin = rng.uniform(-1, 3, n_sectors)
+    engine.evaluate({"score": score, "margin_m": margin}, subjects)
+    raised = []
+
+    def evaluate():
+        score[:] = np.clip(score + rng.normal(0, 1, n_sectors), 0, 100)
+        margin[:] += rng.normal(0, 0.02, n_sectors)
+        raised.append(len(engine.evaluate({"score": score, "margin_m": margin,
+                                           "forecast_margin_3h_m": margin - 0.1}, subjects)))
+
+    stats = latency_stats(timed(evaluate, steps, warmup=5))
+    return {"sectors": n_sectors, "eval_us": round(stats["p50_ms"] * 1000, 1),
+            "alerts_per_eval": round(sum(raised[5:]) / steps, 2)}
+
+
+def bench_inundation(size, levels):
+    """DEM preprocessing once, then per-level extent/depth stats and polygons (uncached)."""
+    from aegis_sim.inundation import InundationModel
+
+    start = time.perf_counter()
+    model = InundationModel.synthetic((size, size), cache_size=1)
+    build_ms = (time.perf_counter() - start) * 1000.0
+    lv = iter(np.linspace(0.5, 4.5, levels * 2 + 10))
+    summary = latency_stats(timed(lambda: model.summary(next(lv)), levels, warmup=2))
+    polygons = latency_stats(timed(lambda: model.polygons(next(lv)), levels, warmup=2))
+    return {"dem_cells": size * size, "build_ms": round(build_ms, 1),
+            "summary_ms": round(summary["p50_ms"], 3), "polygons_ms": round(polygons["p50_ms"], 3)}
+
+
+def bench_tiles(n):
+    """Cold renders (fresh level each time) vs memory-cache hits for 256 px flood-depth tiles."""
+    from aegis_sim.inundation import InundationModel
+    from aegis_sim.tiles import TileCache, depth_layer
+
+    model = InundationModel.synthetic((512, 512))
+    level = [2.0]
+    cache = TileCache(prefetch=False)
+    cache.register(depth_layer(model, lambda: level[0]))
+
+    def cold():
+        level[0] += 0.05
+        return cache.get("inundation", 13, 5753, 3653)
+
+    render = latency_stats(timed(cold, n, warmup=2))
+    hit = latency_stats(timed(lambda: cache.get("inundation", 13, 5753, 3653), n * 10, warmup=2))
+    png, _ = cache.get("inundation", 13, 5753, 3653)
+    return {"render_ms": round(render["p50_ms"], 3), "hit_us": round(hit["p50_ms"] * 1000.0, 1),
+            "png_bytes": len(png)}
+
+
+def bench_tides(days, n):
+    """A year-style regular grid (matrix product) vs direct evaluation, and table lookups."""
+    from aegis_sim.tides import TideModel, TideTable
+
+    model = TideModel()
+    start = time.time()
+    samples = int(days * 1440)
+    grid = latency_stats(timed(lambda: model.predict_grid(start, 60.0, samples), n, warmup=1))
+    t = start + np.arange(samples) * 60.0
+    direct = latency_stats(timed(lambda: model.predict(t), max(2, n // 5), warmup=1))
+    model.use_table(TideTable.build(model, start, 32))
+    probe = start + np.random.default_rng(0).uniform(0, 30 * 86400, 10_000)
+    lookup = latency_stats(timed(lambda: model.level(probe), n, warmup=2))
+    return {"stations": len(model.stations), "samples": samples,
+            "grid_ms": round(grid["p50_ms"], 2), "direct_ms": round(direct["p50_ms"], 2),
+            "lookup_10k_us": round(lookup["p50_ms"] * 1000.0, 1)}
+
+
+def bench_cyclone(sites, n):
+    """Whole-coastline track update: Holland field + surge + waves + run-up, 48 h at 15 min."""
+    from aegis_sim.cyclone import CycloneTrack, evaluate_track
+
+    now = time.time()
+    track = CycloneTrack.synthetic("ESCS", 19.0, 72.85, now + 24 * 3600)
+    rng = np.random.default_rng(0)
+    coast = {"lat": rng.uniform(15.0, 23.0, sites), "lon": rng.uniform(68.5, 73.5, sites)}
+    times = now + np.arange(0, 48 * 3600, 900.0)
+    peaks = latency_stats(timed(lambda: evaluate_track(track, coast, times, 2.0, 9.0, series=False), n, warmup=1))
+    single = latency_stats(timed(lambda: evaluate_track(track, coast, times, 2.0, 9.0, series=False, block=sites),
+                                 max(2, n // 2), warmup=1))
+    return {"sites": sites, "steps": int(times.size), "update_ms": round(peaks["p50_ms"], 2),
+            "unblocked_ms": round(single["p50_ms"], 2)}
+
+
+def bench_analogs(years, n):
+    """Top-10 analogs of a 24-sample window over `years` of 10-minute history (4 channels)."""
+    from numpy.lib.stride_tricks import sliding_window_view
+    from aegis_sim.analogs import AnalogIndex
+
+    rng = np.random.default_rng(0)
+    samples = int(years * 365 * 144)
+    t = np.arange(samples) * 600.0
+    values = np.array([[1.5], [8.0], [5.0], [1008.0]]) + np.cumsum(rng.normal(0, 0.05, (4, samples)), axis=1)
+    t0 = time.perf_counter()
+    index = AnalogIndex.from_history({"S": {"t": t, "values": values, "runup": 0.4 * values[0]}})
+    build_ms = (time.perf_counter() - t0) * 1000.0
+    query = values[:, 5000:5024].T + rng.normal(0, 0.02, (24, 4))
+    q = latency_stats(timed(lambda: index.query(query, "S", k=10), n, warmup=2))
+    direct = latency_stats(timed(lambda: [sliding_window_view(values[c], 24) @ query[:, c] for c in range(4)],
+                                 max(3, n // 2), warmup=1))
+    return {"samples": samples, "build_ms": round(build_ms, 1), "query_ms": round(q["p50_ms"], 2),
+            "direct_dot_ms": round(direct["p50_ms"], 2)}
+
+
+def bench_qc(stations, rounds):
+    """Streaming QC cost per reading with `stations` interleaved stations (warm state)."""
+    from aegis_sim.qc import StreamQC
+
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 1, (rounds, stations, 5))
+    readings = [[{"timestamp": 1.7e9 + k * 60.0, "station_id": f"B{s}",
+                  "wave_height_m": 2.0 + 0.1 * noise[k, s, 0], "period_s": 9.0 + 0.2 * noise[k, s, 1],
+                  "temp_c": 28.0 + 0.2 * noise[k, s, 2], "wind_speed_mps": 6.0 + 0.5 * noise[k, s, 3],
+                  "pressure_hpa": 1008.0 + 0.5 * noise[k, s, 4]} for s in range(stations)]
+                for k in range(rounds)]
+    qc = StreamQC()
+    for row in readings[:20]:
+        for reading in row:
+            qc.process(reading)
+    t0 = time.perf_counter()
+    for row in readings[20:]:
+        for reading in row:
+            qc.process(reading)
+    n = (rounds - 20) * stations
+    return {"stations": stations, "readings": n,
+            "us_per_reading": round((time.perf_counter() - t0) / n * 1e6, 2)}
+
+
+def bench_features(n):
+    """Derived LSTM features: one live update vs the batch transform used by training."""
+    from aegis_sim.features import FeatureEngine
+
+    rows = random_sequences(1, np.random.default_rng(0))[0].astype(np.float64)
+    engine = FeatureEngine()
+    for i, row in enumerate(rows):
+        engine.update(row, i * 0.5)
+    clock = itertools.count(len(rows))  # a 0.5 s live feed
+    live = latency_stats(timed(lambda: engine.update(rows[-1], next(clock) * 0.5), n, warmup=100))
+    history = np.tile(rows, (max(1, 100_000 // len(rows)), 1))
+    times = np.arange(len(history)) * 3600.0  # archive-like hourly rows
+    batch = latency_stats(timed(lambda: FeatureEngine().transform(history, times), 5, warmup=1))
+    return {"update_us": round(live["p50_ms"] * 1000.0, 2), "batch_rows": len(history),
+            "batch_ms": round(batch["p50_ms"], 2)}
+
+
+# metric path -> "lower" / "higher" is better
+TRACKED_METRICS = {
+    "physics.scalar_ns_per_calc": "lower",
+    "physics.vectorized_ns_per_calc": "lower",
+    "lstm.single.p50_ms": "lower",
+    "lstm.single.p95_ms": "lower",
+    "lstm.batch_64.sequences_per_s": "higher",
+    "tick.total.p50_ms": "lower",
+    "tick.total.p95_ms": "lower",
+    "tick.serialize.p50_ms": "lower",
+    "recorder.records_per_s": "higher",
+    "fanout.clients_1000.p50_ms": "lower",
+    "fanout_topics.p50_ms": "lower",
+    "fanout_topics.bytes_per_tick": "lower",
+    "metrics.us_per_tick": "lower",
+    "startup.import_ms": "lower",
+    "startup.first_response_ms": "lower",
+    "fleet.drones_500.step_us": "lower",
+    "vessels.step_us": "lower",
+    "alerts.eval_us": "lower",
+    "inundation.summary_ms": "lower",
+    "inundation.polygons_ms": "lower",
+    "tiles.render_ms": "lower",
+    "tiles.hit_us": "lower",
+    "tides.grid_ms": "lower",
+    "tides.lookup_10k_us": "lower",
+    "cyclone.update_ms": "lower",
+    "analogs.query_ms": "lower",
+    "qc.us_per_reading": "lower",
+    "features.update_us": "lower",
+}
+
+
+def lookup(results, path):
+    node = results
+    for key in path.split("."):
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return (report, regressions) for every tracked metric. A metric missing from
+    either run counts as a regression: an unchecked metric is not a passing one.
+    """
+    report, regressions = {}, []
+    for path, better in TRACKED_METRICS.items():
+        new, old = lookup(results, path), lookup(baseline, path)
+        if new is None or old is None:
+            report[path] = {"baseline": old, "current": new, "change_pct": None, "regression": True,
+                            "missing": "baseline" if old is None else "current"}
+            regressions.append(path)
+            continue
+        if old == 0:
+            continue
+        change = (new - old) / old
+        worse = change > tolerance if better == "lower" else change < -tolerance
+        report[path] = {"baseline": old, "current": new, "change_pct": round(change * 100, 1),
+                        "regression": worse}
+        if worse:
+            regressions.append(path)
+    return report, regressions
+
+
+def run_suite(quick=False):
+    rng = np.random.default_rng(42)
+    scale = 0.2 if quick else 1.0
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "quick": quick,
+        },
+    }
+    results["physics"] = bench_physics(int(100_000 * scale), rng)
+    results["lstm"] = bench_lstm(int(500 * scale), rng)
+    results["tick"] = bench_tick(int(200 * scale), rng)
+    results["recorder"] = bench_recorder(int(5000 * scale))
+    results["startup"] = bench_startup(3 if quick else 7)
+    results["metrics"] = bench_metrics(int(20_000 * scale), results["tick"]["total"]["p50_ms"])
+    results["fleet"] = bench_fleet((4, 500), int(2000 * scale))
+    results["vessels"] = bench_vessels(5000, int(500 * scale))
+    results["alerts"] = bench_alerts(5000, int(500 * scale))
+    results["inundation"] = bench_inundation(512, max(5, int(30 * scale)))
+    results["tiles"] = bench_tiles(max(10, int(100 * scale)))
+    results["tides"] = bench_tides(365, max(5, int(20 * scale)))
+    results["cyclone"] = bench_cyclone(5000, max(3, int(20 * scale)))
+    results["analogs"] = bench_analogs(5, max(5, int(30 * scale)))
+    results["qc"] = bench_qc(500, max(30, int(120 * scale)))
+    results["features"] = bench_features(max(1000, int(20000 * scale)))
+
+    import main as backend
+    payload_text = backend.encode_message(backend.build_payload()).decode("utf-8")
+    results["fanout"] = bench_fanout((10, 100, 1000), max(5, int(50 * scale)), payload_text)
+    results["fanout_topics"] = bench_fanout_topics(1000, max(5, int(50 * scale)), payload_text)
+    return results
+
+
+def print_summary(results, report=None):
+    out = sys.stderr
+    p, l, t = results["physics"], results["lstm"], results["tick"]
+    print(f"Physics   scalar {p['scalar_ns_per_calc']} ns/calc | vectorized {p['vectorized_ns_per_calc']} ns/calc | "
+          f"LUT {p['lut_ns_per_calc']} ns/calc (max err {p['lut_max_error_m']} m)", file=out)
+    print(f"LSTM      {l['device']} | loaded={l['lstm_loaded']} | p50 {l['single']['p50_ms']} ms "
+          f"p99 {l['single']['p99_ms']} ms", file=out)
+    print(f"Tick      p50 {t['total']['p50_ms']} ms p99 {t['total']['p99_ms']} ms | "
+          f"payload {t['payload_bytes']} B, serialize p50 {t['serialize']['p50_ms']} ms", file=out)
+    print(f"Recorder  {results['recorder']['records_per_s']} records/s", file=out)
+    st = results["startup"]
+    print(f"Startup   import {st['import_ms']} ms | first response {st['first_response_ms']} ms | "
+          f"ready {st['ready_ms']} ms", file=out)
+    m = results["metrics"]
+    print(f"Metrics   {m['us_per_tick']} us/tick | {m['tick_overhead_pct']}% of a tick", file=out)
+    for k, v in results["fleet"].items():
+        print(f"Fleet     {k}: step {v['step_us']} us | snapshot {v['snapshot_us']} us", file=out)
+    v = results["vessels"]
+    print(f"Vessels   {v['vessels']}: step {v['step_us']} us | {v['events_per_step']} zone events/step", file=out)
+    a = results["alerts"]
+    print(f"Alerts    {a['sectors']} sectors: {a['eval_us']} us/eval | {a['alerts_per_eval']} alerts/eval", file=out)
+    fl = results["inundation"]
+    print(f"Flood     {fl['dem_cells']} cells: build {fl['build_ms']} ms | new level {fl['summary_ms']} ms | "
+          f"polygons {fl['polygons_ms']} ms", file=out)
+    t = results["tiles"]
+    print(f"Tiles     render {t['render_ms']} ms | cache hit {t['hit_us']} us | {t['png_bytes']} B png", file=out)
+    td = results["tides"]
+    print(f"Tides     {td['stations']} stations x {td['samples']} min: grid {td['grid_ms']} ms "
+          f"(direct {td['direct_ms']} ms) | 10k lookups {td['lookup_10k_us']} us", file=out)
+    cy = results["cyclone"]
+    print(f"Cyclone   {cy['sites']} sites x {cy['steps']} steps: {cy['update_ms']} ms "
+          f"(unblocked {cy['unblocked_ms']} ms)", file=out)
+    an = results["analogs"]
+    print(f"Analogs   {an['samples']} samples: top-10 query {an['query_ms']} ms "
+          f"(sliding dot products alone {an['direct_dot_ms']} ms) | build {an['build_ms']} ms", file=out)
+    qc = results["qc"]
+    print(f"QC        {qc['stations']} stations: {qc['us_per_reading']} us/reading", file=out)
+    fe = results["features"]
+    print(f"Features  live update {fe['update_us']} us | batch {fe['batch_rows']} rows {fe['batch_ms']} ms", file=out)
+    for k, v in results["fanout"].items():
+        print(f"Fan-out   {k}: p50 {v['p50_ms']} ms ({v['us_per_client']} us/client)", file=out)
+    ft = results["fanout_topics"]
+    print(f"Topics    {ft['clients']} clients, {ft['projections']} projections: p50 {ft['p50_ms']} ms | "
+          f"{ft['bytes_per_tick']} B/tick vs {ft['full_frame_bytes_per_tick']} B full", file=out)
+    for path, row in (report or {}).items():
+        if "missing" in row:
+            print(f"  {'MISSING':10s} {path}: not in the {row['missing']} run", file=out)
+            continue
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"  {flag:10s} {path}: {row['baseline']} -> {row['current']} ({row['change_pct']:+}%)", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AEGIS Benchmark Suite")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before flagging (default 0.25)")
+    args = parser.parse_args()
+
+    results = run_suite(quick=args.quick)
+    report, regressions = None, []
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        report, regressions = compare(results, baseline, args.tolerance)
+        results["comparison"] = {"baseline": args.compare, "tolerance": args.tolerance,
+                                 "metrics": report, "regressions": regressions}
+
+    print_summary(results, report)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({k: v for k, v in results.items() if k != "comparison"}, f, indent=2)
+    sys.exit(1 if regressions else 0)
+
 
 if __name__ == "__main__":
-    benchmark_engine()
-    benchmark_inference()
+    main()
@@ -0,0 +1,60 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.alerts import AlertEngine, Rule
+
+RULES = (
+    Rule("critical", "score", ">=", 88, clear=80, severity="critical", group="risk",
+         message="{subject} critical", cooldown_s=100),
+    Rule("high", "score", ">=", 68, clear=60, severity="high", group="risk",
+         message="{subject} high", cooldown_s=100),
+)
+
+
+class TestAlertEngine(unittest.TestCase):
+    def test_hysteresis_and_cooldown(self):
+        engine = AlertEngine(RULES)
+        subjects = ("A",)
+        fired = []
+        # Oscillates around the HIGH threshold, never below its clear level
+        for t, score in enumerate([70, 67, 69, 66, 70]):
+            fired += engine.evaluate({"score": np.array([score])}, subjects, now=t)
+        self.assertEqual([a["rule"] for a in fired], ["high"])
+
+        # Clears, re-triggers inside the cooldown (suppressed), then after it
+        engine.evaluate({"score": np.array([50])}, subjects, now=10)
+        self.assertEqual(engine.evaluate({"score": np.array([70])}, subjects, now=20), [])
+        engine.evaluate({"score": np.array([50])}, subjects, now=150)
+        again = engine.evaluate({"score": np.array([70])}, subjects, now=160)
+        self.assertEqual([a["message"] for a in again], ["A high"])
+        self.assertEqual(engine.get_stats()["suppressed_by_cooldown"], 1)
+
+    def test_group_reports_most_severe_only(self):
+        engine = AlertEngine(RULES)
+        fired = engine.evaluate({"score": np.array([95, 70, 10])}, ("A", "B", "C"), now=0)
+        self.assertEqual(sorted((a["subject"], a["rule"]) for a in fired),
+                         [("A", "critical"), ("B", "high")])
+
+    def test_drain_and_ring_history(self):
+        engine = AlertEngine(RULES, history=3)
+        for i in range(5):
+            engine.add(f"manual {i}")
+        self.assertEqual([a["seq"] for a in engine.since(0)], [3, 4, 5])
+        self.assertEqual(len(engine.drain()), 3)
+        self.assertEqual(engine.drain(), [])
+        self.assertEqual([a["message"] for a in engine.recent(2)], ["manual 3", "manual 4"])
+
+    def test_unknown_values_keep_state(self):
+        engine = AlertEngine(RULES)
+        engine.evaluate({"score": np.array([90.0])}, ("A",), now=0)
+        self.assertEqual(engine.evaluate({"score": np.array([np.nan])}, ("A",), now=1), [])
+        self.assertEqual(engine.get_stats()["active"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
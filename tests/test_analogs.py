@@ -0,0 +1,114 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.analogs import ANALOG_FIELDS, AnalogIndex, CadenceBuffer, StationIndex, read_history
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = 1.7e9 + np.arange(n) * 3600.0
+    base = np.array([[1.5], [8.0], [5.0], [1008.0]])
+    values = base + np.cumsum(rng.normal(0, [[0.05], [0.1], [0.2], [0.3]], (4, n)), axis=1)
+    return t, values, 0.4 * values[0]
+
+
+def _brute_force(idx, query):
+    def znorm(w):
+        c = w - w.mean(axis=1, keepdims=True)
+        return c / np.maximum(np.sqrt((c * c).mean(axis=1)), idx.floors)[:, None]
+    x = idx.window(idx.t[-1], idx.n)[0]
+    qz, m = znorm(query), query.shape[1]
+    return np.array([((znorm(x[:, i:i + m]) - qz) ** 2).sum() for i in range(idx.n - m + 1)])
+
+
+class TestAnalogs(unittest.TestCase):
+    def test_profile_matches_brute_force(self):
+        t, values, runup = _series(1500)
+        values[3, 200:260] = 1008.0  # flat barometer stretch
+        idx = StationIndex("S", t, values, runup)
+        for m in (24, 7):
+            query = values[:, 900:900 + m] + np.random.default_rng(1).normal(0, 0.05, (4, m))
+            np.testing.assert_allclose(idx.distance_profile(query), _brute_force(idx, query), atol=1e-7)
+
+    def test_planted_pattern_found(self):
+        t, values, runup = _series(3000)
+        values[:, 2500:2524] = values[:, 400:424] * 1.0 + 3.0  # same shape, different level
+        idx = AnalogIndex.from_history({"S": {"t": t, "values": values, "runup": runup}})
+        out = idx.query(values[:, 400:424].T, "S", k=3, horizon=6)
+        starts = sorted(idx.stations["S"].t.searchsorted(m["start"]) for m in out["matches"])
+        self.assertIn(400, starts)
+        self.assertIn(2500, starts)
+        self.assertLess(out["matches"][1]["distance"], 1e-6)
+        # non-overlapping and every match has a full horizon
+        self.assertTrue(all(b - a >= 24 for a, b in zip(starts, starts[1:])))
+        self.assertTrue(all(len(m["future_runup_m"]) == 6 for m in out["matches"]))
+
+    def test_gaps_and_exclusion(self):
+        t, values, runup = _series(400)
+        t[200:] += 30 * 86400.0  # outage splits the series into two segments
+        idx = StationIndex("S", t, values, runup)
+        self.assertEqual(idx.get_stats()["segments"], 2)
+        starts, _ = idx.search(values[:, 170:194], k=50, horizon=6)
+        self.assertTrue(len(starts) > 0)
+        self.assertFalse(any(s < 200 < s + 30 for s in starts))  # window + horizon never spans the gap
+        starts, dist = idx.search(values[:, 100:124], k=1, exclude=(t[100], t[123]))
+        self.assertTrue(starts[0] + 30 <= 100 or starts[0] > 123)
+
+    def test_ensemble_and_anchor(self):
+        t, values, runup = _series(1000)
+        idx = AnalogIndex.from_history({"S": {"t": t, "values": values, "runup": runup}})
+        out = idx.query_history("S", t[600], k=5, horizon=4, runup_now=2.0)
+        self.assertEqual(out["k"], 5)
+        self.assertTrue(all(abs(m["start"] - t[577]) >= 24 * 3600 for m in out["matches"]))
+        anchored = out["anchored"]
+        for q in ("p10_m", "p50_m", "p90_m", "mean_m"):
+            self.assertEqual(len(anchored[q]), 4)
+        self.assertTrue(np.all(np.array(anchored["p10_m"]) <= np.array(anchored["p90_m"])))
+        self.assertAlmostEqual(anchored["mean_m"][0] - out["ensemble"]["mean_m"][0],
+                               2.0 - np.mean([m["runup_m"] for m in out["matches"]]), places=3)
+        with self.assertRaises(ValueError):
+            idx.query(np.zeros((24, 3)))
+
+    def test_query_cadence_must_match_archive(self):
+        t, values, runup = _series(600)
+        idx = AnalogIndex.from_history({"S": {"t": t, "values": values, "runup": runup}})
+        recent = values[:, 300:324].T
+        self.assertEqual(idx.query(recent, "S", step_s=3600.0)["k"], 10)
+        for station in ("S", None):
+            with self.assertRaisesRegex(ValueError, "cadence"):
+                idx.query(recent, station, step_s=0.5)
+
+    def test_cadence_buffer_averages_bins(self):
+        buf = CadenceBuffer(3600.0, maxlen=4)
+        t0 = 1.7e9 - 1.7e9 % 3600
+        for i in range(3 * 7200):  # 3 hours of 0.5 s readings
+            buf.add(t0 + i * 0.5, [float(i // 7200), 1.0])
+        self.assertEqual(len(buf), 2)  # the third hour is still open
+        np.testing.assert_allclose(buf.window(2), [[0.0, 1.0], [1.0, 1.0]])
+        with self.assertRaises(ValueError):
+            buf.window(3)
+        buf.add(t0 + 5 * 3600, [9.0, 9.0])  # a skipped hour breaks the series
+        self.assertEqual((len(buf), buf.get_stats()["resets"]), (0, 1))
+
+    def test_read_history(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "telemetry.csv")
+            with open(path, "w") as f:
+                f.write("timestamp,station_id," + ",".join(ANALOG_FIELDS) + ",runup_m,is_cyclone_event\n")
+                f.write("2024-01-01T01:00:00Z,B1,1.1,8,5,1008,0.5,0\n")
+                f.write("2024-01-01T00:00:00Z,B1,1.0,8,5,1008,0.4,1\n")
+                f.write("2024-01-01T02:00:00Z,B1,,8,5,1008,0.6,0\n")
+            h = read_history([path])["B1"]
+            self.assertEqual(list(h["runup"]), [0.4, 0.5])
+            self.assertEqual(list(h["cyclone"]), [True, False])
+            self.assertEqual(h["values"].shape, (4, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
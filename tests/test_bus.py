@@ -0,0 +1,87 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.bus import InProcessBus, UnixSocketBus
+
+
+class TestTelemetryBus(unittest.TestCase):
+    def test_inproc_fanout_and_commands(self):
+        async def run():
+            bus = InProcessBus()
+            self.assertEqual(await bus.start(), "producer")
+            a, b = bus.subscribe(), bus.subscribe(maxsize=1)
+            await bus.publish("telemetry", b"1")
+            await bus.publish("telemetry", b"2")
+            await bus.send_command(b"AUTHORIZE")
+            return await a.get(), await a.get(), await b.get(), b.dropped, await bus.next_command()
+
+        first, second, latest, dropped, command = asyncio.run(run())
+        self.assertEqual((first, second), (("telemetry", b"1"), ("telemetry", b"2")))
+        self.assertEqual(latest, ("telemetry", b"2"))
+        self.assertEqual(dropped, 1)
+        self.assertEqual(command, b"AUTHORIZE")
+
+    def test_unix_socket_producer_election(self):
+        path = os.path.join(tempfile.mkdtemp(), "aegis.sock")
+
+        async def run():
+            producer, gateway = UnixSocketBus(path, retry_s=0.01), UnixSocketBus(path, retry_s=0.01)
+            roles = (await producer.start(), await gateway.start())
+            sub = gateway.subscribe()
+            while not producer.get_stats()["gateways"]:
+                await asyncio.sleep(0.01)
+            await producer.publish("telemetry", b'{"tick": 1}')
+            frame = await asyncio.wait_for(sub.get(), 2)
+            await gateway.send_command(b"DEPLOY_WARNING")
+            command = await asyncio.wait_for(producer.next_command(), 2)
+            await gateway.close()
+            await producer.close()
+            return roles, frame, command
+
+        roles, frame, command = asyncio.run(run())
+        self.assertEqual(roles, ("producer", "gateway"))
+        self.assertEqual(frame, ("telemetry", b'{"tick": 1}'))
+        self.assertEqual(command, b"DEPLOY_WARNING")
+
+    def test_gateway_request_reply(self):
+        path = os.path.join(tempfile.mkdtemp(), "aegis.sock")
+
+        async def serve(producer):
+            while True:
+                token, body = await producer.next_request()
+                producer.reply(token, b"echo:" + body)
+
+        async def run():
+            producer, gateway = UnixSocketBus(path, retry_s=0.01), UnixSocketBus(path, retry_s=0.01)
+            await producer.start()
+            await gateway.start()
+            with self.assertRaises(ConnectionError):
+                await gateway.request(b"too early")  # not connected upstream yet
+            while not producer.get_stats()["gateways"]:
+                await asyncio.sleep(0.01)
+            server = asyncio.create_task(serve(producer))
+            # concurrent requests are matched to their own replies
+            replies = await asyncio.gather(*(gateway.request(b"q%d" % i, timeout=2) for i in range(5)))
+            stats = gateway.get_stats()
+            server.cancel()
+            with self.assertRaises(asyncio.TimeoutError):
+                await gateway.request(b"nobody answers", timeout=0.05)
+            with self.assertRaises(RuntimeError):
+                await producer.request(b"x")
+            await gateway.close()
+            await producer.close()
+            return replies, stats, producer.get_stats()
+
+        replies, gateway_stats, producer_stats = asyncio.run(run())
+        self.assertEqual(replies, [b"echo:q%d" % i for i in range(5)])
+        self.assertEqual(gateway_stats["pending_requests"], 0)
+        self.assertEqual(producer_stats["requests_served"], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
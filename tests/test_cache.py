@@ -0,0 +1,31 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_order_and_counters(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)   # "a" becomes most recent
+        cache.put("c", 3)                     # evicts "b"
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 1, 1))
+        self.assertEqual(stats["size"], 2)
+        self.assertIn("a", cache)
+
+    def test_rejects_empty_cache(self):
+        with self.assertRaises(ValueError):
+            LRUCache(maxsize=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.cyclone import P_ENV_HPA, CycloneTrack, evaluate_track, holland_field, surge_estimate
+
+T0 = 1.76e9
+
+
+def ring(lat, lon, radius_km, n=72):
+    a = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    dlat = radius_km / 111.2 * np.cos(a)
+    dlon = radius_km / (111.2 * np.cos(np.radians(lat))) * np.sin(a)
+    return lat + dlat, lon + dlon, a
+
+
+class TestCyclone(unittest.TestCase):
+    def test_holland_profile(self):
+        track = CycloneTrack([T0, T0 + 3600], [15.0, 15.0], [68.0, 68.0], [50.0, 50.0], [950.0, 950.0],
+                             [30.0, 30.0])
+        state = track.at([T0])
+        lats = np.full(200, 15.0)
+        lons = 68.0 + np.linspace(0.01, 3.0, 200)
+        field = holland_field(state, lats, lons)
+        dist = field["dist_km"][0]
+        peak = dist[np.argmax(field["wind_ms"][0])]
+        self.assertAlmostEqual(field["wind_ms"][0].max(), 50.0, delta=2.0)
+        self.assertAlmostEqual(peak, 30.0, delta=5.0)
+        self.assertLess(field["pressure_hpa"][0, 0], 952.0)
+        self.assertGreater(field["pressure_hpa"][0, -1], P_ENV_HPA - 10)
+
+    def test_stronger_right_of_track(self):
+        # Moving north at ~20 km/h: the east (right) side is windier
+        track = CycloneTrack([T0, T0 + 36000], [15.0, 15.0 + 200 / 111.2], [68.0, 68.0], [45.0, 45.0])
+        lats, lons, a = ring(15.0, 68.0, 40.0)
+        wind = holland_field(track.at([T0]), lats, lons)["wind_ms"][0]
+        east, west = wind[np.argmin(np.abs(a - np.pi / 2))], wind[np.argmin(np.abs(a - 3 * np.pi / 2))]
+        self.assertGreater(east, west + 2.0)
+
+    def test_surge_sign_follows_onshore_wind(self):
+        lats, lons, a = ring(15.0, 68.0, 60.0)
+        track = CycloneTrack([T0, T0 + 3600], [15.0, 15.0], [68.0, 68.0], [45.0, 45.0])
+        field = holland_field(track.at([T0]), lats, lons)
+        surge = surge_estimate(field, 90.0, 100.0, 25.0)[0]
+        # Counter-clockwise flow blows east (onshore for a west-facing coast) south of the centre
+        south, north = surge[np.argmin(np.abs(a - np.pi))], surge[np.argmin(np.abs(a))]
+        self.assertGreater(south, 0.5)
+        self.assertLess(north, south - 0.5)
+
+    def test_blocked_evaluation_and_track_window(self):
+        track = CycloneTrack.synthetic("VSCS", 19.0, 72.85, T0 + 6 * 3600)
+        rng = np.random.default_rng(2)
+        sites = {"lat": rng.uniform(18.5, 19.5, 40), "lon": rng.uniform(72.6, 73.0, 40),
+                 "wall_height": np.full(40, 3.0)}
+        times = T0 + np.arange(0, 48 * 3600, 1800.0)
+        full = evaluate_track(track, sites, times, base_hs=1.5, base_tp=8.0, block=1000)
+        blocked = evaluate_track(track, sites, times, base_hs=1.5, base_tp=8.0, block=7)
+        for k in ("total_m", "peak_total_m", "peak_time", "closest_km", "min_margin_m"):
+            np.testing.assert_allclose(blocked[k], full[k])
+        # After the track ends: no storm, observed waves only
+        after = times > track.times[-1]
+        self.assertTrue(after.any())
+        np.testing.assert_allclose(full["surge_m"][after], 0.0)
+        np.testing.assert_allclose(full["hs_m"][after], 1.5)
+        self.assertTrue(np.all(full["peak_total_m"] > full["total_m"][after].max(axis=0)))
+
+    def test_missing_pressure_filled_per_point(self):
+        track = CycloneTrack.from_points([
+            {"time": T0, "lat": 17.0, "lon": 71.0, "vmax_kt": 90},
+            {"time": T0 + 3600, "lat": 17.1, "lon": 71.1, "vmax_ms": 50.0, "pc_hpa": 960.0},
+        ])
+        self.assertEqual(track.pc[1], 960.0)
+        self.assertTrue(940.0 < track.pc[0] < 965.0)
+
+    def test_rejects_repeated_or_unordered_times(self):
+        def point(t):
+            return {"time": t, "lat": 17.0, "lon": 71.0, "vmax_ms": 40.0}
+
+        for times in ([T0, T0, T0 + 3600], [T0 + 3600, T0], [T0, float("nan")]):
+            with self.assertRaises(ValueError):
+                CycloneTrack.from_points([point(t) for t in times])
+        track = CycloneTrack.from_points([point(T0), point(T0 + 3600)])
+        self.assertTrue(np.all(np.isfinite(track.at([T0, T0 + 1800])["move_u"])))
+
+
+if __name__ == '__main__':
+    unittest.main()
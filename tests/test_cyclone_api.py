@@ -0,0 +1,56 @@
+import unittest
+import json
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+try:
+    from fastapi.testclient import TestClient
+    import main as backend
+except ImportError as e:  # backend dependencies not installed
+    backend = None
+    IMPORT_ERROR = str(e)
+
+
+def points(start, vmax_key="vmax_ms"):
+    return [{"time": start + i * 3600.0, "lat": 15.0 + i * 0.5, "lon": 85.0, vmax_key: 40.0} for i in range(3)]
+
+
+class TestCycloneAPI(unittest.TestCase):
+    def setUp(self):
+        if backend is None:
+            self.skipTest(f"backend not importable: {IMPORT_ERROR}")
+        patcher = mock.patch.object(backend, "ADMIN_TOKEN", "secret")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(backend.cyclone.update, track=None, result=None)
+        self.client = TestClient(backend.app)
+
+    def post(self, body):
+        return self.client.post("/api/admin/cyclone", json=body, headers={"X-Aegis-Admin-Token": "secret"})
+
+    def test_track_that_has_passed_is_rejected(self):
+        r = self.post({"name": "OLD", "points": points(time.time() - 86400)})
+        self.assertEqual(r.status_code, 422)
+        self.assertIn("past", r.json()["detail"])
+
+    def test_point_without_wind_is_rejected(self):
+        pts = points(time.time())
+        del pts[1]["vmax_ms"]
+        r = self.post({"points": pts})
+        self.assertEqual(r.status_code, 422)
+        self.assertIn("vmax_ms or vmax_kt", json.dumps(r.json()))
+
+    def test_passed_track_command_is_announced_then_cleared(self):
+        msg = json.dumps({"command": "cyclone_track", "name": "OLD", "points": points(time.time() - 86400)})
+        self.assertEqual(backend.handle_command(msg), "CYCLONE_TRACK_UPDATED")
+        self.assertIsNone(backend.cyclone["track"])
+        self.assertEqual(backend.alerts.recent(1)[-1]["message"], "Cyclone track updated: OLD")
+
+
+if __name__ == '__main__':
+    unittest.main()
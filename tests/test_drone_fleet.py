@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.fleet import DroneFleet
+from aegis_sim.drone import DroneSimulator
+
+
+class TestDroneFleet(unittest.TestCase):
+    def test_snapshot_matches_backend_records(self):
+        records = [
+            {"id": "a", "name": "A", "status": "ACTIVE", "battery": 80, "altitude_m": 100,
+             "speed_ms": 5, "lat": 19.0, "lon": 72.8, "signal_dbm": -40, "data_rate": "10kb/s"},
+            {"id": "b", "name": "B", "status": "STANDBY", "battery": 90, "altitude_m": 0,
+             "speed_ms": 0, "lat": 19.1, "lon": 72.9, "signal_dbm": -30, "data_rate": "0kb/s"},
+        ]
+        fleet = DroneFleet.from_records(records, seed=0)
+        fleet.step(10.0)
+        snap = fleet.snapshot()
+        self.assertEqual([d["id"] for d in snap], ["a", "b"])
+        self.assertEqual(set(snap[0]), set(records[0]))
+        self.assertLess(snap[0]["battery"], 80)
+        self.assertEqual(snap[1]["battery"], 95)  # topping up on the pad
+        self.assertEqual(snap[1]["status"], "STANDBY")  # one drone on survey is enough
+        self.assertEqual((snap[1]["lat"], snap[1]["lon"]), (19.1, 72.9))
+
+    def test_low_battery_returns_home_and_recharges(self):
+        fleet = DroneFleet(seed=0, min_active=0)  # nothing relaunches it
+        fleet.add("d", "D", 19.0, 72.8, battery=21.0, orbit_m=200.0)
+        statuses = set()
+        for _ in range(2000):
+            fleet.step(1.0)
+            statuses.add(fleet.snapshot()[0]["status"])
+        self.assertEqual(statuses, {"ACTIVE", "RETURNING", "CHARGING", "STANDBY"})
+        d = fleet.snapshot()[0]
+        self.assertGreaterEqual(d["battery"], 95)
+        self.assertAlmostEqual(d["lat"], 19.0, places=3)
+
+    def test_standby_drones_relaunch_to_keep_survey_staffed(self):
+        records = [
+            {"id": "a", "name": "A", "status": "ACTIVE", "battery": 78, "lat": 19.04, "lon": 72.85},
+            {"id": "b", "name": "B", "status": "ACTIVE", "battery": 65, "lat": 19.02, "lon": 72.82},
+            {"id": "c", "name": "C", "status": "STANDBY", "battery": 92, "lat": 18.93, "lon": 72.83},
+            {"id": "d", "name": "D", "status": "RETURNING", "battery": 23, "lat": 19.0988, "lon": 72.8267,
+             "home_lat": 19.0981, "home_lon": 72.8342},
+        ]
+        fleet = DroneFleet.from_records(records, seed=0)
+        self.assertEqual(fleet.min_active, 2)
+        fleet.step(1.0)
+        self.assertEqual(fleet.snapshot()[3]["status"], "RETURNING")  # still ~800 m from its pad
+        active, seen = [], set()
+        for _ in range(4 * 3600):
+            fleet.step(1.0)
+            snap = fleet.snapshot()
+            active.append(sum(d["status"] == "ACTIVE" for d in snap))
+            seen.update((d["id"], d["status"]) for d in snap)
+        # every drone rotates through survey duty and the survey stays staffed
+        self.assertTrue(all((i, "ACTIVE") in seen for i in "abcd"))
+        self.assertTrue(all((i, "CHARGING") in seen for i in "abd"))
+        self.assertGreaterEqual(min(active[600:]), 1)
+        self.assertGreater(sum(a >= 2 for a in active) / len(active), 0.95)
+
+    def test_large_fleet_and_async_stream(self):
+        fleet = DroneFleet(seed=1)
+        fleet.add_random(300, 19.0, 72.8)
+
+        async def take(n):
+            out = []
+            async for snap in fleet.stream(interval=0.01):
+                out.append(snap)
+                if len(out) == n:
+                    return out
+
+        snaps = asyncio.run(take(3))
+        self.assertEqual(len(snaps[-1]), 300)
+        self.assertEqual(fleet.get_stats()["drones"], 300)
+
+    def test_simulator_step(self):
+        sim = DroneSimulator(lat_start=34.01, lon_start=-118.50)
+        first = sim.step(dt=0.0)
+        second = sim.step(dt=5.0)
+        self.assertNotEqual((first["latitude"], first["longitude"]),
+                            (second["latitude"], second["longitude"]))
+        self.assertIn("wave_height", second)
+
+
+if __name__ == '__main__':
+    unittest.main()
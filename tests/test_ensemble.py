@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.engine import calculate_stockdon_runup
+from aegis_sim.ensemble import forecast_ensemble
+
+
+class TestForecastEnsemble(unittest.TestCase):
+    def test_bands_and_exceedance(self):
+        walls = {"low": 0.5, "mid": 1.2, "high": 10.0}
+        result = forecast_ensemble(2.5, 9.0, 0.035, wall_heights=walls, members=400, seed=7)
+        steps = result["steps"]
+        self.assertEqual(len(steps), 24)
+        for step in steps:
+            self.assertLessEqual(step["runup_p10"], step["runup_m"])
+            self.assertLessEqual(step["runup_m"], step["runup_p90"])
+        # The median member should track the deterministic physics at lead time zero.
+        self.assertAlmostEqual(steps[0]["runup_m"], calculate_stockdon_runup(2.5, 9.0, 0.035), delta=0.1)
+        exc = result["exceedance"]
+        self.assertEqual(exc["low"], 1.0)
+        self.assertEqual(exc["high"], 0.0)
+        self.assertTrue(0.0 < exc["mid"] < 1.0)
+
+    def test_seeded_runs_are_reproducible(self):
+        a = forecast_ensemble(3.0, 11.0, 0.04, seed=3)
+        b = forecast_ensemble(3.0, 11.0, 0.04, seed=3)
+        self.assertEqual(a["steps"], b["steps"])
+
+    def test_still_water_shifts_levels_and_exceedance(self):
+        walls = {"w": 1.5}
+        tide = [1.0] * 24
+        dry = forecast_ensemble(2.5, 9.0, 0.035, wall_heights=walls, seed=5)
+        wet = forecast_ensemble(2.5, 9.0, 0.035, wall_heights=walls, seed=5, still_water=tide)
+        step = wet["steps"][0]
+        self.assertEqual(step["runup_m"], dry["steps"][0]["runup_m"])
+        self.assertAlmostEqual(step["water_level_m"], step["runup_m"] + 1.0, places=3)
+        self.assertGreater(wet["exceedance"]["w"], dry["exceedance"]["w"])
+        with self.assertRaises(ValueError):
+            forecast_ensemble(2.5, 9.0, 0.035, still_water=[0.0] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
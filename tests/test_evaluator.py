@@ -0,0 +1,40 @@
+import unittest
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.evaluator import ShadowEvaluator, DEFAULT_ALPHA
+
+
+class TestShadowEvaluator(unittest.TestCase):
+    def test_joins_on_data_time_and_expires_gaps(self):
+        ev = ShadowEvaluator(horizons_h=(1, 2), max_lag_s=600)
+        ev.record_forecast(0.0, [1.0, 1.2], [0.9, 1.0], [0.96, 1.12], station_id="A")
+        ev.observe(3599.0, 5.0, station_id="A")   # nothing due yet
+        self.assertEqual(ev.joined, 0)
+        ev.observe(3600.0, 1.1, station_id="B")   # other station: no join
+        self.assertEqual(ev.joined, 0)
+        ev.observe(3600.0, 1.1, station_id="A")   # 1h entry joins
+        ev.observe(7200.0 + 601, 1.0, station_id="A")  # 2h entry arrives too late
+        self.assertEqual((ev.joined, ev.expired, ev.pending_count()), (1, 1, 0))
+        self.assertAlmostEqual(ev.get_stats()["skill"]["lstm"]["1h"]["mae"], 0.1)
+
+    def test_alpha_moves_towards_the_better_source(self):
+        rng = random.Random(7)
+        ev = ShadowEvaluator(horizons_h=(1,))
+        self.assertEqual(ev.alpha(), [DEFAULT_ALPHA])
+        for k in range(400):
+            truth = 1.0 + 0.5 * rng.random()
+            lstm = truth + rng.gauss(0, 0.05)
+            physics = truth + 0.3 + rng.gauss(0, 0.05)
+            ev.record_forecast(k * 60.0, [lstm], [physics], [0.6 * lstm + 0.4 * physics])
+            ev.observe(k * 60.0 + 3600.0, truth)
+        self.assertGreater(ev.alpha()[0], 0.9)
+        skill = ev.get_stats()["skill"]
+        self.assertLess(skill["lstm"]["1h"]["rmse"], skill["physics"]["1h"]["rmse"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import asyncio
+import math
+import os
+import sys
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.engine import calculate_stockdon_runup
+from aegis_sim.executor import StageExecutor, executor_from_env
+
+
+def _fail(message):
+    raise RuntimeError(message)
+
+
+class TestStageExecutor(unittest.TestCase):
+    def test_run_io_results_and_errors(self):
+        executor = StageExecutor(io_workers=2)
+        self.addCleanup(executor.shutdown)
+
+        async def run():
+            name = await executor.run_io(lambda: threading.current_thread().name)
+            total = await executor.run_io(sum, [1, 2, 3], start=4)
+            with self.assertRaises(RuntimeError):
+                await executor.run_io(_fail, "disk full")
+            return name, total
+
+        name, total = asyncio.run(run())
+        self.assertTrue(name.startswith("aegis-io"))
+        self.assertEqual(total, 10)
+        stats = executor.get_stats()
+        self.assertEqual(stats["io"]["submitted"], 3)
+        self.assertEqual(stats["io"]["completed"], 2)
+        self.assertEqual(stats["io"]["failed"], 1)
+        self.assertEqual(stats["io"]["inflight"], 0)
+        self.assertEqual(stats["cpu"]["submitted"], 0)
+
+    def test_run_cpu_without_pool_uses_threads(self):
+        executor = StageExecutor(io_workers=1, cpu_workers=0)
+        self.addCleanup(executor.shutdown)
+        runup = asyncio.run(executor.run_cpu(calculate_stockdon_runup, 2.0, 9.0, 0.035))
+        self.assertAlmostEqual(runup, calculate_stockdon_runup(2.0, 9.0, 0.035))
+        self.assertEqual(executor.get_stats()["io"]["completed"], 1)
+
+    def test_process_pool_errors_and_restart(self):
+        executor = StageExecutor(io_workers=1, cpu_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        async def run():
+            runup = await executor.run_cpu(calculate_stockdon_runup, 2.0, 9.0, 0.035)
+            with self.assertRaises(ValueError):
+                await executor.run_cpu(math.sqrt, -1.0)
+            broken = executor.cpu_pool
+            with self.assertRaises(BrokenProcessPool):
+                await executor.run_cpu(os._exit, 1)  # worker dies mid-task
+            self.assertIsNot(executor.cpu_pool, broken)
+            return runup, await executor.run_cpu(math.factorial, 5)
+
+        runup, after = asyncio.run(run())
+        self.assertAlmostEqual(runup, calculate_stockdon_runup(2.0, 9.0, 0.035))
+        self.assertEqual(after, 120)
+        stats = executor.get_stats()
+        self.assertEqual(stats["cpu_restarts"], 1)
+        self.assertEqual(stats["cpu"]["submitted"], 4)
+        self.assertEqual(stats["cpu"]["completed"], 2)
+        self.assertEqual(stats["cpu"]["failed"], 2)
+        self.assertGreater(stats["cpu"]["busy_s"], 0)
+
+    def test_executor_from_env(self):
+        executor = executor_from_env({"AEGIS_IO_WORKERS": "3"})
+        self.addCleanup(executor.shutdown)
+        self.assertEqual(executor.get_stats()["io_workers"], 3)
+        self.assertIsNone(executor.cpu_pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.features import FEATURE_NAMES, FeatureEngine, feature_columns
+
+
+def _stream(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        1.5 + np.abs(np.cumsum(rng.normal(0, 0.1, n))), 8.0 + rng.normal(0, 0.5, n),
+        28.0 + rng.normal(0, 0.3, n), np.abs(6.0 + np.cumsum(rng.normal(0, 0.5, n))),
+        1008.0 + np.cumsum(rng.normal(0, 0.3, n)),
+    ])
+
+
+def _times(n, step=3600.0):
+    return 1.7e9 + np.arange(n) * step
+
+
+class TestFeatureEngine(unittest.TestCase):
+    def test_incremental_matches_batch(self):
+        X = _stream(2000)
+        rng = np.random.default_rng(5)
+        # 0.5 s bursts, hourly archive steps and a few long outages
+        t = 1.7e9 + np.cumsum(rng.choice([0.5, 3600.0, 86400.0], 2000, p=[0.6, 0.38, 0.02]))
+        for kwargs in ({}, {"fast_tau_s": 60.0, "window_s": 5.0}):
+            engine = FeatureEngine(**kwargs)
+            live = np.array([engine.update(row, ti) for row, ti in zip(X, t)])
+            np.testing.assert_allclose(live, FeatureEngine(**kwargs).transform(X, t), rtol=1e-10, atol=1e-9)
+        self.assertEqual(live.shape, (2000, len(FEATURE_NAMES)))
+
+    def test_same_quantities_at_any_cadence(self):
+        # Pressure falling 0.5 hPa/h and waves building 0.1 m/h, seen hourly and every 30 s
+        def sample(step):
+            t = _times(int(12 * 3600 / step) + 1, step)
+            hours = (t - t[0]) / 3600.0
+            X = np.column_stack([1.0 + 0.1 * hours, np.full_like(t, 9.0), np.full_like(t, 28.0),
+                                 np.full_like(t, 8.0), 1008.0 - 0.5 * hours])
+            return FeatureEngine().transform(X, t)[-1]
+
+        hourly, fast = sample(3600.0), sample(30.0)
+        col = FEATURE_NAMES.index
+        for name in ("pressure_tendency_hpa", "wave_height_max_m"):
+            self.assertAlmostEqual(hourly[col(name)], fast[col(name)], msg=name)
+        self.assertAlmostEqual(fast[col("pressure_tendency_hpa")], -1.5)
+        # the window is 6 h at both cadences: they differ by at most one hourly step of the ramp
+        self.assertAlmostEqual(hourly[col("wave_height_range_m")], fast[col("wave_height_range_m")], delta=0.1)
+
+    def test_definitions(self):
+        X = _stream(50, seed=1)
+        out = FeatureEngine(window_s=6 * 3600.0, lag_s=3 * 3600.0).transform(X, _times(50))
+        col = {n: out[:, i] for i, n in enumerate(FEATURE_NAMES)}
+        h, p = X[:, 0], X[:, 4]
+        for t in (0, 3, 20, 49):
+            lo = max(0, t - 5)
+            self.assertAlmostEqual(col["wave_height_max_m"][t], h[lo:t + 1].max())
+            self.assertAlmostEqual(col["wave_height_range_m"][t], np.ptp(h[lo:t + 1]))
+            self.assertAlmostEqual(col["wave_height_mean_m"][t], h[lo:t + 1].mean())
+            self.assertAlmostEqual(col["pressure_tendency_hpa"][t], p[t] - p[max(0, t - 3)])
+        self.assertEqual(col["pressure_anomaly_hpa"][0], 0.0)
+        self.assertTrue(np.all(col["wind_stress_pa"] >= 0))
+
+    def test_groups_are_independent(self):
+        A, B = _stream(300, seed=2), _stream(300, seed=3)
+        mixed = np.empty((600, 5))
+        mixed[0::2], mixed[1::2] = A, B
+        groups = np.array(["A", "B"] * 300)
+        t = np.repeat(_times(300), 2)
+        out = FeatureEngine().transform(mixed, t, groups=groups)
+        np.testing.assert_allclose(out[0::2], FeatureEngine().transform(A, t[0::2]))
+        np.testing.assert_allclose(out[1::2], FeatureEngine().transform(B, t[1::2]))
+
+    def test_revise_replaces_last_update(self):
+        X = _stream(40, seed=4)
+        engine = FeatureEngine()
+        t = _times(40)
+        for row, ti in zip(X[:30], t):
+            engine.update(row, ti)
+        engine.update(X[30] + 5.0, t[30])
+        revised = engine.revise(X[30])
+        later = [engine.update(row, ti) for row, ti in zip(X[31:], t[31:])]
+        clean = FeatureEngine().transform(X, t)
+        np.testing.assert_allclose(revised, clean[30], atol=1e-9)
+        np.testing.assert_allclose(later, clean[31:], atol=1e-9)
+
+    def test_feature_columns(self):
+        self.assertEqual(feature_columns(FEATURE_NAMES), [0, 1, 2, 3, 4])
+        self.assertEqual(feature_columns(FEATURE_NAMES, ["wind_stress_pa", "wave_height_m"]),
+                         [FEATURE_NAMES.index("wind_stress_pa"), 0])
+        with self.assertRaises(ValueError):
+            feature_columns(FEATURE_NAMES, ["tide_m"])
+
+
+if __name__ == '__main__':
+    unittest.main()
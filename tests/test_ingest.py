@@ -0,0 +1,91 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.ingest import ReplaySource, LineProtocolSource, parse_line, source_from_env
+
+CSV_HEADER = "timestamp,station_id,wave_height_m,period_s,temp_c,wind_speed_mps,pressure_hpa\n"
+
+
+class TestIngest(unittest.TestCase):
+    def _write_csv(self, rows):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as f:
+            f.write(CSV_HEADER)
+            f.writelines(rows)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_replay_accelerated(self):
+        # rows one minute apart at 1000x -> 2 * 60ms of pacing
+        path = self._write_csv([
+            "2023-01-01T00:00:00Z,BUOY-A,1.0,8.0,27.0,5.0,1010.0\n",
+            "2023-01-01T00:01:00Z,BUOY-A,2.0,9.0,27.5,6.0,1008.0\n",
+            "2023-01-01T00:01:00Z,BUOY-B,9.9,9.0,27.5,6.0,1008.0\n",
+            "2023-01-01T00:02:00Z,BUOY-A,3.0,10.0,28.0,7.0,1006.0\n",
+        ])
+
+        async def run():
+            src = ReplaySource(path, speed=5000, station_id="BUOY-A", loop=False)
+            self.assertEqual(src.speed, 1000.0)
+            await src.start()
+            t0 = time.monotonic()
+            readings = [r async for r in src]
+            return readings, time.monotonic() - t0
+
+        readings, took = asyncio.run(run())
+        self.assertEqual([r["wave_height_m"] for r in readings], [1.0, 2.0, 3.0])
+        self.assertAlmostEqual(took, 0.12, delta=0.05)
+
+    def test_parse_line_protocol(self):
+        r = parse_line("buoy,station_id=BUOY-MUM-01 wave_height_m=2.4,period_s=9.1 1708271100000000000")
+        self.assertEqual(r["station_id"], "BUOY-MUM-01")
+        self.assertAlmostEqual(r["timestamp"], 1708271100.0)
+        self.assertEqual(r["wave_height_m"], 2.4)
+        # Missing sensors are carried forward from the previous reading.
+        r2 = parse_line('{"station_id": "BUOY-MUM-01", "wave_height_m": 3.0}', last=r)
+        self.assertEqual(r2["period_s"], 9.1)
+
+    def test_udp_listener(self):
+        async def run():
+            src = LineProtocolSource(port=0, protocol="udp")
+            src.feed("buoy,station_id=X wave_height_m=1.1\nnot a line\n")
+            return await src.read(), src.malformed
+
+        reading, malformed = asyncio.run(run())
+        self.assertEqual(reading["wave_height_m"], 1.1)
+        self.assertEqual(malformed, 1)
+
+    def test_json_lines_carry_forward_per_station(self):
+        async def run():
+            src = LineProtocolSource(port=0, protocol="udp")
+            src.feed("buoy,station=A period_s=9.1\n"
+                     '{"station_id": "B", "period_s": 12.0}\n'
+                     '{"station_id": "A", "wave_height_m": 3.0}\n'
+                     '[1, 2]\n')
+            return [await src.read() for _ in range(3)], src.malformed
+
+        (a, b, a2), malformed = asyncio.run(run())
+        self.assertEqual((a2["station_id"], a2["wave_height_m"], a2["period_s"]), ("A", 3.0, 9.1))
+        self.assertEqual(b["period_s"], 12.0)
+        self.assertEqual(malformed, 1)
+
+    def test_source_from_env(self):
+        self.assertEqual(source_from_env({}).kind, "synthetic")
+        src = source_from_env({"AEGIS_INGEST": "replay", "AEGIS_REPLAY_SPEED": "0.1"})
+        self.assertEqual(src.speed, 1.0)
+        # The multi-station buoy archive replays only the city's station unless asked otherwise
+        self.assertEqual(src.station_id, "BUOY-MUM-01")
+        src = source_from_env({"AEGIS_INGEST": "replay", "AEGIS_REPLAY_STATION": "all"})
+        self.assertIsNone(src.station_id)
+        src = source_from_env({"AEGIS_INGEST": "replay", "AEGIS_REPLAY_PATH": "data/recordings"})
+        self.assertIsNone(src.station_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.inundation import InundationModel, mask_polygons, priority_flood, sea_seeds
+
+
+def relaxed_fill(dem, seeds):
+    """Reference minimax fill by repeated neighbour relaxation."""
+    fill = np.where(seeds, dem, np.inf)
+    while True:
+        p = np.pad(fill, 1, constant_values=np.inf)
+        nbr = np.minimum.reduce([p[:-2, 1:-1], p[2:, 1:-1], p[1:-1, :-2], p[1:-1, 2:]])
+        new = np.where(seeds, dem, np.minimum(fill, np.maximum(dem, nbr)))
+        if np.array_equal(new, fill):
+            return fill
+        fill = new
+
+
+class TestInundation(unittest.TestCase):
+    def test_priority_flood_matches_relaxation(self):
+        rng = np.random.default_rng(4)
+        dem = rng.uniform(-2, 6, (40, 30))
+        seeds = sea_seeds(dem)
+        np.testing.assert_allclose(priority_flood(dem, seeds), relaxed_fill(dem, seeds))
+
+    def test_basin_behind_wall_floods_only_when_overtopped(self):
+        dem = np.full((5, 7), 2.0)
+        dem[:, 0] = -1.0          # sea column on the west edge
+        dem[:, 2] = 3.0           # sea wall
+        dem[1:4, 3:6] = 0.5       # low basin behind it
+        model = InundationModel(dem, (72.0, 19.0, 0.001, 0.001), level_step_m=0.1)
+        self.assertEqual(int(model.extent(2.5)[1:4, 3:6].sum()), 0)
+        self.assertEqual(int(model.extent(3.2)[1:4, 3:6].sum()), 9)
+        self.assertAlmostEqual(float(model.depth(3.2)[2, 4]), 2.7, places=5)
+        self.assertIs(model.depth(3.2), model.depth(3.21))   # same quantized level
+
+    def test_polygons_cover_flooded_cells(self):
+        mask = np.zeros((6, 6), dtype=bool)
+        mask[1:5, 1:5] = True
+        mask[2:4, 2:4] = False
+        (poly,) = mask_polygons(mask, (0.0, 6.0, 1.0, 1.0))
+        outer, hole = (np.array(r) for r in poly)
+
+        def area(ring):
+            x, y = ring[:, 0], ring[:, 1]
+            return 0.5 * np.sum(x[:-1] * y[1:] - x[1:] * y[:-1])
+
+        self.assertGreater(area(outer), 0)   # counter-clockwise exterior
+        self.assertLess(area(hole), 0)       # clockwise hole
+        self.assertEqual(area(outer) + area(hole), mask.sum())
+
+    def test_shared_model_across_threads(self):
+        model = InundationModel.synthetic((64, 64), cache_size=4)
+        levels = [0.5 + 0.05 * (i % 40) for i in range(400)]
+        serial = InundationModel(model.dem, model.transform, fill=model.fill)
+        expected = {round(l, 2): serial.summary(l) for l in levels}
+
+        def work(level):
+            model.depth(level)
+            model.polygons(level, max_cells=32)
+            return round(level, 2), model.summary(level)
+
+        # A small cache under many threads keeps evicting while others read
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(work, levels))
+        for level, summary in results:
+            self.assertEqual(summary, expected[level])
+        self.assertLessEqual(model.get_stats()["depth_cache"]["size"], 4)
+
+    def test_load_reuses_saved_fill(self):
+        model = InundationModel.synthetic((48, 48))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dem.npy")
+            model.save(path)
+            first = InundationModel.load(path)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "dem.fill.npy")))
+            again = InundationModel.load(path)
+            np.testing.assert_array_equal(first.fill, again.fill)
+            self.assertEqual(again.summary(2.0), model.summary(2.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import gzip
+import json
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.layers import LayerStore, point_features
+
+PORTS = [{"id": "p1", "name": "JNPT", "lat": 18.95, "lon": 72.95, "capacity": 90}]
+
+
+class TestLayerStore(unittest.TestCase):
+    def test_geojson_and_precompressed_bodies(self):
+        store = LayerStore()
+        store.publish("ports", point_features(PORTS, "id"))
+        layer = store.get("ports")
+        doc = json.loads(layer.body)
+        self.assertEqual(doc["features"][0]["geometry"]["coordinates"], [72.95, 18.95])
+        self.assertEqual(doc["features"][0]["properties"], {"id": "p1", "name": "JNPT", "capacity": 90})
+
+        body, enc = layer.select("deflate, gzip;q=0.8")
+        self.assertEqual(enc, "gzip")
+        self.assertEqual(gzip.decompress(body), layer.body)
+        self.assertEqual(layer.select("")[1], "identity")
+
+    def test_version_and_etag_only_change_with_content(self):
+        store = LayerStore()
+        store.publish("ports", point_features(PORTS))
+        etag = store.get("ports").etag
+        self.assertFalse(store.publish("ports", point_features(PORTS)))
+        self.assertEqual(store.version, 1)
+
+        layer = store.get("ports")
+        self.assertTrue(layer.matches(layer.etag_for("gzip")))
+        self.assertTrue(layer.matches(f'W/"{etag}", "other"'))
+        self.assertTrue(store.publish("ports", point_features([dict(PORTS[0], capacity=95)])))
+        self.assertEqual(store.version, 2)
+        self.assertFalse(store.get("ports").matches(f'"{etag}"'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.metrics import MetricsRegistry, RollingHistogram
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_window_quantiles(self):
+        hist = RollingHistogram(buckets=(1, 2, 5, 10))
+        for v in [0.5] * 90 + [8.0] * 10:
+            hist.observe(v)
+        self.assertEqual(hist.count, 100)
+        self.assertLessEqual(hist.window_quantile(0.5), 1.0)
+        self.assertGreater(hist.window_quantile(0.95), 5.0)
+
+    def test_window_expires_after_idle_gap(self):
+        hist = RollingHistogram(buckets=(1, 2, 5, 10), window_s=60.0, slots=6)
+        t0 = time.perf_counter()
+        for i in range(6):  # one value in every slot of the window
+            hist.observe(8.0, now=t0 + 10.0 * i + 1.0)
+        self.assertEqual(sum(hist.window_counts(now=t0 + 55.0)), 6)
+        # Idle for longer than the window: none of the old values are recent any more
+        hist.observe(0.5, now=t0 + 200.0)
+        self.assertEqual(hist.window_counts(now=t0 + 200.0), [1, 0, 0, 0, 0])
+        self.assertLessEqual(hist.window_quantile(0.99, hist.window_counts(now=t0 + 200.0)), 1.0)
+        self.assertEqual(hist.count, 7)
+        # A gap shorter than the window expires only the slots it passed
+        hist.observe(8.0, now=t0 + 235.0)
+        self.assertEqual(sum(hist.window_counts(now=t0 + 255.0)), 2)
+        self.assertEqual(sum(hist.window_counts(now=t0 + 275.0)), 1)
+        self.assertEqual(hist.count, 8)
+
+    def test_prometheus_render(self):
+        reg = MetricsRegistry()
+        reg.record_stage("physics", 0.002, overrun=False)
+        reg.record_stage("physics", 0.9, overrun=True)
+        with reg.timer("broadcast.serialize"):
+            time.sleep(0.001)
+        reg.set_gauge("ws_clients", 3)
+        text = reg.render()
+        self.assertIn('aegis_stage_duration_ms_count{stage="physics"} 2', text)
+        self.assertIn('aegis_stage_duration_ms_bucket{stage="physics",le="+Inf"} 2', text)
+        self.assertIn('aegis_tick_overruns_total{stage="physics"} 1', text)
+        self.assertIn('stage="broadcast.serialize"', text)
+        self.assertIn("aegis_ws_clients 3", text)
+
+    def test_disabled_registry_is_noop(self):
+        reg = MetricsRegistry(enabled=False)
+        with reg.timer("physics"):
+            pass
+        reg.inc("ws_bytes_sent_total", 10)
+        self.assertEqual(reg.stages, {})
+        self.assertEqual(reg.counters, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.inference import InferenceEngine, HAVE_ORT, MODEL_DIR, _model_files
+
+
+@unittest.skipUnless(HAVE_ORT and os.path.exists(os.path.join(MODEL_DIR, "aegis_lstm.onnx")),
+                     "needs onnxruntime and the trained LSTM")
+class TestModelHotSwap(unittest.TestCase):
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp(prefix="aegis-models-")
+        for path in _model_files(MODEL_DIR):
+            if os.path.exists(path):
+                shutil.copy(path, self.model_dir)
+        self.engine = InferenceEngine(model_dir=self.model_dir)
+        self.sequence = np.tile([2.0, 9.0, 28.0, 8.0, 1005.0], (24, 1))
+
+    def tearDown(self):
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def _retrain_scaler(self):
+        scaler = os.path.join(self.model_dir, "scaler_params.json")
+        with open(scaler) as f:
+            params = json.load(f)
+        params["max"][0] *= 1.5
+        with open(scaler, "w") as f:
+            json.dump(params, f)
+
+    def test_watcher_swaps_after_stable_change_and_rolls_back(self):
+        first = self.engine.lstm_version
+        self.assertFalse(self.engine.check_for_update())
+
+        self._retrain_scaler()
+        self.assertFalse(self.engine.check_for_update())  # changed once: wait for a stable copy
+        self.assertTrue(self.engine.check_for_update())
+        second = self.engine.lstm_version
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.engine.predict_lstm(self.sequence)["model_version"], second)
+
+        status = self.engine.get_model_status()
+        self.assertEqual(status["lstm_previous_version"]["version"], first)
+        self.assertEqual(self.engine.rollback_lstm()["version"], first)
+        self.assertEqual(self.engine.lstm_version, first)
+
+    def test_broken_model_keeps_current_version(self):
+        before = self.engine.lstm_version
+        with open(os.path.join(self.model_dir, "aegis_lstm.onnx"), "wb") as f:
+            f.write(b"not an onnx graph")
+        with self.assertRaises(Exception):
+            self.engine.reload_lstm()
+        self.assertEqual(self.engine.lstm_version, before)
+        self.assertIsNotNone(self.engine.get_model_status()["lstm_last_reload_error"])
+        self.assertEqual(self.engine.predict_lstm(self.sequence)["source"], "LSTM-ONNX")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,8 @@ import os
 # Add parent dir to path to import aegis_sim
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from aegis_sim.engine import calculate_stockdon_runup
+import numpy as np
+from aegis_sim.engine import calculate_stockdon_runup, calculate_stockdon_runup_array
 
 class TestAegisPhysics(unittest.TestCase):
     def test_stockdon_runup(self):
@@ -31,5 +32,12 @@ class TestAegisPhysics(unittest.TestCase):
     def test_zero_wave(self):
         self.assertEqual(calculate_stockdon_runup(0, 10, 0.05), 0.0)
 
+    def test_vectorized_matches_scalar(self):
+        H0 = np.array([0.0, 0.5, 2.0, 4.0, 8.5])
+        T = np.array([10.0, 6.0, 9.0, 10.0, 16.0])
+        beta = np.array([0.05, 0.02, 0.035, 0.05, 0.1])
+        expected = [calculate_stockdon_runup(h, t, b) for h, t, b in zip(H0, T, beta)]
+        np.testing.assert_allclose(calculate_stockdon_runup_array(H0, T, beta), expected, rtol=1e-12)
+
 if __name__ == '__main__':
     unittest.main()
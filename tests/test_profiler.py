@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim import profiler
+
+
+def _busy_worker(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(2000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_capture_sees_worker_threads(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_worker, args=(stop,), name="aegis-io_test")
+        worker.start()
+        try:
+            result = profiler.capture(duration_s=0.3, interval_s=0.005, trace_malloc=True, top=5)
+        finally:
+            stop.set()
+            worker.join()
+
+        self.assertGreater(result["passes"], 10)
+        lines = result["collapsed"].splitlines()
+        hot = [l for l in lines if l.startswith("aegis-io_test;") and "test_profiler:_busy_worker" in l]
+        self.assertTrue(hot)
+        stack, count = hot[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertLessEqual(len(result["allocations"]), 5)
+
+    def test_single_capture_at_a_time(self):
+        profiler._capture_lock.acquire()
+        try:
+            with self.assertRaises(profiler.ProfilerBusy):
+                profiler.capture(duration_s=0.1)
+        finally:
+            profiler._capture_lock.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
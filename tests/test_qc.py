@@ -0,0 +1,97 @@
+import unittest
+import os
+import random
+import statistics
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.qc import RollingMedian, StreamQC
+
+
+def _reading(k, station="B1", dt=60.0, **overrides):
+    r = {"timestamp": 1.7e9 + k * dt, "station_id": station,
+         "wave_height_m": 2.0 + 0.05 * (k % 5), "period_s": 9.0 + 0.01 * k, "temp_c": 28.0 + 0.1 * (k % 3),
+         "wind_speed_mps": 6.0 + 0.2 * (k % 4), "pressure_hpa": 1008.0 + 0.1 * (k % 7)}
+    r.update(overrides)
+    return r
+
+
+class TestStreamQC(unittest.TestCase):
+    def test_rolling_median_matches_statistics(self):
+        rng = random.Random(3)
+        for window in (1, 4, 9):
+            rm, buf = RollingMedian(window), []
+            for i in range(2000):
+                x = rng.randint(0, 5) if i % 3 else rng.random()
+                rm.push(x)
+                buf = (buf + [x])[-window:]
+                self.assertEqual(rm.median(), statistics.median(buf))
+
+    def test_rolling_median_state_stays_bounded(self):
+        rm = RollingMedian(9)
+        for i in range(10000):
+            rm.push(float(i))  # a steady rise: every expired value sits below the median
+        self.assertEqual(len(rm._sorted), 9)
+        self.assertEqual(rm.median(), 9995.0)
+
+    def test_clean_stream_has_no_flags(self):
+        qc = StreamQC()
+        flags = [qc.process(_reading(k)).flags for k in range(300)]
+        self.assertEqual(sum(map(len, flags)), 0)
+
+    def test_spike_replaced_and_level_shift_accepted(self):
+        qc = StreamQC()
+        for k in range(50):
+            qc.process(_reading(k))
+        res = qc.process(_reading(50, wave_height_m=12.0))
+        self.assertEqual(res.flags, ["wave_height_m:spike"])
+        self.assertLess(res.reading["wave_height_m"], 2.5)
+        # a sustained step is flagged only until the median catches up
+        shifted = [qc.process(_reading(k, wave_height_m=4.0 + 0.05 * (k % 5))).flags for k in range(51, 80)]
+        self.assertEqual(shifted[0], ["wave_height_m:spike"])
+        self.assertFalse(any(shifted[-10:]))
+
+    def test_onset_revises_previous_spike(self):
+        qc = StreamQC()
+        for k in range(50):
+            qc.process(_reading(k))
+        first = qc.process(_reading(50, wind_speed_mps=30.0))
+        self.assertEqual(first.flags, ["wind_speed_mps:spike"])
+        second = qc.process(_reading(51, wind_speed_mps=31.0))
+        self.assertEqual(second.flags, ["wind_speed_mps:onset"])
+        self.assertEqual(second.revise, {"wind_speed_mps": 30.0})
+        self.assertEqual(second.reading["wind_speed_mps"], 31.0)
+
+    def test_range_stuck_and_order(self):
+        qc = StreamQC()
+        for k in range(20):
+            qc.process(_reading(k))
+        res = qc.process(_reading(20, pressure_hpa=float("nan"), wind_speed_mps=-3.0))
+        self.assertIn("pressure_hpa:range", res.flags)
+        self.assertIn("wind_speed_mps:range", res.flags)
+        self.assertTrue(1007.0 < res.reading["pressure_hpa"] < 1009.0)
+        masked = [qc.process(_reading(k, wave_height_m=2.0)).masked for k in range(21, 40)]
+        self.assertFalse(masked[5])
+        self.assertTrue(masked[-1])
+        self.assertTrue(qc.process(_reading(10)).drop)
+        self.assertEqual(qc.get_stats()["flags"]["order"], 1)
+
+    def test_gap_fill_and_reset(self):
+        qc = StreamQC(max_fill=6)
+        for k in range(10):
+            qc.process(_reading(k))
+        res = qc.process(_reading(14))
+        self.assertEqual(res.flags, ["gap"])
+        self.assertEqual(len(res.fill), 4)
+        self.assertEqual([r["timestamp"] for r in res.fill], [_reading(k)["timestamp"] for k in (10, 11, 12, 13)])
+        self.assertFalse(res.reset)
+        res = qc.process(_reading(100))
+        self.assertTrue(res.reset)
+        self.assertEqual(res.fill, ())
+        # stations are independent
+        self.assertEqual(qc.process(_reading(200, station="B2")).flags, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim import engine
+from aegis_sim.engine import calculate_stockdon_runup_array, calculate_runup_bulk
+from aegis_sim.runup_lut import RunupLUT, load_or_build
+
+
+class TestRunupLUT(unittest.TestCase):
+    def test_error_bound_and_fallback(self):
+        lut = RunupLUT.build_within(error_bound_m=0.002)
+        self.assertLessEqual(lut.max_error_m, 0.002)
+
+        # Outside the grid (H0 = 20 m, T = 30 s) and H0 <= 0 use the exact path
+        H0 = np.array([2.0, 20.0, 0.0, -1.0])
+        T = np.array([10.0, 30.0, 10.0, 10.0])
+        beta = np.array([0.035, 0.035, 0.035, 0.035])
+        out = lut.lookup(H0, T, beta)
+        exact = calculate_stockdon_runup_array(H0, T, beta)
+        self.assertAlmostEqual(out[0], exact[0], delta=0.002)
+        self.assertAlmostEqual(out[1], exact[1], places=12)
+        self.assertEqual(out[2], 0.0)
+        self.assertEqual(out[3], 0.0)
+
+    def test_saved_table_is_memory_mapped_and_selectable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "runup_lut.npy")
+            lut = load_or_build(path, error_bound_m=0.002)
+            self.assertIsInstance(lut.grid, np.memmap)
+            try:
+                engine.use_runup_lut(lut)
+                bulk = calculate_runup_bulk([3.0], [11.0], 0.035)
+            finally:
+                engine.use_runup_lut(None)
+            self.assertAlmostEqual(bulk[0], calculate_stockdon_runup_array(3.0, 11.0, 0.035), delta=0.002)
+            del lut, bulk
+
+
+if __name__ == '__main__':
+    unittest.main()
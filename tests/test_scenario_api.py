@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+try:
+    from fastapi.testclient import TestClient
+    import main as backend
+except ImportError as e:  # backend dependencies not installed
+    backend = None
+    IMPORT_ERROR = str(e)
+
+
+class TestScenarioAPI(unittest.TestCase):
+    def setUp(self):
+        if backend is None:
+            self.skipTest(f"backend not importable: {IMPORT_ERROR}")
+        backend.scenario_cache.clear()
+        backend.world["tide"] = 0.0
+        self.addCleanup(backend.world.update, tide=0.0)
+        self.client = TestClient(backend.app)
+
+    def cache(self):
+        return backend.scenario_cache.get_stats()
+
+    def test_quantized_inputs_share_a_cache_entry(self):
+        before = self.cache()
+        a = self.client.get("/api/scenario", params={"H0": 2.001, "T": 9.02, "beta": 0.0351})
+        b = self.client.get("/api/scenario", params={"H0": 2.004, "T": 8.98, "beta": 0.0349})
+        self.assertEqual(a.status_code, 200)
+        self.assertEqual(a.content, b.content)
+        self.assertEqual(a.json()["inputs"], {"H0": 2.0, "T": 9.0, "beta": 0.035, "tide": 0.0})
+        stats = self.cache()
+        self.assertEqual(stats["size"], 1)
+        self.assertEqual(stats["hits"] - before["hits"], 1)
+        self.assertEqual(stats["misses"] - before["misses"], 1)
+        # one quantum away is a different scenario
+        c = self.client.get("/api/scenario", params={"H0": 2.01, "T": 9.0})
+        self.assertNotEqual(c.json()["runup_m"], a.json()["runup_m"])
+        self.assertEqual(self.cache()["size"], 2)
+
+    def test_batch_keeps_order_with_duplicates(self):
+        first = {"H0": 1.0, "T": 8.0}
+        second = {"H0": 4.0, "T": 12.0, "beta": 0.05}
+        r = self.client.post("/api/scenario/batch", json={"scenarios": [first, second, first, {"H0": 1.004, "T": 8.0}]})
+        self.assertEqual(r.status_code, 200)
+        body = r.json()
+        self.assertEqual(body["count"], 4)
+        results = body["results"]
+        self.assertEqual([x["inputs"]["H0"] for x in results], [1.0, 4.0, 1.0, 1.0])
+        self.assertEqual(results[0], results[2])
+        self.assertEqual(results[0], results[3])
+        self.assertGreater(results[1]["runup_m"], results[0]["runup_m"])
+        # two distinct keys evaluated once each
+        self.assertEqual(self.cache()["size"], 2)
+        single = self.client.get("/api/scenario", params=second)
+        self.assertEqual(single.json(), results[1])
+
+    def test_repeat_requests_hit_the_cache(self):
+        params = {"H0": 3.0, "T": 10.0}
+        first = self.client.get("/api/scenario", params=params)
+        before = self.cache()
+        again = self.client.get("/api/scenario", params=params)
+        self.assertEqual(again.content, first.content)
+        after = self.cache()
+        self.assertEqual(after["hits"], before["hits"] + 1)
+        self.assertEqual(after["misses"], before["misses"])
+        r = self.client.post("/api/scenario/batch", json={"scenarios": [params] * 3})
+        self.assertEqual(self.cache()["hits"], after["hits"] + 3)
+        self.assertEqual(r.json()["results"][0], first.json())
+
+    def test_still_water_defaults_to_current_tide(self):
+        params = {"H0": 2.0, "T": 9.0}
+        msl = self.client.get("/api/scenario", params=params).json()
+        high = self.client.get("/api/scenario", params={**params, "tide": 2.5}).json()
+        self.assertEqual(high["runup_m"], msl["runup_m"])
+        self.assertAlmostEqual(high["water_level_m"], msl["runup_m"] + 2.5, places=3)
+        self.assertGreater(high["total_affected"], msl["total_affected"])
+        self.assertEqual(self.cache()["size"], 2)
+
+        backend.world["tide"] = 2.504  # the producer's predicted tide, same 1 cm step
+        before = self.cache()
+        self.assertEqual(self.client.get("/api/scenario", params=params).json(), high)
+        batch = self.client.post("/api/scenario/batch", json={"scenarios": [params, {**params, "tide": 0}]}).json()
+        self.assertEqual(batch["results"], [high, msl])
+        self.assertEqual(self.cache()["hits"] - before["hits"], 3)
+
+    def test_validation_errors(self):
+        for params in ({"H0": 0, "T": 9}, {"H0": 2, "T": 31}, {"H0": 2, "T": 9, "beta": 0}, {"T": 9},
+                       {"H0": 2, "T": 9, "tide": 11}):
+            self.assertEqual(self.client.get("/api/scenario", params=params).status_code, 422, params)
+        post = self.client.post
+        self.assertEqual(post("/api/scenario/batch", json={"scenarios": []}).status_code, 422)
+        too_many = [{"H0": 1.0, "T": 8.0}] * (backend.SCENARIO_BATCH_MAX + 1)
+        self.assertEqual(post("/api/scenario/batch", json={"scenarios": too_many}).status_code, 422)
+        self.assertEqual(post("/api/scenario/batch", json={"scenarios": [{"H0": -1, "T": 8}]}).status_code, 422)
+        self.assertEqual(self.cache()["size"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import asyncio
+import heapq
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.scheduler import TickScheduler, parse_rates
+
+
+class VirtualClock:
+    """Deterministic time for the scheduler: sleeps wake in deadline order, work advances `now` explicitly."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._timers = []
+        self._seq = 0
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._timers, (self.now + seconds, self._seq, fut))
+        self._seq += 1
+        await fut
+
+    async def run_until(self, t):
+        while True:
+            for _ in range(10):  # let woken stages run up to their next sleep
+                await asyncio.sleep(0)
+            if not self._timers or self._timers[0][0] > t:
+                self.now = t
+                return
+            when, _, fut = heapq.heappop(self._timers)
+            self.now = max(self.now, when)
+            fut.set_result(None)
+
+
+class TestTickScheduler(unittest.TestCase):
+    def test_parse_rates(self):
+        rates = parse_rates("lstm=0.5, forecast=1/60", {"physics": 2.0, "lstm": 0.2})
+        self.assertEqual(rates["physics"], 2.0)
+        self.assertEqual(rates["lstm"], 0.5)
+        self.assertAlmostEqual(rates["forecast"], 1 / 60)
+        with self.assertRaises(ValueError):
+            parse_rates("physics=0", {})
+
+    def test_independent_rates_without_drift(self):
+        clock = VirtualClock()
+        calls = {"fast": [], "slow": []}
+
+        def fast():
+            calls["fast"].append(clock.now)
+            clock.now += 0.004  # work time must not stretch the period
+
+        async def slow():
+            calls["slow"].append(clock.now)
+
+        async def run():
+            sched = TickScheduler(clock=clock.time, sleep=clock.sleep)
+            sched.add_stage("fast", fast, 50)
+            sched.add_stage("slow", slow, 5)
+            sched.start()
+            await clock.run_until(1.01)
+            await sched.stop()
+            return sched.get_stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual(len(calls["fast"]), 51)
+        self.assertEqual(len(calls["slow"]), 6)
+        # every run starts on its t0 + k * period deadline: no accumulated drift
+        for k, t in enumerate(calls["fast"]):
+            self.assertAlmostEqual(t, k * 0.02, places=9)
+        self.assertLess(stats["stages"]["fast"]["max_lag_ms"], 1e-6)
+        self.assertEqual(stats["stages"]["fast"]["overruns"], 0)
+
+    def test_overrun_and_not_ready(self):
+        clock = VirtualClock()
+        state = {"ready": False}
+
+        def heavy():
+            clock.now += 0.03
+
+        def waits():
+            if not state["ready"]:
+                state["ready"] = True
+                return False
+
+        async def run():
+            sched = TickScheduler(clock=clock.time, sleep=clock.sleep)
+            sched.add_stage("heavy", heavy, 50)
+            sched.add_stage("waits", waits, 100)
+            sched.start()
+            await clock.run_until(0.2)
+            await sched.stop()
+            return sched.get_stats()["stages"]
+
+        stages = asyncio.run(run())
+        # 30 ms of work on a 20 ms period: every run overruns and skips the deadline it ate
+        self.assertEqual(stages["heavy"]["overruns"], stages["heavy"]["runs"])
+        self.assertEqual(stages["heavy"]["skipped_ticks"], stages["heavy"]["runs"])
+        self.assertEqual(stages["waits"]["not_ready"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
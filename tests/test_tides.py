@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.tides import J2000_EPOCH_S, TideModel, load_or_build
+
+T0 = 1.76e9  # 2025-10-09
+
+
+class TestTides(unittest.TestCase):
+    def test_constituent_speeds(self):
+        model = TideModel()
+        speeds = dict(zip(model.names, model.speed * 3600.0))
+        self.assertAlmostEqual(speeds["M2"], 28.9841042, places=5)
+        self.assertAlmostEqual(speeds["S2"], 30.0, places=5)
+        self.assertAlmostEqual(speeds["K1"], 15.0410686, places=5)
+        self.assertAlmostEqual(speeds["O1"], 13.9430356, places=5)
+
+    def test_equilibrium_arguments_at_midnight(self):
+        # V0 at 2000-01-01 00:00 UT; solar time runs from midnight, so S2 starts at 0
+        model = TideModel()
+        v0 = dict(zip(model.names, np.mod(model.v0 + model.speed * (946684800.0 - J2000_EPOCH_S), 360.0)))
+        self.assertAlmostEqual(v0["K1"], 9.97, places=2)
+        self.assertAlmostEqual(v0["O1"], 126.52, places=2)
+        self.assertAlmostEqual(v0["M2"], 136.49, places=2)
+        self.assertAlmostEqual(v0["S2"], 0.0, places=6)
+
+    def test_grid_matches_direct(self):
+        model = TideModel()
+        t = T0 + np.arange(3001) * 120.0
+        np.testing.assert_allclose(model.predict_grid(T0, 120.0, t.size), model.predict(t), atol=1e-8)
+
+    def test_spring_range(self):
+        model = TideModel()
+        daily = model.predict_grid(T0, 600.0, 144 * 30, ["APOLLO-BUNDER"])[0].reshape(30, 144)
+        ranges = daily.max(axis=1) - daily.min(axis=1)
+        self.assertTrue(3.8 < ranges.max() < 5.5)
+        self.assertLess(ranges.min(), 0.6 * ranges.max())  # neaps
+
+    def test_table_round_trip(self):
+        model = TideModel()
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "tides.npy")
+            table = load_or_build(model, path, days=4, now=T0)
+            self.assertIsInstance(table.levels, np.memmap)
+            mtime = os.path.getmtime(path)
+            load_or_build(model, path, days=4, now=T0 + 3600)  # still covered: reused
+            self.assertEqual(os.path.getmtime(path), mtime)
+            model.use_table(table)
+            t = T0 + np.random.default_rng(1).uniform(0, 86400, 500)
+            np.testing.assert_allclose(model.level(t), model.predict(t), atol=2e-3)
+            # Outside the table falls back to the harmonic sum
+            far = np.array([T0 + 30 * 86400])
+            np.testing.assert_allclose(model.level(far), model.predict(far))
+            with self.assertRaises(ValueError):
+                TideModel({"X": {"constituents": {"M2": (1.0, 0.0)}}}).use_table(table)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.inundation import InundationModel
+from aegis_sim.tiles import ROOT, EMPTY_TILE, TileCache, depth_layer, encode_png, heatmap_layer, tile_bounds, tiles_from_env
+
+
+def decode_png(png):
+    """Minimal RGBA / filter-0 decoder for the PNGs encode_png writes."""
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, idat = 8, b""
+    while pos < len(png):
+        length, tag = struct.unpack(">I4s", png[pos:pos + 8])
+        data = png[pos + 8:pos + 8 + length]
+        assert struct.unpack(">I", png[pos + 8 + length:pos + 12 + length])[0] == zlib.crc32(tag + data)
+        if tag == b"IHDR":
+            w, h = struct.unpack(">II", data[:8])
+        elif tag == b"IDAT":
+            idat += data
+        pos += 12 + length
+    raw = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(h, w * 4 + 1)
+    return raw[:, 1:].reshape(h, w, 4)
+
+
+class TestTiles(unittest.TestCase):
+    def test_png_round_trip(self):
+        rgba = np.random.default_rng(0).integers(0, 256, (16, 24, 4), dtype=np.uint8)
+        np.testing.assert_array_equal(decode_png(encode_png(rgba)), rgba)
+
+    def test_tile_bounds(self):
+        w, s, e, n = tile_bounds(1, 1, 0)
+        self.assertEqual((w, e), (0.0, 180.0))
+        self.assertAlmostEqual(s, 0.0)
+        self.assertAlmostEqual(n, 85.0511, places=3)
+
+    def test_depth_tile_cached_per_level(self):
+        model = InundationModel.synthetic((128, 128))
+        level = [3.0]
+        with tempfile.TemporaryDirectory() as d:
+            cache = TileCache(cache_dir=d, prefetch=False)
+            cache.register(depth_layer(model, lambda: level[0]))
+            png, version = cache.get("inundation", 11, 1438, 913)  # Mumbai
+            self.assertTrue(version.endswith("@3.00"))
+            self.assertGreater(decode_png(png)[..., 3].max(), 0)
+            cache.get("inundation", 11, 1438, 913)
+            self.assertEqual(cache.rendered, 1)
+
+            level[0] = 3.01  # same 5 cm step
+            cache.get("inundation", 11, 1438, 913)
+            self.assertEqual(cache.rendered, 1)
+
+            # A fresh cache over the same directory reads from disk
+            cold = TileCache(cache_dir=d, prefetch=False)
+            cold.register(depth_layer(model, lambda: level[0]))
+            self.assertEqual(cold.get("inundation", 11, 1438, 913)[0], png)
+            self.assertEqual((cold.rendered, cold.disk_hits), (0, 1))
+
+    def test_disk_keeps_recent_versions(self):
+        model = InundationModel.synthetic((128, 128))
+        level = [2.0]
+        with tempfile.TemporaryDirectory() as d:
+            cache = TileCache(cache_dir=d, mem_size=1, prefetch=False, disk_versions=2)
+            cache.register(depth_layer(model, lambda: level[0]))
+            for level[0] in (2.0, 2.5, 3.0):
+                cache.get("inundation", 11, 1438, 913)
+            on_disk = sorted(os.listdir(os.path.join(d, "inundation")))
+            self.assertEqual([v.rsplit("@", 1)[1] for v in on_disk], ["2.50", "3.00"])
+            self.assertEqual(cache.get_stats()["disk_evicted"], 1)
+
+            # A restart with a lower limit prunes what earlier runs left behind, oldest first
+            os.utime(os.path.join(d, "inundation", on_disk[0]), (0, 0))
+            cold = TileCache(cache_dir=d, prefetch=False, disk_versions=1)
+            self.assertEqual([v.rsplit("@", 1)[1] for v in os.listdir(os.path.join(d, "inundation"))], ["3.00"])
+            self.assertEqual(cold.get_stats()["disk_versions"], 1)
+
+    def test_default_cache_dir_is_in_the_repo(self):
+        self.assertEqual(tiles_from_env({}).cache_dir, os.path.join(ROOT, "data", "tiles"))
+        self.assertIsNone(tiles_from_env({"AEGIS_TILE_CACHE": "off"}).cache_dir)
+
+    def test_out_of_bounds_and_unready(self):
+        scores = [None]
+        cache = TileCache(prefetch=False)
+        cache.register(heatmap_layer([19.0], [72.85], lambda: scores[0]))
+        self.assertEqual(cache.get("risk", 11, 1438, 913), (EMPTY_TILE, None))
+        scores[0] = [90]
+        self.assertIs(cache.get("risk", 11, 0, 0)[0], EMPTY_TILE)
+        self.assertEqual(cache.rendered, 0)
+        with self.assertRaises(ValueError):
+            cache.get("risk", 2, 4, 0)
+
+    def test_refresh_queues_hot_tiles_for_new_version(self):
+        scores = [[90]]
+        cache = TileCache(prefetch=False)
+        cache.register(heatmap_layer([19.0], [72.85], lambda: scores[0]))
+        cache.get("risk", 11, 1438, 913)
+        cache.refresh()
+        scores[0] = [40]
+        cache.refresh()
+        self.assertEqual(cache.get_stats()["queued"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
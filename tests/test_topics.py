@@ -0,0 +1,79 @@
+import asyncio
+import json
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.topics import Subscription, project
+
+FRAME = {
+    "type": "telemetry", "timestamp": 1.0, "data_timestamp": 1.0, "station_id": "buoy-1",
+    "ocean": {"wave_height_m": 2.0}, "risk_zone": {"zone": "GREEN ZONE"}, "alerts_seq": 7,
+    "sectors": {"A": {"score": 10}, "B": {"score": 90}},
+    "forecast_exceedance": {"A": 0.1, "B": 0.9},
+    "drones": [{"id": "d"}], "system": {"role": "producer"},
+}
+
+
+class TestTopics(unittest.TestCase):
+    def test_projection_fields_and_sector_filter(self):
+        sub = Subscription.parse({"topics": ["alerts", "sectors"], "sectors": ["B"]})
+        out = project(FRAME, sub)
+        self.assertEqual(set(out), {"type", "timestamp", "data_timestamp", "station_id",
+                                    "risk_zone", "alerts_seq", "sectors"})
+        self.assertEqual(out["sectors"], {"B": {"score": 90}})
+
+        everything = project(FRAME, Subscription(sectors=["A"]))
+        self.assertEqual(everything["forecast_exceedance"], {"A": 0.1})
+        self.assertIn("drones", everything)
+
+    def test_parse_validation_and_keys(self):
+        with self.assertRaises(ValueError):
+            Subscription.parse({"topics": ["weather"]})
+        for bad in ({"sectors": "A"}, {"topics": 5}, {"topics": [["fleet"]]}, {"stations": [{"id": 1}]}):
+            with self.assertRaises(ValueError):
+                Subscription.parse(bad)
+        self.assertTrue(Subscription.parse({"topics": ["all"]}).full)
+        a = Subscription.parse({"topics": ["fleet", "alerts"]})
+        b = Subscription.parse({"topics": ["alerts", "fleet"], "stations": ["x"]})
+        self.assertEqual(a.key, b.key)
+        self.assertFalse(b.accepts_station("y"))
+
+
+class _Socket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text):
+        self.frames.append(text)
+
+
+class TestTopicFanout(unittest.TestCase):
+    def test_shared_projection_per_key(self):
+        sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+        try:
+            from main import ConnectionManager
+        except ImportError as e:
+            self.skipTest(f"backend not importable: {e}")
+
+        mgr = ConnectionManager()
+        full, alerts_a, alerts_b, other_station = (_Socket() for _ in range(4))
+        mgr.active = [full, alerts_a, alerts_b, other_station]
+        mgr.subscribe(alerts_a, Subscription(["alerts"]))
+        mgr.subscribe(alerts_b, Subscription(["alerts"]))
+        mgr.subscribe(other_station, Subscription(stations=["buoy-2"]))
+
+        text = json.dumps(FRAME)
+        sent, nbytes, projections = asyncio.run(mgr.broadcast_telemetry(text))
+        self.assertEqual((sent, projections), (3, 1))
+        self.assertEqual(full.frames, [text])
+        self.assertEqual(other_station.frames, [])
+        self.assertEqual(alerts_a.frames, alerts_b.frames)
+        self.assertEqual(json.loads(alerts_a.frames[0])["alerts_seq"], 7)
+        self.assertEqual(nbytes, len(text) + 2 * len(alerts_a.frames[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aegis_sim.vessels import VesselTracker
+
+ZONES = [
+    {"name": "JNPT approach", "kind": "port", "lat": 18.95, "lon": 72.95, "radius_m": 4000},
+    {"name": "Colaba", "kind": "sector", "lat": 18.9067, "lon": 72.8147, "radius_m": 3000},
+]
+
+
+class TestVesselTracker(unittest.TestCase):
+    def test_dead_reckoning_enter_and_leave(self):
+        tracker = VesselTracker(ZONES, turn_sigma_deg=0.0)
+        # 10 knots due east along the JNPT approach latitude, starting 6 km west of it
+        tracker.add("v1", "Eastbound", 18.95, 72.95 - 6000 / (111_320 * np.cos(np.radians(19.0))),
+                    speed_knots=10, heading=90)
+        self.assertEqual(tracker.step(0.0), [])
+        events = []
+        for _ in range(210):  # 10.8 km, short of the eastern bound
+            events += tracker.step(10.0)
+        self.assertEqual([(e["event"], e["zone"]) for e in events],
+                         [("enter", "JNPT approach"), ("leave", "JNPT approach")])
+        self.assertEqual(tracker.events_since(events[0]["seq"]), [events[1]])
+
+    def test_grid_index_matches_brute_force(self):
+        tracker = VesselTracker(ZONES, seed=3)
+        tracker.add_random(3000)
+        tracker.set_zone_risk("Colaba", "HIGH")
+        for _ in range(20):
+            for e in tracker.step(30.0):
+                if e["zone"] == "Colaba":
+                    self.assertEqual(e["risk"], "HIGH")
+        x, y = tracker._project(tracker.lat, tracker.lon)
+        brute = (x[:, None] - tracker._zx) ** 2 + (y[:, None] - tracker._zy) ** 2 <= tracker._zr2
+        np.testing.assert_array_equal(tracker.inside, brute)
+        self.assertEqual(sum(tracker.occupancy().values()), int(brute.sum()))
+
+    def test_vessels_stay_in_bounds(self):
+        tracker = VesselTracker(ZONES, seed=1)
+        tracker.add_random(200)
+        for _ in range(200):
+            tracker.step(60.0)
+        lat0, lat1, lon0, lon1 = tracker.bounds
+        self.assertTrue(np.all((tracker.lat > lat0 - 0.02) & (tracker.lat < lat1 + 0.02)))
+        self.assertTrue(np.all((tracker.lon > lon0 - 0.02) & (tracker.lon < lon1 + 0.02)))
+
+
+if __name__ == '__main__':
+    unittest.main()
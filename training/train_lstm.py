@@ -23,6 +23,10 @@ from torch.utils.data import Dataset, DataLoader
 from sklearn.preprocessing import MinMaxScaler
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from aegis_sim.features import FEATURE_NAMES, FeatureEngine  # noqa: E402 (shared with serving)
+from aegis_sim.ingest import parse_timestamp  # noqa: E402
+
 DATA_PATH = os.path.join(ROOT, "data", "aggregated_buoy_telemetry.csv")
 MODEL_DIR = os.path.join(ROOT, "models")
 MODEL_PT = os.path.join(MODEL_DIR, "aegis_lstm.pt")
@@ -30,7 +34,9 @@ MODEL_ONNX = os.path.join(MODEL_DIR, "aegis_lstm.onnx")
 METRICS_PATH = os.path.join(ROOT, "training", "lstm_metrics.json")
 SCALER_PATH = os.path.join(MODEL_DIR, "scaler_params.json")
 
-FEATURE_COLS = ["wave_height_m", "period_s", "temp_c", "wind_speed_mps", "pressure_hpa"]
+SENSOR_COLS = ["wave_height_m", "period_s", "temp_c", "wind_speed_mps", "pressure_hpa"]
+# Raw sensors + derived cyclone signals; serving computes the same columns incrementally
+FEATURE_COLS = list(FEATURE_NAMES)
 TARGET_COL = "runup_m"
 SEQ_LEN = 24
 HORIZON = 6
@@ -93,10 +99,13 @@ def load_and_prepare_data():
     print(f"Loaded {len(df):,} records from {os.path.basename(DATA_PATH)}")
     print(f"Date range: {df['timestamp'].iloc[0]} to {df['timestamp'].iloc[-1]}")
 
-    df = df.sort_values("timestamp").reset_index(drop=True)
-    features = df[FEATURE_COLS].values.astype(np.float32)
+    df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    raw = np.nan_to_num(df[SENSOR_COLS].values.astype(np.float64), nan=0.0, posinf=10.0, neginf=0.0)
+    # Derived features run per station stream on the row timestamps, exactly as FeatureEngine.update() does live
+    times = df["timestamp"].map(parse_timestamp).values.astype(np.float64)
+    features = FeatureEngine().transform(raw, times, groups=df["station_id"].values)
+    features = features.astype(np.float32)
     targets = df[TARGET_COL].values.astype(np.float32)
-    features = np.nan_to_num(features, nan=0.0, posinf=10.0, neginf=0.0)
     targets = np.nan_to_num(targets, nan=0.0, posinf=5.0, neginf=0.0)
 
     scaler = MinMaxScaler(feature_range=(0, 1))